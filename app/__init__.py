@@ -3,6 +3,10 @@ from config import Config
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 
+from app.cache import ChoiceCache, IdentityCache, PlannerCache
+from app.changes import ChangeBroker
+from app.database import engine_options, install_sqlite_pragmas
+
 db = SQLAlchemy()
 login = LoginManager()
 
@@ -10,10 +14,21 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            install_sqlite_pragmas(engine, app.config.get('SQLITE_PRAGMAS'))
     login.init_app(app)
     login.login_view = 'main.login' # Blueprint名を指定
     login.login_message_category = 'info'
+    app.extensions['planner_cache'] = PlannerCache(maxsize=app.config.get('PLANNER_CACHE_SIZE', 512))
+    app.extensions['identity_cache'] = IdentityCache(ttl=app.config.get('LOGIN_CACHE_TTL', 30))
+    app.extensions['choice_cache'] = ChoiceCache()
+    app.extensions['change_broker'] = ChangeBroker(history=app.config.get('CHANGE_FEED_HISTORY', 256))
+
+    from app import fragments
+    fragments.init_app(app)
 
     from app.routes import bp as main_bp
     app.register_blueprint(main_bp)
@@ -21,5 +36,8 @@ def create_app(config_class=Config):
     from app.cli import register_commands
     register_commands(app)
 
+    from app import instrumentation
+    instrumentation.init_app(app)
+
     return app
 
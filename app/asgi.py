@@ -0,0 +1,193 @@
+"""ASGI deployment: read-heavy views on the event loop, everything else in threads.
+
+:func:`create_asgi_app` wraps the Flask app for ``uvicorn asgi:app``.  A
+``GET`` for one of the endpoints in :data:`app.async_views.ASYNC_VIEWS` from
+a logged-in session runs as a coroutine: the Flask request context is pushed
+on the event loop, the user comes from :func:`app.async_views.load_user`,
+and the view goes through Flask's own ``before_request``/``after_request``
+handling, error handlers and session saving.  Every other request (forms,
+logins, remember-me cookies, the remaining pages) runs the unchanged WSGI
+app on a pool of ``ASGI_THREADS`` threads through a2wsgi.
+
+Event-stream responses are forwarded until the client disconnects, so an
+idle planner page costs a suspended coroutine rather than a thread.
+"""
+import asyncio
+import io
+import sys
+
+from a2wsgi import WSGIMiddleware
+from flask import g, session
+from werkzeug.exceptions import HTTPException
+
+from app import create_app
+from app.async_views import ASYNC_VIEWS, load_user
+from app.database import create_async_engine
+from config import Config
+
+
+def create_asgi_app(config_class=Config):
+    app = create_app(config_class)
+    app.extensions['async_engine'] = create_async_engine(app.config)
+    return AsgiApp(app)
+
+
+def _environ(scope):
+    """Build the WSGI environ of a bodiless request from its ASGI ``scope``."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name, value = name.decode('latin-1'), value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'content-length':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _stream(chunks, receive, send):
+    """Send ``chunks`` as they come until they end or the client disconnects."""
+    async def forward():
+        async for chunk in chunks:
+            await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    tasks = [asyncio.ensure_future(forward()), asyncio.ensure_future(disconnected())]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await chunks.aclose()
+    if tasks[0] in done and not tasks[0].cancelled():
+        tasks[0].result()
+
+
+class AsgiApp:
+    """The ASGI callable around a Flask app with an ``async_engine`` extension."""
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = WSGIMiddleware(app, workers=app.config.get('ASGI_THREADS', 10))
+        self._slots = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            environ = _environ(scope)
+            view = self._async_view(environ)
+            if view is not None and await self._dispatch(view, environ, receive, send):
+                return
+        await self.wsgi(scope, receive, send)
+
+    def _async_view(self, environ):
+        adapter = self.app.create_url_adapter(self.app.request_class(environ))
+        try:
+            endpoint, _ = adapter.match()
+        except HTTPException:
+            return None
+        return ASYNC_VIEWS.get(endpoint)
+
+    async def _dispatch(self, view, environ, receive, send):
+        """Run ``view`` and send its response; ``False`` leaves the request to WSGI.
+
+        At most ``ASGI_CONCURRENCY`` views run at once.  Every query a view
+        awaits queues behind all other ready coroutines, so on a saturated
+        loop unbounded concurrency mostly stretches the latency tail.
+        Slots are released before the body is sent, so open event streams
+        do not hold one.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.app.config.get('ASGI_CONCURRENCY', 32))
+        async with self._slots:
+            result = await self._run(view, environ)
+        if result is None:
+            return False
+        status, headers, body = result
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        if isinstance(body, bytes):
+            await send({'type': 'http.response.body', 'body': body})
+        else:
+            await _stream(body, receive, send)
+        return True
+
+    async def _run(self, view, environ):
+        """Return ``(status, headers, body)`` of ``view`` run like ``Flask.wsgi_app`` would.
+
+        Returns ``None`` without a user id in the session: the WSGI app
+        handles remember-me cookies and redirects anonymous visitors to the
+        login page.  ``body`` is bytes, or an async iterator of strings for
+        event streams, which run after the request context is gone.
+        """
+        app = self.app
+        ctx = app.request_context(environ)
+        error = None
+        ctx.push()
+        try:
+            user_id = session.get('_user_id')
+            user = await load_user(user_id) if user_id is not None else None
+            if user is None:
+                return None
+            g._login_user = user
+            try:
+                try:
+                    response = app.preprocess_request()
+                    if response is None:
+                        response = await view(**ctx.request.view_args)
+                except Exception as exc:
+                    response = app.handle_user_exception(exc)
+                response = app.finalize_request(response)
+            except Exception as exc:
+                error = exc
+                response = app.handle_exception(exc)
+            headers = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in response.get_wsgi_headers(environ).items()
+            ]
+            if hasattr(response.response, '__aiter__'):
+                return response.status_code, headers, response.response
+            return response.status_code, headers, b''.join(response.get_app_iter(environ))
+        finally:
+            ctx.pop(error)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.app.extensions['async_engine'].dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
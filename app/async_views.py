@@ -0,0 +1,166 @@
+"""Coroutine versions of the read-heavy views, served by :mod:`app.asgi`.
+
+Each view mirrors its namesake in :mod:`app.routes` and reuses its query
+builders, cache keys, validators and templates; only the statements run
+differently, awaited on the app's ``async_engine`` (aiosqlite), so a
+request waiting for SQLite holds no thread.  Templates still render on the
+event loop, and a planner already in the planner cache costs one query, the
+version check.  The change feed waits on an :class:`asyncio.Event` instead
+of a thread.
+
+:data:`ASYNC_VIEWS` maps endpoints to these coroutines.  They run with the
+Flask request context pushed and ``current_user`` already loaded by
+:func:`load_user`.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from flask import current_app, jsonify, make_response, render_template, request
+from flask_login import current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import routes
+from app.availability import free_rooms_statement, recurring_bookings_statement, without_recurring_conflicts
+from app.changes import async_event_stream
+from app.directory import room_directory_version, room_page_statement, split_room_page
+from app.models import User, cache_user, week_start_of
+
+ASYNC_VIEWS = {}
+
+
+def async_view(endpoint):
+    """Serve ``endpoint`` with the decorated coroutine under ASGI."""
+    def decorator(view):
+        ASYNC_VIEWS[endpoint] = view
+        return view
+    return decorator
+
+
+def _session():
+    return AsyncSession(current_app.extensions['async_engine'])
+
+
+async def load_user(user_id):
+    """The async counterpart of :func:`app.models.load_user`, sharing its identity cache.
+
+    The user is detached when returned; the views only read its columns.
+    """
+    user_id = int(user_id)
+    cache = current_app.extensions.get('identity_cache')
+    cached = cache.get(user_id) if cache is not None else None
+    if cached is not None:
+        return cached
+    async with _session() as session:
+        user = await session.get(User, user_id)
+    if user is not None and cache is not None:
+        cache_user(cache, user)
+    return user
+
+
+async def _planner_validators(session, viewer, range_start, representation, day_count=7):
+    statement = routes._planner_version_statement(
+        viewer, week_start=range_start, week_end=range_start + timedelta(days=day_count)
+    )
+    version = tuple((await session.execute(statement)).one())
+    return (version, *routes._planner_etag(viewer, range_start, representation, day_count, version))
+
+
+async def _planner_entry(session, viewer, range_start, version, day_count=7):
+    cache = routes._planner_cache()
+    cache_key = routes._planner_cache_key(viewer, range_start, version, day_count)
+    entry = cache.get(cache_key)
+    if entry is None:
+        range_end = range_start + timedelta(days=day_count)
+        query = routes._planner_schedule_query(viewer, week_start=range_start, week_end=range_end)
+        schedules = (await session.scalars(query.statement)).all()
+        entry = routes._new_planner_entry(schedules, viewer, range_start, day_count)
+        cache.set(cache_key, entry)
+    return entry
+
+
+@async_view('main.calendar')
+async def calendar():
+    week_start = week_start_of(datetime.utcnow())
+    async with _session() as session:
+        version, etag, last_modified = await _planner_validators(session, current_user, week_start, 'html')
+        not_modified = routes._not_modified(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        entry = await _planner_entry(session, current_user, week_start, version)
+
+    response = make_response(render_template(
+        'calendar.html',
+        title='Calendar',
+        week_start=week_start,
+        planner_grid=routes._PlannerGrid(current_user, week_start, version, entry=entry),
+    ))
+    return routes._with_validators(response, etag, last_modified)
+
+
+@async_view('main.calendar_grid')
+async def calendar_grid():
+    week_start = routes._visible_week()
+    async with _session() as session:
+        version, etag, last_modified = await _planner_validators(session, current_user, week_start, 'grid')
+        not_modified = routes._not_modified(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        entry = await _planner_entry(session, current_user, week_start, version)
+    grid = ''.join(routes._PlannerGrid(current_user, week_start, version, entry=entry))
+    return routes._with_validators(make_response(grid), etag, last_modified)
+
+
+@async_view('main.calendar_changes')
+async def calendar_changes():
+    start, end, last_id = routes._change_feed_request()
+    broker = current_app.extensions['change_broker']
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    subscription = broker.subscribe(
+        current_user.id, start, end, last_id=last_id, wake=lambda: loop.call_soon_threadsafe(ready.set)
+    )
+    return routes._event_stream_response(async_event_stream(
+        broker, subscription, ready, heartbeat=current_app.config.get('CHANGE_FEED_HEARTBEAT', 15)
+    ))
+
+
+@async_view('main.planner_api')
+async def planner_api():
+    week_start, day_count, month_start = routes._planner_api_range()
+    async with _session() as session:
+        version, etag, last_modified = await _planner_validators(
+            session, current_user, week_start, 'json', day_count
+        )
+        not_modified = routes._not_modified(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        entry = await _planner_entry(session, current_user, week_start, version, day_count)
+    payload = routes._serialize_planner(entry["planner"], month_start=month_start)
+    return routes._with_validators(jsonify(payload), etag, last_modified)
+
+
+@async_view('main.list_rooms')
+async def list_rooms():
+    after = request.args.get('after') or None
+    page_size = current_app.config.get('ROOM_PAGE_SIZE', 50)
+    async with _session() as session:
+        room_count, last_modified = (await session.execute(room_directory_version())).one()
+        etag = routes._make_etag(current_user.id, after, page_size, room_count, last_modified)
+        not_modified = routes._not_modified(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        rooms = (await session.scalars(room_page_statement(after=after, limit=page_size))).all()
+    rooms, next_after = split_room_page(rooms, page_size)
+    return routes._room_list_response(rooms, after, next_after, etag, last_modified)
+
+
+@async_view('main.available_rooms_api')
+async def available_rooms_api():
+    windows, min_capacity = routes._availability_request()
+    ordered = sorted(windows)
+    async with _session() as session:
+        rooms = (await session.scalars(free_rooms_statement(ordered, min_capacity=min_capacity))).all()
+        if rooms:
+            bookings = (await session.scalars(recurring_bookings_statement(rooms, ordered))).all()
+            rooms = without_recurring_conflicts(rooms, bookings, ordered)
+    return routes._availability_response(windows, rooms)
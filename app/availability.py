@@ -0,0 +1,92 @@
+"""Free meeting room search.
+
+A room is free for a window when it has no booking overlapping it.  Each
+window becomes its own ``NOT EXISTS`` probe over one-off bookings so SQLite
+can answer it with a range seek on ``ix_schedule_room_id_series_end`` per
+room rather than scanning the booking table.  Recurring bookings that fall
+in the searched range are then expanded lazily for the remaining rooms.
+"""
+from datetime import timedelta
+
+from sqlalchemy import and_, exists, select
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.models import Room, Schedule
+from app.recurrence import streams_overlap
+
+RECURRENCE_STEPS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+MAX_OCCURRENCES = 52
+
+
+def recurring_windows(start, end, *, every=None, count=1):
+    """Return ``count`` copies of ``(start, end)`` spaced by ``every``."""
+    if end <= start:
+        raise ValueError("End time must be after the start time.")
+    if every is None:
+        return [(start, end)]
+    if every not in RECURRENCE_STEPS:
+        raise ValueError(f"Unsupported recurrence: {every}")
+    if not 1 <= count <= MAX_OCCURRENCES:
+        raise ValueError(f"Occurrence count must be between 1 and {MAX_OCCURRENCES}.")
+    step = RECURRENCE_STEPS[every]
+    return [(start + step * index, end + step * index) for index in range(count)]
+
+
+def room_is_booked(start, end):
+    """Correlated clause matching one-off bookings of ``Room`` that overlap the window."""
+    return exists().where(
+        Schedule.room_id == Room.id,
+        Schedule.series_end > start,
+        Schedule.start_time < end,
+        Schedule.recurrence.is_(None),
+    )
+
+
+def free_rooms_statement(windows, *, min_capacity=1):
+    """Select rooms seating ``min_capacity`` without one-off bookings in the sorted ``windows``."""
+    return (
+        select(Room)
+        .where(
+            Room.capacity >= min_capacity,
+            and_(*(~room_is_booked(start, end) for start, end in windows)),
+        )
+        .order_by(Room.capacity, Room.name)
+    )
+
+
+def recurring_bookings_statement(rooms, windows):
+    """Select the recurring bookings of ``rooms`` whose series reach into ``windows``."""
+    range_start = windows[0][0]
+    range_end = max(end for _, end in windows)
+    return select(Schedule).options(selectinload(Schedule.exclusions)).where(
+        Schedule.recurrence.isnot(None),
+        Schedule.room_id.in_([room.id for room in rooms]),
+        Schedule.start_time < range_end,
+        Schedule.series_end > range_start,
+    )
+
+
+def without_recurring_conflicts(rooms, bookings, windows):
+    """Drop the rooms one of the recurring ``bookings`` occupies during ``windows``."""
+    range_start = windows[0][0]
+    range_end = max(end for _, end in windows)
+    busy_room_ids = {
+        booking.room_id
+        for booking in bookings
+        if streams_overlap(windows, booking.occurrences(range_start, range_end))
+    }
+    return [room for room in rooms if room.id not in busy_room_ids]
+
+
+def find_available_rooms(windows, *, min_capacity=1):
+    """Return rooms seating ``min_capacity`` that are free in every window."""
+    windows = sorted(windows)
+    rooms = db.session.scalars(free_rooms_statement(windows, min_capacity=min_capacity)).all()
+    if not rooms:
+        return rooms
+    bookings = db.session.scalars(recurring_bookings_statement(rooms, windows))
+    return without_recurring_conflicts(rooms, bookings, windows)
@@ -0,0 +1,299 @@
+"""Streaming bulk import and export of users, rooms and schedules.
+
+Rows are read and written one at a time as CSV or JSON Lines and inserted
+in batches with executemany core inserts, so memory stays bounded by the
+batch size plus the username/room name lookup tables regardless of file
+size.  List values (participants, skipped dates) are ``;``-separated in CSV.
+"""
+import csv
+import json
+from datetime import date, datetime
+from itertools import islice
+from operator import itemgetter
+
+from sqlalchemy import insert, select
+
+from app import db
+from app.models import RecurrenceExclusion, Room, Schedule, User, schedule_participants
+from app.recurrence import FREQUENCIES, RecurrenceRule
+
+FIELDS = {
+    'users': ['username', 'password_hash'],
+    'rooms': ['name', 'capacity'],
+    'schedules': [
+        'title', 'start_time', 'end_time', 'location', 'owner', 'room', 'participants',
+        'recurrence', 'recurrence_until', 'recurrence_count', 'excluded_dates',
+    ],
+}
+LIST_FIELDS = {'participants', 'excluded_dates'}
+MAX_RECURRENCE_COUNT = 1000
+
+
+class BulkDataError(ValueError):
+    """A row that cannot be imported; ``line`` is its 1-based data row number."""
+
+    def __init__(self, line, message):
+        super().__init__(f"row {line}: {message}")
+        self.line = line
+
+
+def read_rows(stream, fmt):
+    """Yield rows of ``stream`` as dicts, normalising empty values to ``None``."""
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {
+                key: (value.split(';') if value else []) if key in LIST_FIELDS else (value or None)
+                for key, value in row.items()
+            }
+    else:
+        line = 0
+        for text in stream:
+            if not text.strip():
+                continue
+            line += 1
+            try:
+                row = json.loads(text)
+            except ValueError as exc:
+                raise BulkDataError(line, f"invalid JSON: {exc}") from None
+            if not isinstance(row, dict):
+                raise BulkDataError(line, "expected a JSON object")
+            yield row
+
+
+def write_rows(stream, fmt, kind, rows):
+    """Write ``rows`` to ``stream`` and return how many were written."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS[kind])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                key: ';'.join(value) if key in LIST_FIELDS else ('' if value is None else value)
+                for key, value in row.items()
+            })
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(row, separators=(',', ':')))
+            stream.write('\n')
+            count += 1
+    return count
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _stream(statement, chunk_size):
+    return db.session.execute(statement.execution_options(yield_per=chunk_size))
+
+
+def export_rows(kind, *, chunk_size=1000):
+    """Yield export rows for ``kind``, reading ``chunk_size`` rows at a time."""
+    if kind == 'users':
+        for username, password_hash in _stream(select(User.username, User.password_hash).order_by(User.id), chunk_size):
+            yield {'username': username, 'password_hash': password_hash}
+        return
+    if kind == 'rooms':
+        for name, capacity in _stream(select(Room.name, Room.capacity).order_by(Room.id), chunk_size):
+            yield {'name': name, 'capacity': capacity}
+        return
+
+    usernames = dict(db.session.execute(select(User.id, User.username)).all())
+    room_names = dict(db.session.execute(select(Room.id, Room.name)).all())
+    result = _stream(select(Schedule.__table__).order_by(Schedule.id), chunk_size)
+    for chunk in result.partitions():
+        ids = [row.id for row in chunk]
+        participants = {}
+        for schedule_id, user_id in db.session.execute(
+            select(schedule_participants.c.schedule_id, schedule_participants.c.user_id)
+            .where(schedule_participants.c.schedule_id.in_(ids))
+        ):
+            participants.setdefault(schedule_id, []).append(usernames[user_id])
+        excluded = {}
+        for schedule_id, occurrence_date in db.session.execute(
+            select(RecurrenceExclusion.schedule_id, RecurrenceExclusion.occurrence_date)
+            .where(RecurrenceExclusion.schedule_id.in_(ids))
+            .order_by(RecurrenceExclusion.occurrence_date)
+        ):
+            excluded.setdefault(schedule_id, []).append(occurrence_date.isoformat())
+        for row in chunk:
+            yield {
+                'title': row.title,
+                'start_time': row.start_time.isoformat(),
+                'end_time': row.end_time.isoformat(),
+                'location': row.location,
+                'owner': usernames[row.owner_id],
+                'room': room_names.get(row.room_id),
+                'participants': sorted(participants.get(row.id, [])),
+                'recurrence': row.recurrence,
+                'recurrence_until': row.recurrence_until.isoformat() if row.recurrence_until else None,
+                'recurrence_count': row.recurrence_count,
+                'excluded_dates': excluded.get(row.id, []),
+            }
+
+
+def _import_named(rows, *, table, key, build, batch_size, progress):
+    """Insert rows whose ``key`` column is not taken yet; return ``(imported, skipped)``."""
+    existing = set(db.session.execute(select(table.c[key])).scalars())
+    imported = skipped = 0
+    for batch in _batches(enumerate(rows, start=1), batch_size):
+        values = []
+        for line, row in batch:
+            name = row.get(key)
+            if not name:
+                raise BulkDataError(line, f"missing {key}")
+            if name in existing:
+                skipped += 1
+                continue
+            existing.add(name)
+            values.append(build(line, row))
+        if values:
+            db.session.execute(insert(table), values)
+        db.session.commit()
+        imported += len(values)
+        progress(imported + skipped)
+    return imported, skipped
+
+
+def _build_user(line, row):
+    password_hash = row.get('password_hash')
+    if not password_hash:
+        if not row.get('password'):
+            raise BulkDataError(line, "missing password_hash or password")
+        user = User()
+        user.set_password(row['password'])
+        password_hash = user.password_hash
+    return {'username': row['username'], 'password_hash': password_hash}
+
+
+def _build_room(line, row):
+    try:
+        capacity = int(row.get('capacity'))
+    except (TypeError, ValueError):
+        raise BulkDataError(line, "capacity must be an integer") from None
+    if capacity < 1:
+        raise BulkDataError(line, "capacity must be at least 1")
+    return {'name': row['name'], 'capacity': capacity}
+
+
+def _parse(line, parser, value, field):
+    try:
+        return parser(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        raise BulkDataError(line, f"invalid {field}: {value!r}") from None
+
+
+def _without_existing_schedules(values, *related):
+    """Drop rows of ``values`` whose (owner, title, start) is taken, with their ``related`` items."""
+    key = itemgetter('owner_id', 'title', 'start_time')
+    seen = {tuple(row) for row in db.session.execute(
+        select(Schedule.owner_id, Schedule.title, Schedule.start_time).where(
+            Schedule.owner_id.in_({row['owner_id'] for row in values}),
+            Schedule.start_time.in_({row['start_time'] for row in values}),
+        )
+    )}
+    kept = []
+    for items in zip(values, *related):
+        if key(items[0]) not in seen:
+            seen.add(key(items[0]))
+            kept.append(items)
+    return [list(column) for column in zip(*kept)] if kept else [[] for _ in range(len(related) + 1)]
+
+
+def import_schedules(rows, *, batch_size, progress):
+    """Insert schedules, resolving owners, rooms and participants by name.
+
+    Rows whose owner already has a schedule with the same title and start
+    time, in the database or earlier in the file, are skipped.
+    """
+    user_ids = dict(db.session.execute(select(User.username, User.id)).all())
+    room_ids = dict(db.session.execute(select(Room.name, Room.id)).all())
+    schedules = Schedule.__table__
+    imported = skipped = 0
+    for batch in _batches(enumerate(rows, start=1), batch_size):
+        values, participant_ids, excluded_dates = [], [], []
+        now = datetime.utcnow()
+        for line, row in batch:
+            start = _parse(line, datetime.fromisoformat, row.get('start_time'), 'start_time')
+            end = _parse(line, datetime.fromisoformat, row.get('end_time'), 'end_time')
+            if not row.get('title') or start is None or end is None or end <= start:
+                raise BulkDataError(line, "title, start_time and an end_time after it are required")
+            if row.get('owner') not in user_ids:
+                raise BulkDataError(line, f"unknown owner {row.get('owner')!r}")
+            room = row.get('room')
+            if room and room not in room_ids:
+                raise BulkDataError(line, f"unknown room {room!r}")
+            participants = row.get('participants') or []
+            unknown = [name for name in participants if name not in user_ids]
+            if unknown:
+                raise BulkDataError(line, f"unknown participants {', '.join(unknown)}")
+            frequency = row.get('recurrence')
+            if frequency and frequency not in FREQUENCIES:
+                raise BulkDataError(line, f"invalid recurrence {frequency!r}")
+            until = _parse(line, date.fromisoformat, row.get('recurrence_until'), 'recurrence_until')
+            count = _parse(line, int, row.get('recurrence_count'), 'recurrence_count')
+            if count is not None and not 1 <= count <= MAX_RECURRENCE_COUNT:
+                raise BulkDataError(line, f"recurrence_count must be between 1 and {MAX_RECURRENCE_COUNT}")
+            excluded = [_parse(line, date.fromisoformat, value, 'excluded_dates') for value in row.get('excluded_dates') or []]
+            rule = RecurrenceRule(frequency, until=until, count=count) if frequency else None
+            errors = rule.errors(start, end) if rule else []
+            if errors:
+                raise BulkDataError(line, errors[0][1])
+
+            owner_id = user_ids[row['owner']]
+            values.append({
+                'title': row['title'],
+                'start_time': start,
+                'end_time': end,
+                'location': row.get('location'),
+                'owner_id': owner_id,
+                'room_id': room_ids.get(room),
+                'recurrence': rule.frequency if rule else None,
+                'recurrence_until': rule.until if rule else None,
+                'recurrence_count': rule.count if rule else None,
+                'series_end': rule.series_end(start, end) if rule else end,
+                'created_at': now,
+                'updated_at': now,
+            })
+            participant_ids.append({user_ids[name] for name in participants} - {owner_id})
+            excluded_dates.append(set(excluded) if rule else set())
+
+        values, participant_ids, excluded_dates = _without_existing_schedules(values, participant_ids, excluded_dates)
+        skipped += len(batch) - len(values)
+        new_ids = db.session.execute(
+            insert(schedules).returning(schedules.c.id, sort_by_parameter_order=True), values
+        ).scalars().all() if values else []
+        links = [
+            {'schedule_id': schedule_id, 'user_id': user_id}
+            for schedule_id, users in zip(new_ids, participant_ids)
+            for user_id in users
+        ]
+        if links:
+            db.session.execute(insert(schedule_participants), links)
+        exclusions = [
+            {'schedule_id': schedule_id, 'occurrence_date': day}
+            for schedule_id, days in zip(new_ids, excluded_dates)
+            for day in days
+        ]
+        if exclusions:
+            db.session.execute(insert(RecurrenceExclusion.__table__), exclusions)
+        db.session.commit()
+        imported += len(values)
+        progress(imported + skipped)
+    return imported, skipped
+
+
+def import_rows(kind, rows, *, batch_size=1000, progress=lambda count: None):
+    """Import ``rows`` of ``kind`` and return ``(imported, skipped)``."""
+    if kind == 'users':
+        return _import_named(
+            rows, table=User.__table__, key='username', build=_build_user, batch_size=batch_size, progress=progress
+        )
+    if kind == 'rooms':
+        return _import_named(
+            rows, table=Room.__table__, key='name', build=_build_room, batch_size=batch_size, progress=progress
+        )
+    return import_schedules(rows, batch_size=batch_size, progress=progress)
@@ -0,0 +1,202 @@
+"""Process-local caches for weekly planners and logged-in users.
+
+Planner entries are keyed by ``(viewer_id, range_start, day_count,
+planner_config, version)`` and evicted least-recently-used once ``maxsize``
+is reached.
+Session events in ``app.models`` record which users and weeks each commit
+touched and call :meth:`PlannerCache.invalidate` so only the affected
+planners are rebuilt.  :class:`IdentityCache` keeps users loaded for the
+session cookie for a few seconds and :class:`ChoiceCache` keeps the room
+and user choice lists of the schedule form; both are invalidated by the
+same events.  :class:`FragmentCache` keeps rendered planner fragments under
+keys made of everything they show, so it never needs invalidating.
+"""
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from threading import Lock
+from typing import Dict, NamedTuple, Tuple
+
+class PlannerCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_ids, start, end):
+        """Drop cached planners of ``user_ids`` whose range overlaps ``[start, end)``."""
+        user_ids = set(user_ids)
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] in user_ids and key[1] < end and key[1] + timedelta(days=key[2]) > start
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class IdentityCache:
+    """Least-recently-used cache whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, ttl=30, maxsize=1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] <= self._clock():
+                if item is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DirectoryChoices(NamedTuple):
+    items: Tuple  # ``(id, name)`` pairs sorted by name
+    labels: Dict  # id -> name, also the set submitted ids are checked against
+
+
+class ChoiceCache:
+    """Choice lists per directory (``'rooms'``, ``'users'``).
+
+    Each entry is stored with the ``fingerprint`` of the table it was built
+    from, so writes by other processes are noticed, and only if no
+    :meth:`invalidate` happened since the caller read :meth:`version`, so a
+    list built from rows that a concurrent commit just changed is dropped.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._versions = {}
+        self._lock = Lock()
+
+    def version(self, kind):
+        with self._lock:
+            return self._versions.get(kind, 0)
+
+    def get(self, kind, fingerprint):
+        with self._lock:
+            entry = self._entries.get(kind)
+            if entry is None or entry[0] != fingerprint:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, kind, version, fingerprint, choices):
+        with self._lock:
+            if self._versions.get(kind, 0) == version:
+                self._entries[kind] = (fingerprint, choices)
+
+    def invalidate(self, kinds):
+        with self._lock:
+            for kind in kinds:
+                self._versions[kind] = self._versions.get(kind, 0) + 1
+                self._entries.pop(kind, None)
+
+
+class FragmentCache:
+    """Least-recently-used cache of rendered HTML fragments."""
+
+    def __init__(self, maxsize=8192):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key, html):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
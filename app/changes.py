@@ -0,0 +1,176 @@
+"""In-process feed of schedule changes for open planner pages.
+
+``create_schedule``, ``edit_schedule`` and ``delete_schedule`` publish a
+compact :class:`Change` (schedule id, affected users and time range) to
+the app's :class:`ChangeBroker` after committing.  Each open page holds a
+:class:`Subscription` for its viewer and visible range; the broker indexes
+subscriptions by user, so a change only touches the pages of the people it
+affects, and queues it without blocking the publisher.
+
+Waiting uses :class:`threading.Event`, which gevent's monkey patching makes
+cooperative, so under ``gunicorn -k gevent`` thousands of idle streams are
+greenlets rather than threads.  :meth:`Subscription.wait` is the only
+blocking call; other servers can wake readers their own way by passing
+``wake`` to :meth:`ChangeBroker.subscribe`; the ASGI app does so with an
+:class:`asyncio.Event` and streams with :func:`async_event_stream`.  The
+broker only reaches pages served by the same process.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import NamedTuple
+
+ACTIONS = ('created', 'updated', 'deleted')
+
+
+class Change(NamedTuple):
+    id: int  # sequence number, sent as the SSE event id
+    action: str
+    schedule_id: int
+    user_ids: frozenset
+    start: object
+    end: object
+
+    def concerns(self, user_id, start, end):
+        return user_id in self.user_ids and self.start < end and self.end > start
+
+    def to_json(self):
+        year, week, _ = self.start.isocalendar()
+        return json.dumps({
+            "action": self.action,
+            "schedule_id": self.schedule_id,
+            "week": f"{year:04d}-W{week:02d}",
+            "start": self.start.isoformat(timespec="minutes"),
+            "end": self.end.isoformat(timespec="minutes"),
+        })
+
+
+class Subscription:
+    """Changes for one viewer and range, queued until the reader takes them."""
+
+    def __init__(self, user_id, start, end, *, wake=None):
+        self.user_id = user_id
+        self.start = start
+        self.end = end
+        self._pending = deque()
+        self._ready = threading.Event()
+        self._wake = wake or self._ready.set
+
+    def notify(self, change):
+        if change.concerns(self.user_id, self.start, self.end):
+            self._pending.append(change)
+            self._wake()
+
+    def drain(self):
+        """Return and forget the queued changes."""
+        self._ready.clear()
+        changes = []
+        while self._pending:
+            changes.append(self._pending.popleft())
+        return changes
+
+    def wait(self, timeout):
+        """Block up to ``timeout`` seconds for changes and return them (possibly none)."""
+        if not self._pending:
+            self._ready.wait(timeout)
+        return self.drain()
+
+
+class ChangeBroker:
+    """Fans published changes out to the subscriptions of the affected users.
+
+    The last ``history`` changes are kept so a reconnecting page can ask for
+    what it missed with ``Last-Event-ID``.
+    """
+
+    def __init__(self, history=256):
+        self._history = deque(maxlen=history)
+        self._next_id = 1
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+    def publish(self, action, schedule_id, user_ids, start, end):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown change action: {action}")
+        with self._lock:
+            change = Change(self._next_id, action, schedule_id, frozenset(user_ids), start, end)
+            self._next_id += 1
+            self._history.append(change)
+            subscriptions = [
+                subscription
+                for user_id in change.user_ids
+                for subscription in self._by_user.get(user_id, ())
+            ]
+        for subscription in subscriptions:
+            subscription.notify(change)
+        return change
+
+    def subscribe(self, user_id, start, end, *, last_id=None, wake=None):
+        """Register a page of ``user_id`` showing ``[start, end)``.
+
+        With ``last_id``, changes after it that are still in the history are
+        queued right away.
+        """
+        subscription = Subscription(user_id, start, end, wake=wake)
+        with self._lock:
+            self._by_user.setdefault(user_id, set()).add(subscription)
+            missed = [change for change in self._history if last_id is not None and change.id > last_id]
+        for change in missed:
+            subscription.notify(change)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._by_user.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._by_user[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._by_user.values())
+
+
+def _event(change):
+    return f"id: {change.id}\nevent: schedule\ndata: {change.to_json()}\n\n"
+
+
+def event_stream(broker, subscription, *, heartbeat=15, retry_ms=5000):
+    """Yield the Server-Sent Events of ``subscription`` until the client goes away.
+
+    A comment line is sent every ``heartbeat`` seconds without changes so
+    proxies keep the connection open and dead clients are noticed.
+    """
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        while True:
+            changes = subscription.wait(heartbeat)
+            if not changes:
+                yield ": keepalive\n\n"
+            for change in changes:
+                yield _event(change)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def async_event_stream(broker, subscription, ready, *, heartbeat=15, retry_ms=5000):
+    """:func:`event_stream` for a subscription whose ``wake`` sets the asyncio event ``ready``.
+
+    Publishers run in other threads, so ``wake`` must hand the event to the
+    loop with ``loop.call_soon_threadsafe(ready.set)``.
+    """
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        while True:
+            try:
+                await asyncio.wait_for(ready.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            ready.clear()
+            for change in subscription.drain():
+                yield _event(change)
+    finally:
+        broker.unsubscribe(subscription)
@@ -1,16 +1,107 @@
+import time
+
 import click
 from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
 
 from app import db
+from app.bulk import FIELDS, BulkDataError, export_rows, import_rows, read_rows, write_rows
+
+
+def _add_missing_columns():
+    """Add model columns that an existing SQLite table predates.
+
+    SQLite cannot add ``NOT NULL`` columns without a constant default, so the
+    column is added as nullable and backfilled from the column named in its
+    ``info['backfill_from']`` or else from the model's default.
+    """
+    inspector = inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                if 'backfill_from' in column.info:
+                    connection.execute(table.update().values({column.name: table.c[column.info['backfill_from']]}))
+                elif column.default is not None and column.default.is_callable:
+                    connection.execute(table.update().values({column.name: column.default.arg(None)}))
 
 
 @click.command('init-db')
 @with_appcontext
 def init_db_command():
-    """Create all database tables."""
+    """Create all database tables and any columns or indexes missing from existing ones."""
     db.create_all()
+    _add_missing_columns()
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
     click.echo('Database initialized.')
 
 
+def _format_for(path, fmt):
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+class _Progress:
+    """Report row counts and throughput on stderr."""
+
+    def __init__(self, verb):
+        self.verb = verb
+        self.started = time.perf_counter()
+
+    def rate(self, count):
+        return count / max(time.perf_counter() - self.started, 1e-9)
+
+    def __call__(self, count):
+        click.echo(f'{self.verb} {count} rows ({self.rate(count):,.0f} rows/s)', err=True)
+
+
+@click.command('import-data')
+@click.argument('kind', type=click.Choice(sorted(FIELDS)))
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension.')
+@click.option('--batch-size', default=1000, show_default=True, type=click.IntRange(min=1))
+@with_appcontext
+def import_data_command(kind, source, fmt, batch_size):
+    """Stream users, rooms or schedules from a CSV or JSON Lines file."""
+    progress = _Progress('Processed')
+    try:
+        imported, skipped = import_rows(
+            kind,
+            read_rows(source, _format_for(source.name, fmt)),
+            batch_size=batch_size,
+            progress=progress,
+        )
+    except BulkDataError as exc:
+        db.session.rollback()
+        raise click.ClickException(f'{exc} (earlier batches were committed)')
+    elapsed = time.perf_counter() - progress.started
+    click.echo(
+        f'Imported {imported} {kind} ({skipped} skipped) in {elapsed:.1f}s '
+        f'({progress.rate(imported + skipped):,.0f} rows/s).'
+    )
+
+
+@click.command('export-data')
+@click.argument('kind', type=click.Choice(sorted(FIELDS)))
+@click.argument('target', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension.')
+@click.option('--chunk-size', default=1000, show_default=True, type=click.IntRange(min=1))
+@with_appcontext
+def export_data_command(kind, target, fmt, chunk_size):
+    """Stream users, rooms or schedules to a CSV or JSON Lines file (stdout by default)."""
+    progress = _Progress('Exported')
+    count = write_rows(target, _format_for(target.name, fmt), kind, export_rows(kind, chunk_size=chunk_size))
+    progress(count)
+
+
 def register_commands(app):
     app.cli.add_command(init_db_command)
+    app.cli.add_command(import_data_command)
+    app.cli.add_command(export_data_command)
@@ -0,0 +1,79 @@
+"""Double-booking detection for rooms and attendees.
+
+Conflicts are found with the same index-backed range scans as the planner
+(``owner_id, start_time``, ``user_id, schedule_id`` and ``room_id,
+series_end``) so a save never loads the whole schedule table.  The
+candidates' occurrences are then compared lazily; for recurring series
+only the first :data:`CONFLICT_HORIZON` is checked.  Callers take
+:func:`acquire_booking_lock` before checking so two concurrent requests
+cannot both see a free slot and then both write it.
+"""
+from datetime import timedelta
+
+from sqlalchemy import select, union
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.models import Room, Schedule, User, schedule_participants
+from app.recurrence import occurrences, streams_overlap
+
+CONFLICT_HORIZON = timedelta(days=366)
+
+
+def acquire_booking_lock(*, room_id=None, user_ids=()):
+    """Hold the write lock for the rest of the current transaction.
+
+    SQLite only has a database-wide lock, taken here with ``BEGIN IMMEDIATE``
+    so a second writer waits (up to the driver's busy timeout) until the
+    first commits or rolls back.  Other databases lock the room and user
+    rows being booked instead.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+        return
+    if room_id:
+        db.session.execute(select(Room.id).where(Room.id == room_id).with_for_update())
+    if user_ids:
+        db.session.execute(select(User.id).where(User.id.in_(user_ids)).with_for_update())
+
+
+def find_conflicts(start, end, *, rule=None, room_id=None, user_ids=(), exclude_id=None):
+    """Return schedules overlapping ``[start, end)`` that share the room or an attendee.
+
+    ``rule`` is the :class:`~app.recurrence.RecurrenceRule` of the schedule
+    being saved, if any.  An attendee is either the owner or a participant
+    of a schedule.
+    """
+    series_end = rule.series_end(start, end) if rule else end
+    horizon_end = series_end if series_end - start <= CONFLICT_HORIZON else start + CONFLICT_HORIZON
+    overlaps = (Schedule.start_time < horizon_end, Schedule.series_end > start)
+    branches = []
+    if user_ids:
+        branches.append(select(Schedule.id).where(Schedule.owner_id.in_(user_ids), *overlaps))
+        branches.append(
+            select(schedule_participants.c.schedule_id)
+            .join(Schedule, Schedule.id == schedule_participants.c.schedule_id)
+            .where(schedule_participants.c.user_id.in_(user_ids), *overlaps)
+        )
+    if room_id:
+        branches.append(select(Schedule.id).where(Schedule.room_id == room_id, *overlaps))
+    if not branches:
+        return []
+
+    conflicting_ids = union(*branches) if len(branches) > 1 else branches[0]
+    query = Schedule.query.options(
+        selectinload(Schedule.participants),
+        selectinload(Schedule.exclusions),
+    ).filter(Schedule.id.in_(conflicting_ids))
+    if exclude_id is not None:
+        query = query.filter(Schedule.id != exclude_id)
+    return [
+        candidate
+        for candidate in query.order_by(Schedule.start_time.asc())
+        if streams_overlap(
+            occurrences(start, end, rule, start, horizon_end),
+            candidate.occurrences(start, horizon_end),
+        )
+    ]
@@ -0,0 +1,79 @@
+"""Engine options and per-connection SQLite tuning.
+
+:func:`engine_options` fills ``SQLALCHEMY_ENGINE_OPTIONS`` with pool sizes
+before the engine is created, and :func:`install_sqlite_pragmas` runs the
+``SQLITE_PRAGMAS`` from the config on every new DBAPI connection.  WAL lets
+readers keep going while one writer commits, and ``busy_timeout`` makes a
+second writer wait for the lock instead of failing with "database is
+locked".  In-memory databases keep Flask-SQLAlchemy's single shared
+connection and skip ``journal_mode``, which they do not support.
+
+:func:`create_async_engine` opens the same database through an asyncio
+driver (``aiosqlite`` for SQLite) for the ASGI views in
+:mod:`app.async_views`, with the same pool sizes and pragmas.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """Return ``SQLALCHEMY_ENGINE_OPTIONS`` with the configured pool sizes filled in.
+
+    Explicit options already in the config win.  Each process holds at most
+    ``DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW`` connections, so size the
+    pool to the worker's thread count.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if _is_memory_sqlite(make_url(config['SQLALCHEMY_DATABASE_URI'])):
+        return options
+    options.setdefault('pool_size', config.get('DATABASE_POOL_SIZE', 5))
+    options.setdefault('max_overflow', config.get('DATABASE_MAX_OVERFLOW', 10))
+    options.setdefault('pool_timeout', config.get('DATABASE_POOL_TIMEOUT', 30))
+    return options
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Run ``PRAGMA name = value`` for each of ``pragmas`` on every new connection."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    if _is_memory_sqlite(engine.url):
+        pragmas = {name: value for name, value in pragmas.items() if name != 'journal_mode'}
+    statements = [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def async_database_uri(config):
+    """Return ``ASYNC_DATABASE_URI``, or ``SQLALCHEMY_DATABASE_URI`` with SQLite's asyncio driver."""
+    if config.get('ASYNC_DATABASE_URI'):
+        return config['ASYNC_DATABASE_URI']
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite':
+        raise ValueError(f"No asyncio driver known for {url.drivername}; set ASYNC_DATABASE_URI.")
+    if _is_memory_sqlite(url):
+        raise ValueError("An in-memory SQLite database cannot be shared with the asyncio engine.")
+    return url.set(drivername='sqlite+aiosqlite')
+
+
+def create_async_engine(config):
+    """Create the asyncio engine for :func:`async_database_uri`.
+
+    Needs the ``aiosqlite`` and ``greenlet`` packages, which the WSGI app
+    does not, so they are only imported here.
+    """
+    from sqlalchemy.ext import asyncio
+
+    engine = asyncio.create_async_engine(async_database_uri(config), **engine_options(config))
+    install_sqlite_pragmas(engine.sync_engine, config.get('SQLITE_PRAGMAS'))
+    return engine
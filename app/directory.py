@@ -0,0 +1,109 @@
+"""Paged, prefix-searched and cached access to the user and room directories.
+
+:func:`directory_choices` serves the full ``(id, name)`` lists from the
+process-local :class:`~app.cache.ChoiceCache`.  The other lookups are range
+scans on the unique ``username`` and ``name`` indexes: keyset pages
+continue after the last name shown, and a prefix search reads ``name >=
+prefix AND name < successor(prefix)``, which SQLite answers from the index,
+unlike ``LIKE 'prefix%'`` under its default case-insensitive collation.
+Prefix matching is therefore case-sensitive.
+"""
+from flask import current_app
+from sqlalchemy import func, select
+
+from app import db
+from app.cache import DirectoryChoices
+from app.models import Room, User
+
+SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+
+def _prefix_filter(column, prefix):
+    """Conditions selecting ``column`` values that start with ``prefix``.
+
+    The upper bound increments the last character below U+10FFFF, skipping
+    surrogates, which cannot be encoded; a prefix of only U+10FFFF has no
+    upper bound.
+    """
+    head = prefix.rstrip('\U0010ffff')
+    if not head:
+        return (column >= prefix,)
+    code = ord(head[-1]) + 1
+    successor = head[:-1] + chr(0xE000 if 0xD800 <= code < 0xE000 else code)
+    return column >= prefix, column < successor
+
+
+def room_directory_version():
+    """Select the room count and latest ``updated_at``, which change with any room edit."""
+    return select(func.count(Room.id), func.max(Room.updated_at))
+
+
+def room_page_statement(*, after=None, limit=50):
+    """Select the rooms named after ``after``, one more than ``limit`` to detect a next page."""
+    statement = select(Room).order_by(Room.name).limit(limit + 1)
+    if after:
+        statement = statement.where(Room.name > after)
+    return statement
+
+
+def split_room_page(rooms, limit):
+    """Return ``(rooms, next_after)`` from the rows :func:`room_page_statement` selected."""
+    if len(rooms) > limit:
+        return rooms[:limit], rooms[limit - 1].name
+    return rooms, None
+
+
+def room_page(*, after=None, limit=50):
+    """Return ``(rooms, next_after)`` for the page of rooms named after ``after``.
+
+    ``next_after`` is the name to continue from, or ``None`` on the last page.
+    """
+    rooms = db.session.scalars(room_page_statement(after=after, limit=limit)).all()
+    return split_room_page(rooms, limit)
+
+
+def search_users(prefix, *, limit=SEARCH_LIMIT, exclude_id=None):
+    """Return up to ``limit`` ``(id, username)`` pairs whose username starts with ``prefix``."""
+    statement = select(User.id, User.username).order_by(User.username).limit(limit)
+    if prefix:
+        statement = statement.where(*_prefix_filter(User.username, prefix))
+    if exclude_id is not None:
+        statement = statement.where(User.id != exclude_id)
+    return [tuple(row) for row in db.session.execute(statement)]
+
+
+def search_rooms(prefix, *, limit=SEARCH_LIMIT):
+    """Return up to ``limit`` ``(id, name)`` pairs whose room name starts with ``prefix``."""
+    statement = select(Room.id, Room.name).order_by(Room.name).limit(limit)
+    if prefix:
+        statement = statement.where(*_prefix_filter(Room.name, prefix))
+    return [tuple(row) for row in db.session.execute(statement)]
+
+
+def _fingerprint(kind):
+    # Users are never renamed, so their count and highest id identify the
+    # list; rooms can be, which bumps ``updated_at``.
+    if kind == 'users':
+        statement = select(func.count(User.id), func.max(User.id))
+    else:
+        statement = select(func.count(Room.id), func.max(Room.updated_at))
+    return tuple(db.session.execute(statement).one())
+
+
+def directory_choices(kind):
+    """Return the :class:`~app.cache.DirectoryChoices` of ``'users'`` or ``'rooms'``.
+
+    A hit costs one aggregate query; the ordered table is only read again
+    after a commit touched the directory or the fingerprint changed.
+    """
+    cache = current_app.extensions['choice_cache']
+    version = cache.version(kind)
+    fingerprint = _fingerprint(kind)
+    choices = cache.get(kind, fingerprint)
+    if choices is None:
+        id_column, name_column = (User.id, User.username) if kind == 'users' else (Room.id, Room.name)
+        items = tuple(tuple(row) for row in db.session.execute(select(id_column, name_column).order_by(name_column)))
+        choices = DirectoryChoices(items=items, labels=dict(items))
+        cache.set(kind, version, fingerprint, choices)
+    return choices
@@ -1,6 +1,6 @@
 from flask_wtf import FlaskForm
-from wtforms import DateTimeLocalField, IntegerField, PasswordField, SelectField, SelectMultipleField, StringField, SubmitField
-from wtforms.validators import DataRequired, EqualTo, Length, NumberRange, Optional
+from wtforms import DateField, DateTimeLocalField, IntegerField, PasswordField, SelectField, SelectMultipleField, StringField, SubmitField
+from wtforms.validators import DataRequired, EqualTo, Length, NumberRange, Optional, ValidationError
 
 
 class RegistrationForm(FlaskForm):
@@ -21,10 +21,35 @@ class ScheduleForm(FlaskForm):
     start_time = DateTimeLocalField('Start Time', format='%Y-%m-%dT%H:%M', validators=[DataRequired()])
     end_time = DateTimeLocalField('End Time', format='%Y-%m-%dT%H:%M', validators=[DataRequired()])
     location = StringField('Location', validators=[Optional(), Length(max=140)])
-    room = SelectField('Meeting Room', coerce=int, choices=[])
-    participants = SelectMultipleField('Share with Team Members', coerce=int, choices=[])
+    # Submitted ids are checked against ``room_ids``/``participant_ids``, which
+    # the routes set to the cached id -> name lookups, instead of scanning the
+    # rendered choices (which may only hold the selected entries).
+    room = SelectField('Meeting Room', coerce=int, choices=[], validate_choice=False)
+    participants = SelectMultipleField('Share with Team Members', coerce=int, choices=[], validate_choice=False)
+    # Checked against ``app.recurrence.FREQUENCIES`` by the routes so schedules
+    # saved before recurrence existed (``None``) still validate.
+    recurrence = SelectField(
+        'Repeat',
+        choices=[('', 'Does not repeat'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')],
+        validate_choice=False,
+    )
+    recurrence_until = DateField('Repeat Until', validators=[Optional()])
+    recurrence_count = IntegerField('Number of Occurrences', validators=[Optional(), NumberRange(min=1, max=1000)])
+    recurrence_exclusions = StringField('Skip Dates', validators=[Optional(), Length(max=2000)])
     submit = SubmitField('Save')
 
+    room_ids = {}
+    participant_ids = {}
+
+    def validate_room(self, field):
+        if field.data and field.data not in self.room_ids:
+            raise ValidationError('Not a valid choice.')
+
+    def validate_participants(self, field):
+        unknown = [str(value) for value in field.data or () if value not in self.participant_ids]
+        if unknown:
+            raise ValidationError(f"'{', '.join(unknown)}' is not a valid choice for this field.")
+
 
 class RoomForm(FlaskForm):
     name = StringField('Name', validators=[DataRequired(), Length(max=64)])
@@ -0,0 +1,64 @@
+"""Cached rendering of the planner grid's fragments.
+
+The grid's skeleton (the time column and each day's empty cells) only
+depends on the slot configuration and the date, and an event block only
+on the event fields it shows, so both are rendered once and reused from
+the :class:`~app.cache.FragmentCache` by every planner that needs them.
+Keys contain everything a fragment displays (an event's title, times,
+layout, room, participants, ...), which makes them event versions: an
+edit produces a new key and the old block simply ages out of the LRU.
+"""
+from flask import current_app
+from markupsafe import Markup
+
+from app.cache import FragmentCache
+
+EVENT_FIELDS = (
+    'id', 'title', 'location', 'room', 'is_owner', 'start_minutes', 'duration_minutes',
+    'column_offset', 'column_span', 'display_start', 'display_end', 'aria_label',
+)
+
+
+def _cached(key, template_name, **context):
+    cache = current_app.extensions['fragment_cache']
+    html = cache.get(key)
+    if html is None:
+        html = Markup(current_app.jinja_env.get_template(template_name).render(**context))
+        cache.set(key, html)
+    return html
+
+
+def _slot_config(planner):
+    return planner['start_hour'], planner['end_hour'], planner['slot_minutes']
+
+
+def planner_time_column(planner):
+    """The row headers of the grid's time slots."""
+    return _cached(
+        ('time-column', *_slot_config(planner)), 'partials/planner_time_column.html', hours=planner['hours']
+    )
+
+
+def planner_day_cells(planner, day):
+    """The empty, labelled cells of one day column."""
+    return _cached(
+        ('day-cells', day['long_label'], *_slot_config(planner)),
+        'partials/planner_cells.html',
+        hours=planner['hours'],
+        long_label=day['long_label'],
+    )
+
+
+def planner_event(event):
+    """The block of one event laid out in a day column."""
+    key = ('event', *(event[field] for field in EVENT_FIELDS), tuple(event['participants']))
+    return _cached(key, 'partials/planner_event.html', event=event)
+
+
+def init_app(app):
+    app.extensions['fragment_cache'] = FragmentCache(maxsize=app.config.get('FRAGMENT_CACHE_SIZE', 8192))
+    app.jinja_env.globals.update(
+        planner_time_column=planner_time_column,
+        planner_day_cells=planner_day_cells,
+        planner_event=planner_event,
+    )
@@ -0,0 +1,137 @@
+"""Common free time of a group of people and candidate rooms.
+
+The busy schedules of everyone involved are read with the overlay's single
+``UNION`` query.  Every person's occurrences go into one list that is
+sorted and merged into the group's disjoint busy intervals; each candidate
+room gets its own merged list.  A sweep then walks the working-hour windows
+and the group's busy intervals together, and inside each free gap steps
+through candidate starts, checking the rooms with a bisect into their busy
+lists, until ``limit`` slots are found.
+"""
+from bisect import bisect_right
+from datetime import timedelta
+from typing import NamedTuple
+
+from app.overlay import load_schedules
+
+MAX_HORIZON = timedelta(weeks=4)
+
+
+class FreeSlot(NamedTuple):
+    start: object
+    end: object
+    room_ids: tuple  # candidate rooms free for the whole slot, in the given order
+
+
+def merge_intervals(intervals):
+    """Sort ``(start, end)`` pairs and merge overlapping or touching ones."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def working_windows(start, end, *, day_start_hour, day_end_hour, weekends=False):
+    """Yield the working-hour ``(start, end)`` windows of each day inside ``[start, end)``."""
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        if weekends or day.weekday() < 5:
+            window_start = max(day + timedelta(hours=day_start_hour), start)
+            window_end = min(day + timedelta(hours=day_end_hour), end)
+            if window_start < window_end:
+                yield window_start, window_end
+        day += timedelta(days=1)
+
+
+def free_gaps(windows, busy):
+    """Subtract the sorted, disjoint ``busy`` intervals from the sorted ``windows``."""
+    index = 0
+    for window_start, window_end in windows:
+        while index < len(busy) and busy[index][1] <= window_start:
+            index += 1
+        cursor = window_start
+        position = index
+        while position < len(busy) and busy[position][0] < window_end:
+            busy_start, busy_end = busy[position]
+            if busy_start > cursor:
+                yield cursor, busy_start
+            cursor = max(cursor, busy_end)
+            position += 1
+        if cursor < window_end:
+            yield cursor, window_end
+
+
+def _blocking(busy, starts, slot_start, slot_end):
+    """Return the end of the busy interval overlapping the slot, or ``None``."""
+    index = bisect_right(starts, slot_start) - 1
+    if index >= 0 and busy[index][1] > slot_start:
+        return busy[index][1]
+    if index + 1 < len(busy) and busy[index + 1][0] < slot_end:
+        return busy[index + 1][1]
+    return None
+
+
+def _align(moment, origin, step):
+    """Round ``moment`` up to the next multiple of ``step`` after ``origin``."""
+    return origin + -((origin - moment) // step) * step
+
+
+def find_free_slots(user_ids, room_ids=(), *, start, end, duration, day_start_hour, day_end_hour,
+                    step=timedelta(minutes=30), limit=5, weekends=False):
+    """Return up to ``limit`` of the earliest :class:`FreeSlot` of ``duration``.
+
+    A slot is free when none of ``user_ids`` owns or attends anything in it
+    and, if ``room_ids`` are given, at least one of those rooms is unbooked.
+    Slots start on ``step`` boundaries counted from the start of the working
+    day and may overlap each other, like a scheduling assistant's suggestions.
+    """
+    user_ids, room_ids = set(user_ids), list(dict.fromkeys(room_ids))
+    schedules, attendees = load_schedules(user_ids, set(room_ids), start, end)
+
+    people, rooms = [], {room_id: [] for room_id in room_ids}
+    for schedule in schedules:
+        involves_people = schedule.owner_id in user_ids or bool(attendees.get(schedule.id))
+        booked_room = rooms.get(schedule.room_id)
+        if not involves_people and booked_room is None:
+            continue
+        for interval in schedule.occurrences(start, end):
+            if involves_people:
+                people.append(interval)
+            if booked_room is not None:
+                booked_room.append(interval)
+    people = merge_intervals(people)
+    rooms = {room_id: merge_intervals(busy) for room_id, busy in rooms.items()}
+    room_starts = {room_id: [interval[0] for interval in busy] for room_id, busy in rooms.items()}
+
+    windows = working_windows(
+        start, end, day_start_hour=day_start_hour, day_end_hour=day_end_hour, weekends=weekends
+    )
+    slots = []
+    for gap_start, gap_end in free_gaps(list(windows), people):
+        day_origin = gap_start.replace(hour=day_start_hour, minute=0, second=0, microsecond=0)
+        slot_start = _align(gap_start, day_origin, step)
+        while slot_start + duration <= gap_end:
+            slot_end = slot_start + duration
+            if not room_ids:
+                slots.append(FreeSlot(slot_start, slot_end, ()))
+            else:
+                free_rooms, next_free = [], None
+                for room_id in room_ids:
+                    blocked_until = _blocking(rooms[room_id], room_starts[room_id], slot_start, slot_end)
+                    if blocked_until is None:
+                        free_rooms.append(room_id)
+                    elif next_free is None or blocked_until < next_free:
+                        next_free = blocked_until
+                if not free_rooms:
+                    # Skip straight past the earliest room booking that ends.
+                    slot_start = _align(next_free, day_origin, step)
+                    continue
+                slots.append(FreeSlot(slot_start, slot_end, tuple(free_rooms)))
+            if len(slots) == limit:
+                return slots
+            slot_start += step
+    return slots
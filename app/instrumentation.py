@@ -0,0 +1,215 @@
+"""Opt-in request timing exposed as Server-Timing headers and ``/metrics``.
+
+Enabled with ``INSTRUMENTATION_ENABLED``.  Each request records its wall
+time, the number and total time of SQL statements (from cursor events),
+template render time and planner build time.  The totals are sent back in
+a ``Server-Timing`` header and folded into per-endpoint histograms served
+in the Prometheus text format at ``/metrics``.  Code paths worth measuring
+wrap themselves in :func:`timed`, which does nothing while disabled.
+
+Phases are exclusive: time spent in a nested phase (SQL or a planner build
+while a template renders, a template rendered inside another) counts only
+towards the innermost one, so the phases never add up to more than the
+request's total.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+from flask import Response, before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from app import db
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# Server-Timing name and description of each timed phase.
+PHASES = {
+    'sql': 'SQL',
+    'template': 'Templates',
+    'planner': 'Planner build',
+}
+
+
+class Histogram:
+    """Cumulative Prometheus histogram with one series per label value."""
+
+    def __init__(self, name, help_text, buckets, label='endpoint'):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label = label
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, label_value, value):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_value, (counts, total, count) in sorted(self._series.items()):
+                label = f'{self.label}="{_escape(label_value)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{label}}} {total:.6f}')
+                lines.append(f'{self.name}_count{{{label}}} {count}')
+        return lines
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    def __init__(self):
+        self.request_seconds = Histogram(
+            'scheduler_request_duration_seconds', 'Wall time of each request.', DURATION_BUCKETS
+        )
+        self.sql_seconds = Histogram(
+            'scheduler_sql_duration_seconds', 'Total SQL time per request.', DURATION_BUCKETS
+        )
+        self.sql_statements = Histogram(
+            'scheduler_sql_statements', 'SQL statements executed per request.', COUNT_BUCKETS
+        )
+        self.template_seconds = Histogram(
+            'scheduler_template_render_seconds', 'Template render time per request.', DURATION_BUCKETS
+        )
+        self.planner_seconds = Histogram(
+            'scheduler_planner_build_seconds', 'Planner build time per request.', DURATION_BUCKETS
+        )
+
+    def record(self, endpoint, elapsed, timings):
+        self.request_seconds.observe(endpoint, elapsed)
+        self.sql_seconds.observe(endpoint, timings['sql'])
+        self.sql_statements.observe(endpoint, timings['sql_count'])
+        self.template_seconds.observe(endpoint, timings['template'])
+        self.planner_seconds.observe(endpoint, timings['planner'])
+
+    def expose(self):
+        lines = []
+        for histogram in (
+            self.request_seconds, self.sql_seconds, self.sql_statements, self.template_seconds, self.planner_seconds
+        ):
+            lines.extend(histogram.expose())
+        return '\n'.join(lines) + '\n'
+
+
+def _current_timings():
+    return g.get('_timings') if has_request_context() else None
+
+
+def _enter(phase):
+    g._phase_stack.append([phase, time.perf_counter(), 0.0])
+
+
+def _leave(phase):
+    """Close ``phase``, adding its time minus that of the phases nested in it.
+
+    Phases left open by an exception inside them are discarded.
+    """
+    now = time.perf_counter()
+    stack = g._phase_stack
+    while stack:
+        name, started, nested = stack.pop()
+        if name == phase:
+            break
+    else:
+        return
+    elapsed = now - started
+    g._timings[phase] += elapsed - nested
+    if stack:
+        stack[-1][2] += elapsed
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block, less nested phases, to ``phase`` of the current request."""
+    if _current_timings() is None:
+        yield
+        return
+    _enter(phase)
+    try:
+        yield
+    finally:
+        _leave(phase)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['_query_started'].pop()
+    timings = _current_timings()
+    if timings is not None:
+        timings['sql'] += elapsed
+        timings['sql_count'] += 1
+        if g._phase_stack:
+            g._phase_stack[-1][2] += elapsed
+
+
+def _before_render(sender, template, context, **extra):
+    if _current_timings() is not None:
+        _enter('template')
+
+
+def _after_render(sender, template, context, **extra):
+    if _current_timings() is not None:
+        _leave('template')
+
+
+def _server_timing(elapsed, timings):
+    parts = [f'total;dur={elapsed * 1000:.2f}']
+    for phase, description in PHASES.items():
+        if phase == 'sql':
+            description = f'{description} ({timings["sql_count"]} statements)'
+        parts.append(f'{phase};dur={timings[phase] * 1000:.2f};desc="{description}"')
+    return ', '.join(parts)
+
+
+def init_app(app):
+    """Register the instrumentation hooks and ``/metrics`` if enabled in the config."""
+    if not app.config.get('INSTRUMENTATION_ENABLED'):
+        return
+    metrics = app.extensions['metrics'] = Metrics()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def _begin_timing():
+        g._timings = {'sql': 0.0, 'sql_count': 0, 'template': 0.0, 'planner': 0.0}
+        g._phase_stack = []
+        g._request_started = time.perf_counter()
+
+    @app.after_request
+    def _finish_timing(response):
+        timings = g.pop('_timings', None)
+        if timings is None:
+            return response
+        elapsed = time.perf_counter() - g.pop('_request_started')
+        response.headers['Server-Timing'] = _server_timing(elapsed, timings)
+        metrics.record(request.endpoint or 'unmatched', elapsed, timings)
+        return response
+
+    def metrics_view():
+        return Response(metrics.expose(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,69 @@
+"""Column layout for overlapping planner events.
+
+Events that overlap in time are grouped into clusters and placed side by
+side.  Each event takes the lowest column that is free when it starts and
+every event in a cluster shares the cluster's width.  The sweep keeps the
+active events in a heap ordered by end time and recycles released columns
+through a second heap, so a day with ``n`` events is laid out in
+``O(n log n)`` instead of rescanning the active set for every event.
+"""
+import heapq
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class ColumnLayout(NamedTuple):
+    column: int
+    column_span: int
+
+
+def assign_columns(intervals):
+    """Lay out ``(start, end)`` intervals and return one ``ColumnLayout`` each.
+
+    Results are returned in input order.  Intervals are processed by
+    ``(start, end)`` with ties keeping their input order.
+    """
+    order = sorted(range(len(intervals)), key=lambda index: intervals[index])
+    columns = [0] * len(intervals)
+    spans = [1] * len(intervals)
+
+    active = []  # (end, column) of events still running
+    free_columns = []
+    cluster = []
+    cluster_width = 0
+
+    for index in order:
+        start, end = intervals[index]
+        while active and active[0][0] <= start:
+            heapq.heappush(free_columns, heapq.heappop(active)[1])
+        if not active:
+            for member in cluster:
+                spans[member] = cluster_width
+            cluster = []
+            cluster_width = 0
+            free_columns = []
+
+        if free_columns:
+            column = heapq.heappop(free_columns)
+        else:
+            column = cluster_width
+            cluster_width += 1
+        columns[index] = column
+        cluster.append(index)
+        heapq.heappush(active, (end, column))
+
+    for member in cluster:
+        spans[member] = cluster_width
+
+    return [ColumnLayout(column, span) for column, span in zip(columns, spans)]
+
+
+@lru_cache(maxsize=4096)
+def cached_columns(intervals):
+    """:func:`assign_columns` memoised on a tuple of ``(start, end)`` intervals.
+
+    A day's layout only depends on its intervals, so days shared by
+    overlapping planner windows (a week, the 4 weeks around it, the month)
+    are laid out once.
+    """
+    return tuple(assign_columns(intervals))
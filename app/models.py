@@ -1,13 +1,25 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 
 from app import db, login
+from app.recurrence import RecurrenceRule, occurrences
+from flask import current_app, has_app_context
 from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import make_transient_to_detached
 from werkzeug.security import check_password_hash, generate_password_hash
 
+def week_start_of(moment):
+    """Return midnight of the Monday starting the planner week of ``moment``."""
+    week_start = moment - timedelta(days=moment.weekday())
+    return week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
 schedule_participants = db.Table(
     'schedule_participants',
     db.Column('schedule_id', db.Integer, db.ForeignKey('schedule.id'), primary_key=True),
-    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    db.Index('ix_schedule_participants_user_id_schedule_id', 'user_id', 'schedule_id'),
 )
 
 
@@ -24,31 +36,88 @@ class User(UserMixin, db.Model):
     )
 
     def set_password(self, password):
-        """Generate a password hash using a broadly supported algorithm."""
-        # Some Python builds omit ``hashlib.scrypt`` which Werkzeug may default to
-        # when selecting a hashing algorithm. Explicitly request PBKDF2 to stay
-        # compatible across environments that lack ``scrypt`` support.
-        self.password_hash = generate_password_hash(password, method="pbkdf2:sha256")
+        """Hash ``password`` with the configured ``PASSWORD_HASH_METHOD``."""
+        self.password_hash = generate_password_hash(password, method=_password_hash_method())
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    def password_needs_rehash(self):
+        """Return whether the stored hash was made with another hash policy."""
+        return self.password_hash.split('$', 1)[0] != _hash_prefix(_password_hash_method())
+
     def __repr__(self):
         return f'<User {self.username}>'
 
 
+def _password_hash_method():
+    # Some Python builds omit ``hashlib.scrypt`` which Werkzeug may default to
+    # when selecting a hashing algorithm, so the fallback requests PBKDF2.
+    if has_app_context():
+        return current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+    return 'pbkdf2:sha256'
+
+
+@lru_cache(maxsize=8)
+def _hash_prefix(method):
+    """Return the ``method`` part Werkzeug stores for hashes made with ``method``.
+
+    Hashing once resolves defaults such as the PBKDF2 iteration count the
+    same way :func:`generate_password_hash` does.
+    """
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
 @login.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    """Load the session's user, reusing a copy loaded in the last ``LOGIN_CACHE_TTL`` seconds.
+
+    The cached copy is detached and merged into the current session without
+    a ``SELECT``; commits that change or delete a user drop it.
+    """
+    user_id = int(user_id)
+    cache = current_app.extensions.get('identity_cache')
+    cached = cache.get(user_id) if cache is not None else None
+    if cached is not None:
+        return db.session.merge(cached, load=False)
+    user = db.session.get(User, user_id)
+    if user is not None and cache is not None:
+        cache_user(cache, user)
+    return user
+
+
+def cache_user(cache, user):
+    """Store a detached copy of ``user``'s columns in the identity ``cache``."""
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(snapshot)
+    cache.set(user.id, snapshot)
 
 
 class Schedule(db.Model):
+    __table_args__ = (
+        db.Index('ix_schedule_owner_id_start_time', 'owner_id', 'start_time'),
+        db.Index('ix_schedule_room_id_series_end', 'room_id', 'series_end', 'start_time'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(140), nullable=False)
     start_time = db.Column(db.DateTime, index=True, nullable=False)
-    end_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, index=True, nullable=False)
     location = db.Column(db.String(140))
+    recurrence = db.Column(db.String(16))
+    recurrence_until = db.Column(db.Date)
+    recurrence_count = db.Column(db.Integer)
+    # End of the last occurrence (``end_time`` for one-off schedules) so range
+    # queries can find recurring series with a single comparison.
+    series_end = db.Column(
+        db.DateTime,
+        default=lambda context: context.get_current_parameters()['end_time'],
+        index=True,
+        nullable=False,
+        info={'backfill_from': 'end_time'},
+    )
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     owner = db.relationship('User', back_populates='schedules')
     room_id = db.Column(db.Integer, db.ForeignKey('room.id'))
@@ -58,19 +127,185 @@ class Schedule(db.Model):
         secondary=schedule_participants,
         back_populates='shared_schedules'
     )
+    exclusions = db.relationship(
+        'RecurrenceExclusion',
+        back_populates='schedule',
+        cascade='all, delete-orphan',
+        order_by='RecurrenceExclusion.occurrence_date',
+    )
 
     def is_owned_by(self, user):
         return self.owner_id == user.id
 
+    @property
+    def recurrence_rule(self):
+        if not self.recurrence:
+            return None
+        return RecurrenceRule(
+            self.recurrence,
+            until=self.recurrence_until,
+            count=self.recurrence_count,
+            excluded=frozenset(exclusion.occurrence_date for exclusion in self.exclusions),
+        )
+
+    def occurrences(self, window_start=None, window_end=None):
+        """Lazily yield ``(start, end)`` of occurrences overlapping the window."""
+        return occurrences(self.start_time, self.end_time, self.recurrence_rule, window_start, window_end)
+
+    def compute_series_end(self):
+        rule = self.recurrence_rule
+        return rule.series_end(self.start_time, self.end_time) if rule else self.end_time
+
+    def planner_scope(self):
+        """Return the user ids and time range whose planners show this schedule."""
+        owner_id = self.owner_id if self.owner_id is not None else self.owner.id
+        user_ids = {owner_id} | {user.id for user in self.participants}
+        return user_ids, self.start_time, self.compute_series_end()
+
     def __repr__(self):
         return f'<Schedule {self.title}>'
 
 
+class RecurrenceExclusion(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('schedule_id', 'occurrence_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    schedule_id = db.Column(db.Integer, db.ForeignKey('schedule.id'), nullable=False)
+    schedule = db.relationship('Schedule', back_populates='exclusions')
+    occurrence_date = db.Column(db.Date, nullable=False)
+
+    def __repr__(self):
+        return f'<RecurrenceExclusion {self.schedule_id} {self.occurrence_date}>'
+
+
 class Room(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), unique=True, nullable=False)
     capacity = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     schedules = db.relationship('Schedule', back_populates='room', lazy='dynamic')
 
     def __repr__(self):
         return f'<Room {self.name}>'
+
+
+def _persisted_planner_scopes(session, criterion):
+    """Return ``(user_ids, start, end)`` for stored schedules matching ``criterion``.
+
+    Reads the rows as they are in the database, i.e. before the pending
+    flush, so edits invalidate the planners the schedule is leaving as
+    well as the ones it moves into.
+    """
+    rows = session.execute(
+        select(Schedule.id, Schedule.owner_id, Schedule.start_time, Schedule.series_end).where(criterion)
+    ).all()
+    if not rows:
+        return []
+    participants = {}
+    for schedule_id, user_id in session.execute(
+        select(schedule_participants.c.schedule_id, schedule_participants.c.user_id).where(
+            schedule_participants.c.schedule_id.in_([row.id for row in rows])
+        )
+    ):
+        participants.setdefault(schedule_id, set()).add(user_id)
+    return [
+        ({row.owner_id} | participants.get(row.id, set()), row.start_time, row.series_end)
+        for row in rows
+    ]
+
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_planner_scopes(session, flush_context, instances):
+    scopes = session.info.setdefault('planner_scopes', [])
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Schedule):
+                scopes.append(obj.planner_scope())
+        for obj in session.dirty:
+            if isinstance(obj, Schedule):
+                scopes.extend(_persisted_planner_scopes(session, Schedule.id == obj.id))
+                scopes.append(obj.planner_scope())
+            elif isinstance(obj, Room) and inspect(obj).attrs.name.history.has_changes():
+                scopes.extend(_persisted_planner_scopes(session, Schedule.room_id == obj.id))
+        for obj in session.deleted:
+            if isinstance(obj, Schedule):
+                scopes.extend(_persisted_planner_scopes(session, Schedule.id == obj.id))
+
+
+@event.listens_for(db.session, 'before_flush')
+def _stamp_schedules(session, flush_context, instances):
+    for obj in session.new:
+        if isinstance(obj, Schedule):
+            obj.series_end = obj.compute_series_end()
+    # ``onupdate`` only fires for column changes; participant and exclusion
+    # edits leave the schedule row alone, so bump ``updated_at`` explicitly.
+    for obj in session.dirty:
+        if isinstance(obj, Schedule) and session.is_modified(obj):
+            obj.updated_at = datetime.utcnow()
+            obj.series_end = obj.compute_series_end()
+
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_changed_users(session, flush_context, instances):
+    changed = session.info.setdefault('changed_user_ids', set())
+    for obj in session.dirty:
+        if isinstance(obj, User) and session.is_modified(obj):
+            changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_changed_directories(session, flush_context, instances):
+    """Note whether the flush adds, renames or removes users or rooms."""
+    changed = session.info.setdefault('changed_directories', set())
+    for obj in session.new | session.deleted:
+        if isinstance(obj, User):
+            changed.add('users')
+        elif isinstance(obj, Room):
+            changed.add('rooms')
+    for obj in session.dirty:
+        if isinstance(obj, User) and inspect(obj).attrs.username.history.has_changes():
+            changed.add('users')
+        elif isinstance(obj, Room) and inspect(obj).attrs.name.history.has_changes():
+            changed.add('rooms')
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_choice_cache(session):
+    kinds = session.info.pop('changed_directories', None)
+    if kinds and has_app_context():
+        cache = current_app.extensions.get('choice_cache')
+        if cache is not None:
+            cache.invalidate(kinds)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_identity_cache(session):
+    user_ids = session.info.pop('changed_user_ids', None)
+    if user_ids and has_app_context():
+        cache = current_app.extensions.get('identity_cache')
+        if cache is not None:
+            cache.invalidate(user_ids)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_planner_cache(session):
+    scopes = session.info.pop('planner_scopes', [])
+    if not scopes or not has_app_context():
+        return
+    cache = current_app.extensions.get('planner_cache')
+    if cache is None:
+        return
+    for user_ids, start, end in scopes:
+        cache.invalidate(user_ids, start, end)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_planner_scopes(session, previous_transaction):
+    session.info.pop('planner_scopes', None)
+    session.info.pop('changed_user_ids', None)
+    session.info.pop('changed_directories', None)
@@ -0,0 +1,145 @@
+"""Overlay of many users' and rooms' calendars with per-slot busy counts.
+
+All selected calendars are read with one ``UNION`` of index range scans
+(owned, attended and booked schedules), so a schedule shared by several
+selected people is loaded once however many calendars it belongs to.
+Titles are only exposed for schedules the viewer owns or attends; the rest
+of the overlay shows them as busy time.
+Each calendar's occurrences are merged into disjoint busy intervals and
+added to a difference array over the slots, so a slot counts how many
+selected calendars are busy in it and a person booked twice at once still
+counts once.
+"""
+from datetime import timedelta
+from typing import NamedTuple
+
+from sqlalchemy import select, union
+from sqlalchemy.orm import joinedload, selectinload
+
+from app import db
+from app.models import Schedule, schedule_participants
+
+MAX_CALENDARS = 100
+
+
+class OverlayEvent(NamedTuple):
+    schedule: Schedule
+    start: object
+    end: object
+    calendars: tuple  # ``('user', id)`` / ``('room', id)`` keys
+    visible: bool  # whether the viewer may see the schedule's details
+
+
+class Overlay(NamedTuple):
+    events: list
+    slot_starts: list
+    busy: list  # per slot, number of busy calendars
+
+
+def _overlapping(start, end):
+    return Schedule.start_time < end, Schedule.series_end > start
+
+
+def load_schedules(user_ids, room_ids, start, end, *, viewer_id=None):
+    """Return ``(schedules, attendees)`` for the selected calendars in ``[start, end)``.
+
+    ``attendees`` maps schedule ids to the selected users (and the viewer)
+    attending as participants; owners are read from the schedules themselves.
+    """
+    branches = []
+    if user_ids:
+        branches.append(select(Schedule.id).where(Schedule.owner_id.in_(user_ids), *_overlapping(start, end)))
+        branches.append(
+            select(schedule_participants.c.schedule_id)
+            .join(Schedule, Schedule.id == schedule_participants.c.schedule_id)
+            .where(schedule_participants.c.user_id.in_(user_ids), *_overlapping(start, end))
+        )
+    if room_ids:
+        branches.append(select(Schedule.id).where(Schedule.room_id.in_(room_ids), *_overlapping(start, end)))
+    if not branches:
+        return [], {}
+
+    schedules = (
+        Schedule.query.options(joinedload(Schedule.room), selectinload(Schedule.exclusions))
+        .filter(Schedule.id.in_(union(*branches)))
+        .order_by(Schedule.start_time)
+        .all()
+    )
+    attendees = {}
+    attendee_ids = set(user_ids) | ({viewer_id} if viewer_id is not None else set())
+    if attendee_ids and schedules:
+        for schedule_id, user_id in db.session.execute(
+            select(schedule_participants.c.schedule_id, schedule_participants.c.user_id).where(
+                schedule_participants.c.schedule_id.in_([schedule.id for schedule in schedules]),
+                schedule_participants.c.user_id.in_(attendee_ids),
+            )
+        ):
+            attendees.setdefault(schedule_id, set()).add(user_id)
+    return schedules, attendees
+
+
+def _merged(intervals):
+    """Merge ``(start, end)`` slot-index intervals into sorted disjoint ones."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def build_overlay(user_ids, room_ids, *, viewer_id, start, days, slot_minutes, day_start_hour, day_end_hour):
+    """Overlay the calendars over ``days`` days of working hours cut into slots."""
+    user_ids, room_ids = set(user_ids), set(room_ids)
+    end = start + timedelta(days=days)
+    schedules, attendees = load_schedules(user_ids, room_ids, start, end, viewer_id=viewer_id)
+
+    slot = timedelta(minutes=slot_minutes)
+    slots_per_day = (day_end_hour - day_start_hour) * 60 // slot_minutes
+    day_starts = [start + timedelta(days=index, hours=day_start_hour) for index in range(days)]
+    slot_starts = [day_start + slot * index for day_start in day_starts for index in range(slots_per_day)]
+
+    events = []
+    busy_intervals = {}
+    for schedule in schedules:
+        attending = attendees.get(schedule.id, set())
+        visible = schedule.owner_id == viewer_id or viewer_id in attending
+        calendars = []
+        if schedule.owner_id in user_ids:
+            calendars.append(('user', schedule.owner_id))
+        calendars.extend(('user', user_id) for user_id in sorted(attending & user_ids))
+        if schedule.room_id in room_ids:
+            calendars.append(('room', schedule.room_id))
+        calendars = tuple(dict.fromkeys(calendars))
+
+        for occurrence_start, occurrence_end in schedule.occurrences(start, end):
+            events.append(OverlayEvent(schedule, occurrence_start, occurrence_end, calendars, visible))
+            # Clip to each day's working hours and convert to slot indexes.
+            first_day = max((occurrence_start - start).days, 0)
+            last_day = min((occurrence_end - start - timedelta(microseconds=1)).days, days - 1)
+            for day_index in range(first_day, last_day + 1):
+                day_start = day_starts[day_index]
+                day_end = day_start + slot * slots_per_day
+                clipped_start, clipped_end = max(occurrence_start, day_start), min(occurrence_end, day_end)
+                if clipped_end <= clipped_start:
+                    continue
+                offset = day_index * slots_per_day
+                first_slot = offset + (clipped_start - day_start) // slot
+                last_slot = offset + -((day_start - clipped_end) // slot)  # ceiling
+                for calendar in calendars:
+                    busy_intervals.setdefault(calendar, []).append((first_slot, last_slot))
+
+    delta = [0] * (len(slot_starts) + 1)
+    for intervals in busy_intervals.values():
+        for first_slot, last_slot in _merged(intervals):
+            delta[first_slot] += 1
+            delta[last_slot] -= 1
+    busy, running = [], 0
+    for change in delta[:-1]:
+        running += change
+        busy.append(running)
+
+    events.sort(key=lambda event: (event.start, event.end, event.schedule.id))
+    return Overlay(events=events, slot_starts=slot_starts, busy=busy)
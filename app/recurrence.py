@@ -0,0 +1,118 @@
+"""Recurrence rules and lazy occurrence expansion.
+
+A recurring schedule is stored once with its first occurrence in
+``start_time``/``end_time`` plus a :class:`RecurrenceRule`.  Occurrences are
+produced by generators that jump straight to the requested window, so a
+series spanning years is never expanded beyond the days being looked at.
+Monthly series on days a month lacks (e.g. the 31st) fall on that month's
+last day.
+"""
+from calendar import monthrange
+from datetime import datetime, time, timedelta
+from typing import FrozenSet, NamedTuple, Optional
+
+FREQUENCIES = ('daily', 'weekly', 'monthly')
+STEPS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+# ``series_end`` of a series without ``until`` or ``count``; keeps range
+# filters on that column a plain comparison.
+UNBOUNDED = datetime(9999, 12, 31)
+
+
+def _add_months(moment, months):
+    year, month = divmod(moment.month - 1 + months, 12)
+    year += moment.year
+    month += 1
+    return moment.replace(year=year, month=month, day=min(moment.day, monthrange(year, month)[1]))
+
+
+class RecurrenceRule(NamedTuple):
+    frequency: str
+    until: Optional[object] = None  # ``date`` of the last allowed occurrence
+    count: Optional[int] = None
+    excluded: FrozenSet = frozenset()  # ``date``s whose occurrence is skipped
+
+    def nth_start(self, start, index):
+        if self.frequency == 'monthly':
+            return _add_months(start, index)
+        return start + STEPS[self.frequency] * index
+
+    def series_end(self, start, end):
+        """Return an upper bound for the end of the series' last occurrence."""
+        duration = end - start
+        if self.count is not None:
+            return self.nth_start(start, self.count - 1) + duration
+        if self.until is not None:
+            return datetime.combine(self.until, time()) + timedelta(days=1) + duration
+        return UNBOUNDED
+
+    def errors(self, start, end):
+        """Return ``(field, message)`` pairs for what makes the rule unusable from ``start``.
+
+        ``field`` names the schedule column or form field at fault.
+        """
+        errors = []
+        if self.until and self.count:
+            errors.append(('recurrence_count', 'Set either an end date or a number of occurrences, not both.'))
+        if self.until and self.until < start.date():
+            errors.append(('recurrence_until', 'Repeat until must be on or after the start date.'))
+        if not errors:
+            try:
+                self.series_end(start, end)
+            except (OverflowError, ValueError):
+                field = 'recurrence_count' if self.count else 'recurrence_until'
+                errors.append((field, 'The series must end before the year 10000.'))
+        return errors
+
+    def _first_index(self, start, duration, window_start):
+        """Index of an occurrence that ends before ``window_start``, or 0."""
+        target = window_start - duration
+        if target <= start:
+            return 0
+        if self.frequency == 'monthly':
+            months = (target.year - start.year) * 12 + target.month - start.month
+            return max(months - 1, 0)
+        return (target - start) // STEPS[self.frequency]
+
+    def occurrences(self, start, end, window_start=None, window_end=None):
+        """Yield ``(start, end)`` of occurrences overlapping the window, in order."""
+        duration = end - start
+        index = self._first_index(start, duration, window_start) if window_start is not None else 0
+        while self.count is None or index < self.count:
+            occurrence_start = self.nth_start(start, index)
+            index += 1
+            if self.until is not None and occurrence_start.date() > self.until:
+                return
+            if window_end is not None and occurrence_start >= window_end:
+                return
+            occurrence_end = occurrence_start + duration
+            if window_start is not None and occurrence_end <= window_start:
+                continue
+            if occurrence_start.date() in self.excluded:
+                continue
+            yield occurrence_start, occurrence_end
+
+
+def occurrences(start, end, rule=None, window_start=None, window_end=None):
+    """Yield occurrences of a possibly one-off ``[start, end)`` inside the window."""
+    if rule is not None:
+        yield from rule.occurrences(start, end, window_start, window_end)
+        return
+    if (window_start is None or end > window_start) and (window_end is None or start < window_end):
+        yield start, end
+
+
+def streams_overlap(first, second):
+    """Return whether two start-ordered occurrence streams share any instant."""
+    first, second = iter(first), iter(second)
+    a, b = next(first, None), next(second, None)
+    while a is not None and b is not None:
+        if a[1] <= b[0]:
+            a = next(first, None)
+        elif b[1] <= a[0]:
+            b = next(second, None)
+        else:
+            return True
+    return False
@@ -1,37 +1,452 @@
-from datetime import datetime, timedelta
+import hashlib
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
 
-from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, url_for
+from flask import (
+    Blueprint, Response, abort, current_app, flash, get_flashed_messages, jsonify, make_response, redirect,
+    render_template, request, session, stream_template, url_for,
+)
 from flask_login import current_user, login_required, login_user, logout_user
-from sqlalchemy import or_
+from markupsafe import Markup
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import joinedload, selectinload
+from werkzeug.http import is_resource_modified
 
 from app import db
+from app.availability import find_available_rooms, recurring_windows
+from app.changes import event_stream
+from app.conflicts import acquire_booking_lock, find_conflicts
+from app.directory import (
+    MAX_SEARCH_LIMIT, SEARCH_LIMIT, directory_choices, room_directory_version, room_page, search_rooms,
+    search_users,
+)
 from app.forms import LoginForm, RegistrationForm, RoomForm, ScheduleForm
-from app.models import Room, Schedule, User
+from app.freetime import MAX_HORIZON, find_free_slots
+from app.instrumentation import timed
+from app.layout import cached_columns
+from app.models import RecurrenceExclusion, Room, Schedule, User, schedule_participants, week_start_of
+from app.overlay import MAX_CALENDARS, build_overlay
+from app.recurrence import FREQUENCIES, RecurrenceRule
 
 bp = Blueprint('main', __name__)
 
+MAX_PLANNER_WEEKS = 6
+MIN_SLOT_MINUTES = 15
+STREAM_BUFFER_SIZE = 8192
+MAX_FREE_SLOTS = 20
+
+
+def _selected_choices(choices, field):
+    values = field.data if isinstance(field.data, (list, tuple)) else [field.data]
+    selected = {value for value in values if isinstance(value, int) and value in choices.labels}
+    return sorted(((value, choices.labels[value]) for value in selected), key=itemgetter(1))
+
+
+def _without_user(items, user):
+    """Drop ``user`` from name-sorted ``items`` with a bisect instead of a scan."""
+    index = bisect_left(items, user.username, key=itemgetter(1))
+    if index < len(items) and items[index][0] == user.id:
+        return items[:index] + items[index + 1:]
+    return items
+
 
 def _populate_schedule_form_choices(form, *, current_user):
-    form.room.choices = [(0, 'No room assigned')] + [
-        (room.id, room.name) for room in Room.query.order_by(Room.name).all()
-    ]
-    form.participants.choices = [
-        (user.id, user.username)
-        for user in User.query.order_by(User.username).all()
-        if user.id != current_user.id
+    """Fill the room and participant choices from the cached directories.
+
+    Up to ``FORM_CHOICES_INLINE_LIMIT`` entries are listed in full.  Larger
+    directories only list the selected or submitted entries and the form
+    adds others from ``/api/search`` as the user types.
+    """
+    inline_limit = current_app.config.get('FORM_CHOICES_INLINE_LIMIT', 200)
+    rooms = directory_choices('rooms')
+    form.room_ids = rooms.labels
+    room_items = rooms.items
+    if len(room_items) > inline_limit:
+        room_items = _selected_choices(rooms, form.room)
+        form.room.render_kw = {'data-search-url': url_for('main.search_api', kind='rooms')}
+    form.room.choices = [(0, 'No room assigned'), *room_items]
+
+    users = directory_choices('users')
+    form.participant_ids = users.labels
+    user_items = _without_user(users.items, current_user)
+    if len(user_items) > inline_limit:
+        user_items = _selected_choices(users, form.participants)
+        form.participants.render_kw = {'data-search-url': url_for('main.search_api', kind='users')}
+    form.participants.choices = list(user_items)
+
+
+def _visible_schedule_ids(viewer_id, *, week_start, week_end):
+    """Select ids of schedules the viewer owns or joins that overlap the range.
+
+    Written as a ``UNION`` of two range scans so SQLite can drive each branch
+    from an index (``owner_id, start_time`` and ``user_id, schedule_id``)
+    instead of evaluating an ``OR`` with a correlated ``EXISTS`` per row.
+    """
+    owned = select(Schedule.id).where(
+        Schedule.owner_id == viewer_id,
+        Schedule.start_time < week_end,
+        Schedule.series_end > week_start,
+    )
+    shared = (
+        select(schedule_participants.c.schedule_id)
+        .join(Schedule, Schedule.id == schedule_participants.c.schedule_id)
+        .where(
+            schedule_participants.c.user_id == viewer_id,
+            Schedule.start_time < week_end,
+            Schedule.series_end > week_start,
+        )
+    )
+    return union(owned, shared)
+
+
+def _planner_schedule_query(viewer, *, week_start, week_end):
+    visible_ids = _visible_schedule_ids(viewer.id, week_start=week_start, week_end=week_end)
+    return (
+        Schedule.query.options(
+            joinedload(Schedule.owner),
+            joinedload(Schedule.room),
+            selectinload(Schedule.participants),
+            selectinload(Schedule.exclusions),
+        )
+        .filter(Schedule.id.in_(visible_ids))
+        .order_by(Schedule.start_time.asc())
+    )
+
+
+def _recurrence_rule_from_form(form):
+    """Build the submitted recurrence rule, adding form errors for bad input.
+
+    Returns ``(rule, valid)`` where ``rule`` is ``None`` for one-off schedules.
+    """
+    frequency = form.recurrence.data or None
+    if frequency is None:
+        return None, True
+    if frequency not in FREQUENCIES:
+        form.recurrence.errors.append('Choose a valid repeat option.')
+        return None, False
+
+    valid = True
+    excluded = set()
+    for token in (form.recurrence_exclusions.data or '').split(','):
+        token = token.strip()
+        if not token:
+            continue
+        try:
+            excluded.add(date.fromisoformat(token))
+        except ValueError:
+            form.recurrence_exclusions.errors.append(f"'{token}' is not a valid date (YYYY-MM-DD).")
+            valid = False
+    rule = RecurrenceRule(
+        frequency,
+        until=form.recurrence_until.data,
+        count=form.recurrence_count.data,
+        excluded=frozenset(excluded),
+    )
+    for field, message in rule.errors(form.start_time.data, form.end_time.data):
+        form[field].errors.append(message)
+        valid = False
+    return rule, valid
+
+
+def _apply_recurrence(schedule, rule):
+    schedule.recurrence = rule.frequency if rule else None
+    schedule.recurrence_until = rule.until if rule else None
+    schedule.recurrence_count = rule.count if rule else None
+    existing = {exclusion.occurrence_date: exclusion for exclusion in schedule.exclusions}
+    schedule.exclusions = [
+        existing.get(day) or RecurrenceExclusion(occurrence_date=day)
+        for day in sorted(rule.excluded if rule else ())
     ]
 
 
+def _flag_schedule_conflicts(form, *, owner, rule=None, exclude_id=None):
+    """Lock bookings, then add form errors for any double-booking.
+
+    Returns ``True`` when conflicts were found; the caller must then roll
+    back to release the lock.  Otherwise the lock is held until the caller
+    commits the schedule.
+    """
+    room_id = form.room.data or None
+    attendee_ids = {owner.id} | {pid for pid in form.participants.data if pid != owner.id}
+    acquire_booking_lock(room_id=room_id, user_ids=attendee_ids)
+    conflicts = find_conflicts(
+        form.start_time.data,
+        form.end_time.data,
+        rule=rule,
+        room_id=room_id,
+        user_ids=attendee_ids,
+        exclude_id=exclude_id,
+    )
+    usernames = dict(form.participants.choices)
+    usernames[owner.id] = owner.username
+    for conflict in conflicts:
+        when = f"{conflict.start_time:%Y-%m-%d %H:%M} to {conflict.end_time:%Y-%m-%d %H:%M}"
+        if room_id and conflict.room_id == room_id:
+            form.room.errors.append(f"This room is already booked for '{conflict.title}' ({when}).")
+        busy = attendee_ids & ({conflict.owner_id} | {user.id for user in conflict.participants})
+        if busy:
+            names = ', '.join(sorted(usernames.get(user_id, str(user_id)) for user_id in busy))
+            form.participants.errors.append(f"{names} already attending '{conflict.title}' ({when}).")
+    return bool(conflicts)
+
+
+def _load_planner_schedules(viewer, *, week_start, week_end):
+    """Fetch the viewer's schedules for a week with everything the planner touches.
+
+    Owners and rooms are joined into the main query and participants are
+    fetched with a single ``IN`` query, so the number of statements stays
+    constant no matter how many schedules fall into the week.
+    """
+    return _planner_schedule_query(viewer, week_start=week_start, week_end=week_end).all()
+
+
+def _planner_version_statement(viewer, *, week_start, week_end):
+    visible_ids = _visible_schedule_ids(viewer.id, week_start=week_start, week_end=week_end)
+    return (
+        select(func.count(Schedule.id), func.max(Schedule.updated_at), func.max(Room.updated_at))
+        .select_from(Schedule)
+        .outerjoin(Room, Room.id == Schedule.room_id)
+        .where(Schedule.id.in_(visible_ids))
+    )
+
+
+def _planner_version(viewer, *, week_start, week_end):
+    """Return a cheap fingerprint of everything the viewer's week displays.
+
+    The schedule count catches deletions and schedules moving out of the
+    week; the latest ``updated_at`` stamps catch edits, participant changes
+    and room renames.
+    """
+    return tuple(db.session.execute(
+        _planner_version_statement(viewer, week_start=week_start, week_end=week_end)
+    ).one())
+
+
+def _make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    """Return a ``304`` response if the client's copy is current, else ``None``.
+
+    Pending flash messages are part of the page, so they always force a
+    full response.  Only ``If-None-Match`` is honoured: deleting a row does
+    not advance ``last_modified``, but it changes the row count in ``etag``.
+    """
+    if session.get('_flashes'):
+        return None
+    if is_resource_modified(request.environ, etag=etag):
+        return None
+    return _with_validators(make_response('', 304), etag, last_modified)
+
+
+def _with_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _planner_validators(viewer, range_start, representation, day_count=7):
+    """Return ``(version, etag, last_modified)`` for ``day_count`` days from ``range_start``."""
+    version = _planner_version(viewer, week_start=range_start, week_end=range_start + timedelta(days=day_count))
+    return (version, *_planner_etag(viewer, range_start, representation, day_count, version))
+
+
+def _planner_etag(viewer, range_start, representation, day_count, version):
+    """Return ``(etag, last_modified)`` for a planner range at ``version``."""
+    etag = _make_etag(viewer.id, range_start, day_count, _planner_config(), representation, *version)
+    last_modified = max((stamp for stamp in version[1:] if stamp is not None), default=None)
+    return etag, last_modified
+
+
+def _planner_entry(viewer, range_start, version, day_count=7):
+    """Return the cached planner for the viewer's days, building it on a miss.
+
+    The rendered grid is filled in lazily by the HTML view so JSON clients
+    share the entry without paying for a render.  ``version`` is part of the
+    key so rows written outside this process's sessions (bulk imports, other
+    workers) never serve a stale planner.
+    """
+    cache = _planner_cache()
+    cache_key = _planner_cache_key(viewer, range_start, version, day_count)
+    entry = cache.get(cache_key)
+    if entry is None:
+        range_end = range_start + timedelta(days=day_count)
+        with timed('sql'):
+            schedules = _load_planner_schedules(viewer, week_start=range_start, week_end=range_end)
+        entry = _new_planner_entry(schedules, viewer, range_start, day_count)
+        cache.set(cache_key, entry)
+    return entry
+
+
+def _planner_cache_key(viewer, range_start, version, day_count):
+    return (viewer.id, range_start, day_count, _planner_config(), version)
+
+
+def _new_planner_entry(schedules, viewer, range_start, day_count):
+    with timed('planner'):
+        planner = _build_planner(schedules, week_start=range_start, viewer=viewer, day_count=day_count)
+    return {
+        "planner": planner,
+        "grid_html": None,
+        "has_schedules": bool(schedules),
+    }
+
+
+def _parse_iso_week(value):
+    """Parse ``YYYY-Www`` into the Monday starting that ISO week, or ``None``.
+
+    Weeks too close to the ends of the ``datetime`` range to page
+    ``MAX_PLANNER_WEEKS`` back and forth from are rejected too.
+    """
+    try:
+        week_start = datetime.strptime(f"{value}-1", "%G-W%V-%u")
+    except ValueError:
+        return None
+    span = timedelta(weeks=MAX_PLANNER_WEEKS)
+    if not datetime.min + span <= week_start <= datetime.max - span:
+        return None
+    return week_start
+
+
+def _format_iso_week(week_start):
+    year, week, _ = week_start.isocalendar()
+    return f"{year:04d}-W{week:02d}"
+
+
+def _parse_month(value):
+    """Parse ``YYYY-MM`` into midnight of the month's first day, or ``None``.
+
+    Like :func:`_parse_iso_week`, months whose neighbouring months or
+    surrounding weeks fall outside the ``datetime`` range are rejected.
+    """
+    try:
+        month_start = datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        return None
+    span = timedelta(weeks=MAX_PLANNER_WEEKS)
+    if not datetime.min + span <= month_start <= datetime.max - span:
+        return None
+    return month_start
+
+
+def _format_month(month_start):
+    return f"{month_start.year:04d}-{month_start.month:02d}"
+
+
+def _shift_month(month_start, months):
+    year, month = divmod(month_start.month - 1 + months, 12)
+    return month_start.replace(year=month_start.year + year, month=month + 1)
+
+
+def _month_range(month_start):
+    """Return ``(range_start, day_count)`` of the whole weeks covering the month."""
+    range_start = week_start_of(month_start)
+    range_end = week_start_of(_shift_month(month_start, 1) - timedelta(days=1)) + timedelta(days=7)
+    return range_start, (range_end - range_start).days
+
+
+def _serialize_planner(planner, *, month_start=None):
+    """Convert ``_build_planner`` output into JSON-safe primitives."""
+    week_start = planner["week_start"]
+    span = timedelta(days=planner["day_count"])
+    payload = {
+        "week": _format_iso_week(week_start),
+        "previous_week": _format_iso_week(week_start - span),
+        "next_week": _format_iso_week(week_start + span),
+        "week_start": week_start.date().isoformat(),
+        "day_count": planner["day_count"],
+        "start_hour": planner["start_hour"],
+        "end_hour": planner["end_hour"],
+        "slot_minutes": planner["slot_minutes"],
+        "hours": [hour["label"] for hour in planner["hours"]],
+        "days": [
+            {
+                "date": day["date"].date().isoformat(),
+                "label": day["label"],
+                "events": [
+                    {
+                        "id": event["id"],
+                        "title": event["title"],
+                        "location": event["location"],
+                        "room": event["room"],
+                        "owner": event["owner"],
+                        "participants": event["participants"],
+                        "is_owner": event["is_owner"],
+                        "recurrence": event["recurrence"],
+                        "start": event["start_time"].isoformat(timespec="minutes"),
+                        "end": event["end_time"].isoformat(timespec="minutes"),
+                        "display_start": event["display_start"].strftime("%H:%M"),
+                        "display_end": event["display_end"].strftime("%H:%M"),
+                        "start_minutes": event["start_minutes"],
+                        "duration_minutes": event["duration_minutes"],
+                        "column": event["column_offset"],
+                        "column_span": event["column_span"],
+                        "aria_label": event["aria_label"],
+                    }
+                    for event in day["events"]
+                ],
+            }
+            for day in planner["days"]
+        ],
+    }
+    if month_start is not None:
+        payload["month"] = _format_month(month_start)
+        payload["previous_month"] = _format_month(_shift_month(month_start, -1))
+        payload["next_month"] = _format_month(_shift_month(month_start, 1))
+    return payload
+
+
+def _planner_config():
+    config = current_app.config
+    return (
+        config.get("PLANNER_START_HOUR", 6),
+        config.get("PLANNER_END_HOUR", 22),
+        config.get("PLANNER_INTERVAL_MINUTES", 60),
+    )
+
+
+def _planner_cache():
+    return current_app.extensions['planner_cache']
+
+
+def _publish_change(action, schedule_id, *scopes):
+    """Tell open planner pages about a committed change.
+
+    ``scopes`` are :meth:`~app.models.Schedule.planner_scope` results from
+    before and/or after the change; their users and ranges are combined.
+    """
+    user_ids = set().union(*(scope[0] for scope in scopes))
+    start = min(scope[1] for scope in scopes)
+    end = max(scope[2] for scope in scopes)
+    current_app.extensions['change_broker'].publish(action, schedule_id, user_ids, start, end)
+
+
+@lru_cache(maxsize=16)
 def _build_planner_hours(*, start_hour, end_hour, interval_minutes):
-    step = max(interval_minutes, 15)  # guard against zero
-    hours = []
-    current = start_hour
-    while current <= end_hour:
-        label = f"{current:02d}:00"
-        hours.append({"hour": current, "label": label})
-        current += step // 60
-        if step % 60 != 0:
-            break  # interval other than 60 minutes currently unsupported
+    """Return the grid's time slots from ``start_hour`` to ``end_hour`` inclusive.
+
+    Slots are ``interval_minutes`` long (at least 15), so 15 and 30-minute
+    grids work as well as hourly ones.  The result only depends on the
+    configuration and is memoized: every planner shares the same tuple, so
+    callers must not modify it.
+    """
+    step = max(interval_minutes, MIN_SLOT_MINUTES)
+    hours = tuple(
+        {
+            "hour": start_hour + offset // 60,
+            "minute": offset % 60,
+            "label": f"{start_hour + offset // 60:02d}:{offset % 60:02d}",
+            "offset_minutes": offset,
+            "on_the_hour": offset % 60 == 0,
+        }
+        for offset in range(0, (end_hour - start_hour) * 60 + 1, step)
+    )
     if not hours:
         raise ValueError("Planner hours configuration produced no slots")
     return hours
@@ -46,38 +461,20 @@ def _assign_event_columns(events):
         return
 
     events.sort(key=lambda item: (item["start_minutes"], item["end_minutes"]))
-    active = []
-    clusters = []
+    layouts = cached_columns(tuple((event["start_minutes"], event["end_minutes"]) for event in events))
+    for event, layout in zip(events, layouts):
+        event["column"] = layout.column
+        event["column_span"] = layout.column_span
+        event["column_offset"] = layout.column
 
-    for event in events:
-        active = [e for e in active if e["end_minutes"] > event["start_minutes"]]
-        if active:
-            cluster = active[0]["cluster"]
-        else:
-            cluster = {"events": []}
-            clusters.append(cluster)
-        used_columns = {e["column"] for e in active}
-        column = 0
-        while column in used_columns:
-            column += 1
-        event["column"] = column
-        event["cluster"] = cluster
-        cluster["events"].append(event)
-        active.append(event)
-
-    for cluster in clusters:
-        columns = {event["column"] for event in cluster["events"]}
-        width = max(columns) + 1 if columns else 1
-        for event in cluster["events"]:
-            event["column_span"] = width
-            event["column_offset"] = event["column"]
-
-
-def _build_planner(schedules, *, week_start, viewer):
-    config = current_app.config
-    start_hour = config.get("PLANNER_START_HOUR", 6)
-    end_hour = config.get("PLANNER_END_HOUR", 22)
-    interval_minutes = config.get("PLANNER_INTERVAL_MINUTES", 60)
+
+def _build_planner(schedules, *, week_start, viewer, day_count=7):
+    """Lay out ``schedules`` over ``day_count`` days starting at ``week_start``.
+
+    ``schedules`` must cover the whole range (one query for any range); they
+    are bucketed into days in a single pass.
+    """
+    start_hour, end_hour, interval_minutes = _planner_config()
 
     hours = _build_planner_hours(
         start_hour=start_hour,
@@ -88,77 +485,89 @@ def _build_planner(schedules, *, week_start, viewer):
     days = []
     week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
     display_span = end_hour - start_hour
+    one_day = timedelta(days=1)
+    day_aria_labels = []
 
-    for day_index in range(7):
+    for day_index in range(day_count):
         day_start = week_start + timedelta(days=day_index)
-        day_end = day_start + timedelta(days=1)
-        display_start = day_start + timedelta(hours=start_hour)
-        display_end = day_start + timedelta(hours=end_hour)
-        day_label = day_start.strftime("%A %d %b")
-        events = []
-
-        for schedule in schedules:
-            if schedule.end_time <= day_start or schedule.start_time >= day_end:
-                continue
-
-            event_start = max(schedule.start_time, display_start)
-            event_end = min(schedule.end_time, display_end)
-            if event_end <= event_start:
-                continue
-
-            start_minutes = _normalize_minutes(event_start - display_start)
-            end_minutes = _normalize_minutes(event_end - display_start)
-            duration_minutes = max(end_minutes - start_minutes, 15)
-            owner_name = schedule.owner.username if schedule.owner else ""
-            room_name = schedule.room.name if schedule.room else None
-            aria_label_parts = [
-                schedule.title,
-                f"on {day_start.strftime('%A %d %B %Y')}",
-                f"from {event_start.strftime('%H:%M')} to {event_end.strftime('%H:%M')}",
-            ]
-            if schedule.location:
-                aria_label_parts.append(f"at {schedule.location}")
-            events.append(
-                {
-                    "id": schedule.id,
-                    "title": schedule.title,
-                    "location": schedule.location,
-                    "room": room_name,
-                    "start_minutes": start_minutes,
-                    "end_minutes": end_minutes,
-                    "duration_minutes": duration_minutes,
-                    "start_time": schedule.start_time,
-                    "end_time": schedule.end_time,
-                    "display_start": event_start,
-                    "display_end": event_end,
-                    "owner": owner_name,
-                    "column": 0,
-                    "column_span": 1,
-                    "column_offset": 0,
-                    "is_owner": schedule.is_owned_by(viewer),
-                    "participants": [user.username for user in schedule.participants],
-                    "aria_label": ", ".join(aria_label_parts),
-                }
-            )
-
-        _assign_event_columns(events)
-
+        long_label = day_start.strftime('%A %d %B %Y')
+        day_aria_labels.append(f"on {long_label}")
         days.append(
             {
                 "date": day_start,
-                "label": day_label,
-                "cell_labels": [
-                    f"{day_start.strftime('%A %d %B %Y')} at {hour['label']}" for hour in hours
-                ],
-                "events": events,
-                "display_start": display_start,
+                "label": day_start.strftime("%A %d %b"),
+                "long_label": long_label,
+                "events": [],
+                "display_start": day_start + timedelta(hours=start_hour),
                 "display_hours": display_span,
             }
         )
 
+    # Single sweep: each schedule (or occurrence of a recurring one) is split
+    # once into the days it overlaps instead of scanning every schedule for
+    # every day.
+    range_end = week_start + timedelta(days=day_count)
+    for schedule in schedules:
+        owner_name = schedule.owner.username if schedule.owner else ""
+        room_name = schedule.room.name if schedule.room else None
+        participants = [user.username for user in schedule.participants]
+        is_owner = schedule.is_owned_by(viewer)
+
+        for start_time, end_time in schedule.occurrences(week_start, range_end):
+            first_day = max((start_time - week_start) // one_day, 0)
+            last_day = min(-((week_start - end_time) // one_day) - 1, day_count - 1)
+
+            for day_index in range(first_day, last_day + 1):
+                day = days[day_index]
+                display_start = day["display_start"]
+                display_end = display_start + timedelta(hours=display_span)
+                event_start = max(start_time, display_start)
+                event_end = min(end_time, display_end)
+                if event_end <= event_start:
+                    continue
+
+                start_minutes = _normalize_minutes(event_start - display_start)
+                end_minutes = _normalize_minutes(event_end - display_start)
+                duration_minutes = max(end_minutes - start_minutes, 15)
+                aria_label_parts = [
+                    schedule.title,
+                    day_aria_labels[day_index],
+                    f"from {event_start.strftime('%H:%M')} to {event_end.strftime('%H:%M')}",
+                ]
+                if schedule.location:
+                    aria_label_parts.append(f"at {schedule.location}")
+                day["events"].append(
+                    {
+                        "id": schedule.id,
+                        "title": schedule.title,
+                        "location": schedule.location,
+                        "room": room_name,
+                        "start_minutes": start_minutes,
+                        "end_minutes": end_minutes,
+                        "duration_minutes": duration_minutes,
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "display_start": event_start,
+                        "display_end": event_end,
+                        "owner": owner_name,
+                        "column": 0,
+                        "column_span": 1,
+                        "column_offset": 0,
+                        "is_owner": is_owner,
+                        "recurrence": schedule.recurrence,
+                        "participants": participants,
+                        "aria_label": ", ".join(aria_label_parts),
+                    }
+                )
+
+    for day in days:
+        _assign_event_columns(day["events"])
+
     return {
         "week_start": week_start,
+        "day_count": day_count,
         "hours": hours,
+        "slot_minutes": max(interval_minutes, MIN_SLOT_MINUTES),
         "days": days,
         "start_hour": start_hour,
         "end_hour": end_hour,
@@ -199,6 +608,9 @@ def login():
         if user is None or not user.check_password(form.password.data):
             flash('Invalid username or password.', 'danger')
             return render_template('login.html', title='Log In', form=form)
+        if user.password_needs_rehash():
+            user.set_password(form.password.data)
+            db.session.commit()
         login_user(user)
         flash('Welcome back!', 'success')
         return redirect(url_for('main.calendar'))
@@ -213,25 +625,458 @@ def logout():
     return redirect(url_for('main.index'))
 
 
+class _PlannerGrid:
+    """The weekly grid's HTML, built and rendered only when iterated.
+
+    Iterating loads or builds the cached planner entry and yields the grid
+    in the chunks ``Template.generate`` produces, so a streamed page has
+    already sent everything above the grid while the week is still being
+    read.  A freshly rendered grid is stored in the entry for later requests.
+    An ``entry`` already at hand (the ASGI views load it asynchronously) is
+    used as is.
+    """
+
+    def __init__(self, viewer, week_start, version, entry=None):
+        self._viewer = viewer
+        self._week_start = week_start
+        self._version = version
+        self._entry = entry
+
+    @property
+    def planner(self):
+        return self._entry["planner"]
+
+    @property
+    def has_schedules(self):
+        return self._entry["has_schedules"]
+
+    def __iter__(self):
+        yield Markup()  # flush the page above the grid before the week is read
+        if self._entry is None:
+            self._entry = _planner_entry(self._viewer, self._week_start, self._version)
+        entry = self._entry
+        if entry["grid_html"] is not None:
+            yield entry["grid_html"]
+            return
+        template = current_app.jinja_env.get_template('partials/planner_grid.html')
+        chunks = []
+        with timed('template'):
+            for chunk in template.generate(planner=entry["planner"]):
+                chunks.append(chunk)
+                yield Markup(chunk)
+        entry["grid_html"] = Markup(''.join(chunks))
+
+
+class _PlannerWeeks:
+    """The multi-week overview table, built and rendered only when iterated.
+
+    The counterpart of :class:`_PlannerGrid` for ``calendar_range.html``:
+    the page above the table is flushed before the range's planner entry is
+    loaded.  ``context`` is passed on to ``partials/planner_weeks.html``.
+    """
+
+    def __init__(self, viewer, range_start, version, day_count, **context):
+        self._viewer = viewer
+        self._range_start = range_start
+        self._version = version
+        self._day_count = day_count
+        self._context = context
+        self._entry = None
+
+    @property
+    def has_schedules(self):
+        return self._entry["has_schedules"]
+
+    def __iter__(self):
+        yield Markup()  # flush the page above the table before the range is read
+        entry = self._entry = _planner_entry(self._viewer, self._range_start, self._version, self._day_count)
+        days = entry["planner"]["days"]
+        weeks = [days[index:index + 7] for index in range(0, len(days), 7)]
+        template = current_app.jinja_env.get_template('partials/planner_weeks.html')
+        with timed('template'):
+            for chunk in template.generate(weeks=weeks, **self._context):
+                yield Markup(chunk)
+
+
+def _coalesced(chunks, size=STREAM_BUFFER_SIZE):
+    """Join the many small chunks ``generate()`` yields into writes of about ``size`` characters.
+
+    An empty chunk sends whatever is buffered right away.  ``chunks`` is
+    closed with the response so a streamed template's request context is
+    released even when the client disconnects.
+    """
+    buffered, length = [], 0
+    try:
+        for chunk in chunks:
+            if chunk:
+                buffered.append(chunk)
+                length += len(chunk)
+                if length < size:
+                    continue
+            if buffered:
+                yield ''.join(buffered)
+                buffered, length = [], 0
+        if buffered:
+            yield ''.join(buffered)
+    finally:
+        chunks.close()
+
+
+def _render_streamed(template_name, **context):
+    """Return a response that streams ``template_name`` as it is generated.
+
+    With instrumentation enabled the page is rendered up front instead, so
+    the ``Server-Timing`` header, sent before any of the body, covers it.
+    Flashed messages are popped before the response is returned: the
+    session is saved before a streamed body runs, so popping them from the
+    template would leave them in the cookie for the next page.
+    """
+    config = current_app.config
+    if config.get('INSTRUMENTATION_ENABLED') or not config.get('STREAM_TEMPLATES', True):
+        return make_response(render_template(template_name, **context))
+    get_flashed_messages(with_categories=True)
+    return Response(_coalesced(stream_template(template_name, **context)), mimetype='text/html')
+
+
 @bp.route('/calendar')
 @login_required
 def calendar():
-    reference = datetime.utcnow()
-    week_start = reference - timedelta(days=reference.weekday())
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_end = week_start + timedelta(days=7)
-
-    schedules = Schedule.query.filter(
-        or_(
-            Schedule.owner_id == current_user.id,
-            Schedule.participants.any(id=current_user.id)
-        ),
-        Schedule.end_time > week_start,
-        Schedule.start_time < week_end,
-    ).order_by(Schedule.start_time.asc()).all()
+    week_start = week_start_of(datetime.utcnow())
+    version, etag, last_modified = _planner_validators(current_user, week_start, 'html')
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = _render_streamed(
+        'calendar.html',
+        title='Calendar',
+        week_start=week_start,
+        planner_grid=_PlannerGrid(current_user._get_current_object(), week_start, version),
+    )
+    return _with_validators(response, etag, last_modified)
+
+
+def _visible_week():
+    week = request.args.get('week')
+    week_start = _parse_iso_week(week) if week else week_start_of(datetime.utcnow())
+    if week_start is None:
+        abort(400)
+    return week_start
+
+
+@bp.route('/calendar/grid')
+@login_required
+def calendar_grid():
+    """The weekly grid alone, for pages that refresh it after a change."""
+    week_start = _visible_week()
+    version, etag, last_modified = _planner_validators(current_user, week_start, 'grid')
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    grid = ''.join(_PlannerGrid(current_user, week_start, version))
+    return _with_validators(make_response(grid), etag, last_modified)
+
+
+def _change_feed_request():
+    """Return ``(start, end, last_id)`` of the change feed the page asks for."""
+    week_start = _visible_week()
+    weeks = request.args.get('weeks', 1, type=int)
+    if not 1 <= weeks <= MAX_PLANNER_WEEKS:
+        abort(400)
+    return week_start, week_start + timedelta(weeks=weeks), request.headers.get('Last-Event-ID', type=int)
+
+
+def _event_stream_response(events):
+    response = Response(events, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@bp.route('/calendar/changes')
+@login_required
+def calendar_changes():
+    """Server-Sent Events about schedules changing in the viewer's ``week`` (or ``weeks``)."""
+    start, end, last_id = _change_feed_request()
+    broker = current_app.extensions['change_broker']
+    subscription = broker.subscribe(current_user.id, start, end, last_id=last_id)
+    # Not stream_with_context: the stream only needs the subscription, and the
+    # request's database session is released while the connection idles.
+    return _event_stream_response(
+        event_stream(broker, subscription, heartbeat=current_app.config.get('CHANGE_FEED_HEARTBEAT', 15))
+    )
+
+
+def _planner_api_range():
+    """Return ``(week_start, day_count, month_start)`` of the planner API request."""
+    month_start = None
+    if request.args.get('month'):
+        month_start = _parse_month(request.args['month'])
+        if month_start is None:
+            abort(400)
+        week_start, day_count = _month_range(month_start)
+    else:
+        week = request.args.get('week')
+        if week:
+            week_start = _parse_iso_week(week)
+            if week_start is None:
+                abort(400)
+        else:
+            week_start = week_start_of(datetime.utcnow())
+        weeks = request.args.get('weeks', 1, type=int)
+        if not 1 <= weeks <= MAX_PLANNER_WEEKS:
+            abort(400)
+        day_count = weeks * 7
+    return week_start, day_count, month_start
+
+
+@bp.route('/api/planner')
+@login_required
+def planner_api():
+    """One or more weeks (``week``, ``weeks`` up to 6) or a whole ``month`` as JSON."""
+    week_start, day_count, month_start = _planner_api_range()
+    version, etag, last_modified = _planner_validators(current_user, week_start, 'json', day_count)
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    planner = _planner_entry(current_user, week_start, version, day_count)["planner"]
+    payload = _serialize_planner(planner, month_start=month_start)
+    return _with_validators(jsonify(payload), etag, last_modified)
+
+
+def _render_planner_range(range_start, day_count, *, view, **context):
+    """Render ``calendar_range.html`` for ``day_count`` days as rows of weeks."""
+    version, etag, last_modified = _planner_validators(
+        current_user, range_start, f"html:{view}:{context.get('month_start')}", day_count
+    )
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    planner_weeks = _PlannerWeeks(
+        current_user._get_current_object(), range_start, version, day_count,
+        title=context['title'], range_label=context['range_label'], month_start=context.get('month_start'),
+    )
+    response = _render_streamed('calendar_range.html', planner_weeks=planner_weeks, view=view, **context)
+    return _with_validators(response, etag, last_modified)
+
+
+@bp.route('/calendar/weeks/<int:weeks>')
+@login_required
+def calendar_weeks(weeks):
+    if weeks not in (2, 4):
+        abort(404)
+    week = request.args.get('week')
+    range_start = _parse_iso_week(week) if week else week_start_of(datetime.utcnow())
+    if range_start is None:
+        abort(400)
+    span = timedelta(weeks=weeks)
+    return _render_planner_range(
+        range_start,
+        weeks * 7,
+        view=f'{weeks}weeks',
+        title=f'{weeks}-Week Planner',
+        range_label=f"{range_start.strftime('%B %d, %Y')} – {(range_start + span - timedelta(days=1)).strftime('%B %d, %Y')}",
+        previous_url=url_for('main.calendar_weeks', weeks=weeks, week=_format_iso_week(range_start - span)),
+        next_url=url_for('main.calendar_weeks', weeks=weeks, week=_format_iso_week(range_start + span)),
+        today_url=url_for('main.calendar_weeks', weeks=weeks),
+    )
+
+
+@bp.route('/calendar/month')
+@login_required
+def calendar_month():
+    month = request.args.get('month')
+    if month:
+        month_start = _parse_month(month)
+        if month_start is None:
+            abort(400)
+    else:
+        month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    range_start, day_count = _month_range(month_start)
+    return _render_planner_range(
+        range_start,
+        day_count,
+        view='month',
+        title='Monthly Planner',
+        range_label=month_start.strftime('%B %Y'),
+        month_start=month_start,
+        previous_url=url_for('main.calendar_month', month=_format_month(_shift_month(month_start, -1))),
+        next_url=url_for('main.calendar_month', month=_format_month(_shift_month(month_start, 1))),
+        today_url=url_for('main.calendar_month'),
+    )
+
+
+def _id_list(name):
+    """Parse repeated and/or comma-separated integer ids from the query string."""
+    try:
+        return sorted({int(value) for item in request.args.getlist(name) for value in item.split(',') if value})
+    except ValueError:
+        abort(400, description=f"{name} must be a list of ids")
+
+
+def _calendar_selection():
+    """Return the ``(id, name)`` lists of the requested ``users`` and ``rooms``.
+
+    Without any selection only the viewer's own calendar is used.
+    """
+    user_ids, room_ids = _id_list('users'), _id_list('rooms')
+    if not user_ids and not room_ids:
+        user_ids = [current_user.id]
+    if len(user_ids) + len(room_ids) > MAX_CALENDARS:
+        abort(400, description=f"at most {MAX_CALENDARS} calendars can be selected")
+    user_labels, room_labels = directory_choices('users').labels, directory_choices('rooms').labels
+    if any(user_id not in user_labels for user_id in user_ids) or any(room_id not in room_labels for room_id in room_ids):
+        abort(400, description="unknown user or room")
+    return (
+        [(user_id, user_labels[user_id]) for user_id in user_ids],
+        [(room_id, room_labels[room_id]) for room_id in room_ids],
+    )
+
+
+def _overlay_selection():
+    """Return ``(week_start, users, rooms)`` of the overlay request."""
+    week = request.args.get('week')
+    week_start = _parse_iso_week(week) if week else week_start_of(datetime.utcnow())
+    if week_start is None:
+        abort(400)
+    return (week_start, *_calendar_selection())
+
+
+def _team_overlay(week_start, users, rooms):
+    start_hour, end_hour, _ = _planner_config()
+    return build_overlay(
+        [user_id for user_id, _ in users],
+        [room_id for room_id, _ in rooms],
+        viewer_id=current_user.id,
+        start=week_start,
+        days=7,
+        slot_minutes=current_app.config.get('OVERLAY_SLOT_MINUTES', 30),
+        day_start_hour=start_hour,
+        day_end_hour=end_hour,
+    )
+
+
+@bp.route('/api/overlay')
+@login_required
+def overlay_api():
+    """Busy counts and events of up to 100 overlaid user (``users``) and room (``rooms``) calendars."""
+    week_start, users, rooms = _overlay_selection()
+    overlay = _team_overlay(week_start, users, rooms)
+    return jsonify({
+        "week": _format_iso_week(week_start),
+        "week_start": week_start.date().isoformat(),
+        "slot_minutes": current_app.config.get('OVERLAY_SLOT_MINUTES', 30),
+        "calendars": [
+            *({"key": f"user:{user_id}", "type": "user", "id": user_id, "name": name} for user_id, name in users),
+            *({"key": f"room:{room_id}", "type": "room", "id": room_id, "name": name} for room_id, name in rooms),
+        ],
+        "slots": [
+            {"start": slot_start.isoformat(timespec="minutes"), "busy": busy}
+            for slot_start, busy in zip(overlay.slot_starts, overlay.busy)
+        ],
+        "events": [
+            {
+                "id": event.schedule.id if event.visible else None,
+                "title": event.schedule.title if event.visible else None,
+                "start": event.start.isoformat(timespec="minutes"),
+                "end": event.end.isoformat(timespec="minutes"),
+                "calendars": [f"{kind}:{calendar_id}" for kind, calendar_id in event.calendars],
+            }
+            for event in overlay.events
+        ],
+    })
+
+
+@bp.route('/api/free-slots')
+@login_required
+def free_slots_api():
+    """Earliest slots of ``duration`` minutes when all ``users`` and one of ``rooms`` are free.
+
+    The search runs from ``start`` (ISO date or date-time, default now) over
+    ``days`` days (at most 28) within the planner's working hours.
+    """
+    users, rooms = _calendar_selection()
+    try:
+        start = datetime.fromisoformat(request.args['start']) if request.args.get('start') else datetime.utcnow()
+    except ValueError:
+        abort(400, description="start must be an ISO date or date-time")
+    if start.tzinfo is not None:
+        abort(400, description="start must be a naive UTC date-time")
+    # Same headroom as the planner's week and month parameters, so
+    # recurrences expanded past the end of the search cannot overflow.
+    if start > datetime.max - MAX_HORIZON - timedelta(weeks=MAX_PLANNER_WEEKS):
+        abort(400, description="start is too close to the end of the calendar")
+    start = start.replace(second=0, microsecond=0)
+    duration = request.args.get('duration', 60, type=int)
+    days = request.args.get('days', 14, type=int)
+    limit = request.args.get('limit', 5, type=int)
+    start_hour, end_hour, _ = _planner_config()
+    if not 0 < duration <= (end_hour - start_hour) * 60:
+        abort(400, description="duration must fit in the working day")
+    if not 1 <= days <= MAX_HORIZON.days or not 1 <= limit <= MAX_FREE_SLOTS:
+        abort(400)
+    slots = find_free_slots(
+        [user_id for user_id, _ in users],
+        [room_id for room_id, _ in rooms],
+        start=start,
+        end=start + timedelta(days=days),
+        duration=timedelta(minutes=duration),
+        day_start_hour=start_hour,
+        day_end_hour=end_hour,
+        limit=limit,
+        weekends=request.args.get('weekends') == '1',
+    )
+    room_names = dict(rooms)
+    return jsonify({
+        "duration": duration,
+        "users": [{"id": user_id, "name": name} for user_id, name in users],
+        "slots": [
+            {
+                "start": slot.start.isoformat(timespec="minutes"),
+                "end": slot.end.isoformat(timespec="minutes"),
+                "rooms": [{"id": room_id, "name": room_names[room_id]} for room_id in slot.room_ids],
+            }
+            for slot in slots
+        ],
+    })
+
 
-    planner = _build_planner(schedules, week_start=week_start, viewer=current_user)
-    return render_template('calendar.html', title='Calendar', schedules=schedules, planner=planner)
+@bp.route('/calendar/team')
+@login_required
+def team_calendar():
+    week_start, users, rooms = _overlay_selection()
+    overlay = _team_overlay(week_start, users, rooms)
+    slots_per_day = len(overlay.slot_starts) // 7
+    selection = {'users': [user_id for user_id, _ in users], 'rooms': [room_id for room_id, _ in rooms]}
+    inline_limit = current_app.config.get('FORM_CHOICES_INLINE_LIMIT', 200)
+    user_choices, room_choices = directory_choices('users').items, directory_choices('rooms').items
+    return render_template(
+        'team_calendar.html',
+        title='Team Overlay',
+        week_start=week_start,
+        days=[week_start + timedelta(days=index) for index in range(7)],
+        rows=[
+            (overlay.slot_starts[index], overlay.busy[index::slots_per_day])
+            for index in range(slots_per_day)
+        ],
+        calendar_count=len(users) + len(rooms),
+        events=overlay.events,
+        selection={'users': set(selection['users']), 'rooms': set(selection['rooms'])},
+        user_choices=user_choices if len(user_choices) <= inline_limit else users,
+        room_choices=room_choices if len(room_choices) <= inline_limit else rooms,
+        search_users=len(user_choices) > inline_limit,
+        search_rooms=len(room_choices) > inline_limit,
+        previous_url=url_for('main.team_calendar', week=_format_iso_week(week_start - timedelta(days=7)), **selection),
+        next_url=url_for('main.team_calendar', week=_format_iso_week(week_start + timedelta(days=7)), **selection),
+    )
+
+
+@bp.route('/planner-cache/stats')
+@login_required
+def planner_cache_stats():
+    return jsonify(_planner_cache().stats())
 
 
 @bp.route('/schedules/new', methods=['GET', 'POST'])
@@ -243,6 +1088,12 @@ def create_schedule():
         if form.end_time.data <= form.start_time.data:
             form.end_time.errors.append('End time must be after the start time.')
             return render_template('schedule_form.html', title='New Schedule', form=form)
+        rule, valid = _recurrence_rule_from_form(form)
+        if not valid:
+            return render_template('schedule_form.html', title='New Schedule', form=form)
+        if _flag_schedule_conflicts(form, owner=current_user, rule=rule):
+            db.session.rollback()
+            return render_template('schedule_form.html', title='New Schedule', form=form)
         schedule = Schedule(
             title=form.title.data,
             start_time=form.start_time.data,
@@ -250,6 +1101,7 @@ def create_schedule():
             location=form.location.data,
             owner=current_user
         )
+        _apply_recurrence(schedule, rule)
         db.session.add(schedule)
         if form.room.data:
             schedule.room = db.session.get(Room, form.room.data)
@@ -257,6 +1109,7 @@ def create_schedule():
         if participant_ids:
             schedule.participants = User.query.filter(User.id.in_(participant_ids)).all()
         db.session.commit()
+        _publish_change('created', schedule.id, schedule.planner_scope())
         flash('Schedule created.', 'success')
         return redirect(url_for('main.calendar'))
     return render_template('schedule_form.html', title='New Schedule', form=form)
@@ -271,22 +1124,35 @@ def edit_schedule(schedule_id):
     if not schedule.is_owned_by(current_user):
         abort(403)
     form = ScheduleForm(obj=schedule)
-    _populate_schedule_form_choices(form, current_user=current_user)
     if request.method == 'GET':
         form.room.data = schedule.room_id or 0
         form.participants.data = [user.id for user in schedule.participants]
+        form.recurrence.data = schedule.recurrence or ''
+        form.recurrence_exclusions.data = ', '.join(
+            exclusion.occurrence_date.isoformat() for exclusion in schedule.exclusions
+        )
+    _populate_schedule_form_choices(form, current_user=current_user)
     if form.validate_on_submit():
         if form.end_time.data <= form.start_time.data:
             form.end_time.errors.append('End time must be after the start time.')
             return render_template('schedule_form.html', title='Edit Schedule', form=form, schedule=schedule)
+        rule, valid = _recurrence_rule_from_form(form)
+        if not valid:
+            return render_template('schedule_form.html', title='Edit Schedule', form=form, schedule=schedule)
+        if _flag_schedule_conflicts(form, owner=current_user, rule=rule, exclude_id=schedule.id):
+            db.session.rollback()
+            return render_template('schedule_form.html', title='Edit Schedule', form=form, schedule=schedule)
+        previous_scope = schedule.planner_scope()
         schedule.title = form.title.data
         schedule.start_time = form.start_time.data
         schedule.end_time = form.end_time.data
         schedule.location = form.location.data
+        _apply_recurrence(schedule, rule)
         schedule.room = db.session.get(Room, form.room.data) if form.room.data else None
         participant_ids = [pid for pid in form.participants.data if pid != current_user.id]
         schedule.participants = User.query.filter(User.id.in_(participant_ids)).all() if participant_ids else []
         db.session.commit()
+        _publish_change('updated', schedule.id, previous_scope, schedule.planner_scope())
         flash('Schedule updated.', 'success')
         return redirect(url_for('main.calendar'))
     return render_template('schedule_form.html', title='Edit Schedule', form=form, schedule=schedule)
@@ -300,17 +1166,84 @@ def delete_schedule(schedule_id):
         abort(404)
     if not schedule.is_owned_by(current_user):
         abort(403)
+    scope = schedule.planner_scope()
     db.session.delete(schedule)
     db.session.commit()
+    _publish_change('deleted', schedule_id, scope)
     flash('Schedule deleted.', 'info')
     return redirect(url_for('main.calendar'))
 
 
+def _room_list_response(rooms, after, next_after, etag, last_modified):
+    response = make_response(render_template(
+        'room_list.html', title='Meeting Rooms', rooms=rooms, after=after, next_after=next_after,
+    ))
+    return _with_validators(response, etag, last_modified)
+
+
 @bp.route('/rooms')
 @login_required
 def list_rooms():
-    rooms = Room.query.order_by(Room.name).all()
-    return render_template('room_list.html', title='Meeting Rooms', rooms=rooms)
+    after = request.args.get('after') or None
+    page_size = current_app.config.get('ROOM_PAGE_SIZE', 50)
+    room_count, last_modified = db.session.execute(room_directory_version()).one()
+    etag = _make_etag(current_user.id, after, page_size, room_count, last_modified)
+    not_modified = _not_modified(etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    rooms, next_after = room_page(after=after, limit=page_size)
+    return _room_list_response(rooms, after, next_after, etag, last_modified)
+
+
+@bp.route('/api/search')
+@login_required
+def search_api():
+    """Prefix search over users (``kind=users``) or rooms (``kind=rooms``)."""
+    kind = request.args.get('kind')
+    prefix = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', SEARCH_LIMIT, type=int), 1), MAX_SEARCH_LIMIT)
+    if kind == 'users':
+        results = search_users(prefix, limit=limit, exclude_id=current_user.id)
+    elif kind == 'rooms':
+        results = search_rooms(prefix, limit=limit)
+    else:
+        abort(400, description="kind must be 'users' or 'rooms'")
+    return jsonify({"results": [{"id": result_id, "name": name} for result_id, name in results]})
+
+
+def _availability_request():
+    """Return ``(windows, min_capacity)`` of an availability query, or abort with 400."""
+    try:
+        start = datetime.strptime(request.args.get('start', ''), '%Y-%m-%dT%H:%M')
+        end = datetime.strptime(request.args.get('end', ''), '%Y-%m-%dT%H:%M')
+        min_capacity = request.args.get('capacity', 1, type=int)
+        windows = recurring_windows(
+            start,
+            end,
+            every=request.args.get('every') or None,
+            count=request.args.get('count', 1, type=int),
+        )
+    except ValueError as exc:
+        abort(400, description=str(exc))
+    return windows, min_capacity
+
+
+def _availability_response(windows, rooms):
+    return jsonify({
+        "windows": [
+            {"start": window_start.isoformat(timespec="minutes"), "end": window_end.isoformat(timespec="minutes")}
+            for window_start, window_end in windows
+        ],
+        "rooms": [{"id": room.id, "name": room.name, "capacity": room.capacity} for room in rooms],
+    })
+
+
+@bp.route('/api/rooms/available')
+@login_required
+def available_rooms_api():
+    windows, min_capacity = _availability_request()
+    return _availability_response(windows, find_available_rooms(windows, min_capacity=min_capacity))
 
 
 @bp.route('/rooms/new', methods=['GET', 'POST'])
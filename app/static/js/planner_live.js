@@ -0,0 +1,36 @@
+// Keeps an open weekly planner current: listens to the page's change feed
+// and swaps in the re-rendered grid when a schedule in the week changes.
+(function () {
+  var container = document.querySelector('.planner-live[data-changes-url]');
+  if (!container || !window.EventSource) {
+    return;
+  }
+
+  var refreshing = false;
+  var pending = false;
+
+  function refresh() {
+    if (refreshing) {
+      pending = true;
+      return;
+    }
+    refreshing = true;
+    fetch(container.dataset.gridUrl, { headers: { Accept: 'text/html' }, credentials: 'same-origin' })
+      .then(function (response) { return response.ok ? response.text() : null; })
+      .then(function (html) {
+        if (html) {
+          container.innerHTML = html;
+        }
+      })
+      .finally(function () {
+        refreshing = false;
+        if (pending) {
+          pending = false;
+          refresh();
+        }
+      });
+  }
+
+  var source = new EventSource(container.dataset.changesUrl);
+  source.addEventListener('schedule', refresh);
+})();
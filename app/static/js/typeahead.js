@@ -0,0 +1,41 @@
+// Adds a search box above every <select data-search-url> and fills the
+// select with matches from /api/search, keeping selected options.
+(function () {
+  function attach(select) {
+    var input = document.createElement('input');
+    input.type = 'search';
+    input.className = 'form-control mb-2';
+    input.placeholder = 'Type to search…';
+    input.setAttribute('aria-label', 'Search ' + (select.labels.length ? select.labels[0].textContent : ''));
+    select.parentNode.insertBefore(input, select);
+
+    var timer = null;
+    var latest = 0;
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var request = ++latest;
+        var url = select.dataset.searchUrl + '&q=' + encodeURIComponent(input.value);
+        fetch(url, { headers: { Accept: 'application/json' } })
+          .then(function (response) { return response.json(); })
+          .then(function (payload) {
+            if (request !== latest) {
+              return;
+            }
+            Array.prototype.slice.call(select.options).forEach(function (option) {
+              if (!option.selected && option.value !== '0') {
+                option.remove();
+              }
+            });
+            payload.results.forEach(function (result) {
+              if (!select.querySelector('option[value="' + result.id + '"]')) {
+                select.add(new Option(result.name, result.id));
+              }
+            });
+          });
+      }, 200);
+    });
+  }
+
+  document.querySelectorAll('select[data-search-url]').forEach(attach);
+})();
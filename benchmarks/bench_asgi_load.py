@@ -0,0 +1,254 @@
+"""Load-test the WSGI and ASGI deployments with many concurrent clients.
+
+A team is seeded into a fresh database file, then ``gunicorn`` (gthread
+worker, ``run:app``) and ``uvicorn`` (``asgi:app``) are started in turn as a
+single process each.  ``--clients`` keep-alive connections, spread over the
+seeded users, request the read-heavy pages (calendar, planner API, room list
+and room availability) back to back; after ``--warmup`` seconds the script
+records every response for ``--seconds`` and reports requests/s, median and
+p99 latency and failed requests per server.  With ``--feeds``, that many
+planner change feeds (``/calendar/changes``, one per open planner page) are
+held open during the run as well.
+
+Both servers get ``--threads`` threads for the views that block: gunicorn
+runs every request on them, the ASGI app only the ones that are not async.
+The clients share one event loop in this process, so on a small machine they
+compete with the server for CPU; compare the two rows, not absolute numbers.
+
+Run from the project root (needs gunicorn and uvicorn)::
+
+    python -m benchmarks.bench_asgi_load
+    python -m benchmarks.bench_asgi_load --clients 500 --seconds 20 --threads 16
+    python -m benchmarks.bench_asgi_load --feeds 100
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app import create_app, db
+from app.models import User, week_start_of
+from benchmarks.data import seed_team
+from config import TestConfig
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+USER_AGENT = "bench-asgi-load"
+SESSION_SECRET = "bench-asgi-load"
+
+
+def _servers(port, threads):
+    return {
+        "wsgi": [
+            sys.executable, "-m", "gunicorn", "--worker-class", "gthread", "--workers", "1",
+            "--threads", str(threads), "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "run:app",
+        ],
+        "asgi": [
+            sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+        ],
+    }
+
+
+def seed(path, *, users, events_per_week):
+    """Seed the database file and return a session cookie per user."""
+    class SeedConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SECRET_KEY = SESSION_SECRET
+
+    app = create_app(SeedConfig)
+    with app.app_context():
+        db.create_all()
+        seed_team(users=users, events_per_week=events_per_week)
+        for user in User.query:
+            user.set_password("Password123")
+        db.session.commit()
+        usernames = [user.username for user in User.query.order_by(User.id)]
+        db.engine.dispose()
+
+    cookies = []
+    for username in usernames:
+        client = app.test_client()
+        response = client.post(
+            "/login", data={"username": username, "password": "Password123", "submit": "Log In"},
+            headers={"User-Agent": USER_AGENT},
+        )
+        assert response.status_code == 302, username
+        cookies.append(client.get_cookie("session").value)
+    return cookies
+
+
+def _paths(week_start):
+    day = week_start.strftime("%Y-%m-%d")
+    return [
+        "/calendar",
+        "/api/planner",
+        "/rooms",
+        f"/api/rooms/available?start={day}T10:00&end={day}T11:00",
+    ]
+
+
+async def _request(reader, writer, path, cookie):
+    """Send one ``GET`` and read the whole response; return its status."""
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nUser-Agent: {USER_AGENT}\r\n"
+        f"Cookie: session={cookie}\r\n\r\n".encode("latin-1")
+    )
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("server closed the connection")
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    if headers.get("connection") == "close":
+        raise ConnectionResetError("server closed the connection")
+    return status
+
+
+async def _client(port, cookie, paths, offset, state, latencies):
+    connection = None
+    index = offset
+    while not state["stop"]:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection("127.0.0.1", port)
+            status = await _request(*connection, path, cookie)
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            status = None
+            if connection is not None:
+                connection[1].close()
+            connection = None
+        if state["recording"]:
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                state["errors"] += 1
+    if connection is not None:
+        connection[1].close()
+
+
+async def _feed(port, cookie, state):
+    """Hold a change feed open, discarding its keep-alive comments."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /calendar/changes HTTP/1.1\r\nHost: 127.0.0.1\r\nUser-Agent: {USER_AGENT}\r\n"
+        f"Cookie: session={cookie}\r\n\r\n".encode("latin-1")
+    )
+    try:
+        while not state["stop"] and await reader.read(4096):
+            pass
+    finally:
+        writer.close()
+
+
+async def load(port, cookies, paths, *, clients, feeds, warmup, seconds):
+    state = {"stop": False, "recording": False, "errors": 0}
+    latencies = []
+    tasks = [asyncio.ensure_future(_feed(port, cookies[index % len(cookies)], state)) for index in range(feeds)]
+    tasks += [
+        asyncio.ensure_future(_client(port, cookies[index % len(cookies)], paths, index, state, latencies))
+        for index in range(clients)
+    ]
+    await asyncio.sleep(warmup)
+    state["recording"] = True
+    started = time.perf_counter()
+    await asyncio.sleep(seconds)
+    state["recording"] = False
+    elapsed = time.perf_counter() - started
+    state["stop"] = True
+    await asyncio.wait(tasks[feeds:], timeout=30)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return latencies, state["errors"], elapsed
+
+
+def _percentile(values, fraction):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def _wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not listen on port {port}")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--feeds', type=int, default=0, help="idle change feeds held open during the run")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--events-per-week', type=int, default=400)
+    parser.add_argument('--server', choices=("wsgi", "asgi"), action="append", help="default: both")
+    args = parser.parse_args(argv)
+
+    print(f"{args.clients} clients, {args.feeds} open feeds, {args.threads} threads, {args.seconds:g}s each")
+    print(f"{'server':<8} {'requests/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "load.db"
+        cookies = seed(path, users=args.users, events_per_week=args.events_per_week)
+        paths = _paths(week_start_of(datetime.utcnow()))
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{path}",
+            SECRET_KEY=SESSION_SECRET,
+            ASGI_THREADS=str(args.threads),
+            DATABASE_POOL_SIZE=str(args.threads),
+        )
+        for label in args.server or ("wsgi", "asgi"):
+            port = _free_port()
+            process = subprocess.Popen(_servers(port, args.threads)[label], cwd=PROJECT_ROOT, env=env)
+            try:
+                _wait_for_port(port, process)
+                latencies, errors, elapsed = asyncio.run(load(
+                    port, cookies, paths,
+                    clients=args.clients, feeds=args.feeds, warmup=args.warmup, seconds=args.seconds,
+                ))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+            print(
+                f"{label:<8} {len(latencies) / elapsed:>10.0f} {_percentile(latencies, 0.5) * 1000:>8.1f} "
+                f"{_percentile(latencies, 0.99) * 1000:>8.1f} {errors:>8}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark logins per second and per-request authentication overhead.
+
+Run from the project root::
+
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --logins 50 --methods pbkdf2:sha256 pbkdf2:sha256:260000 scrypt
+"""
+import argparse
+import time
+
+from app import create_app, db
+from app.models import User, load_user
+from config import TestConfig
+
+PASSWORD = "Password123"
+
+
+def logins_per_second(app, method, *, logins):
+    """Time full ``POST /login`` round trips for users hashed with ``method``."""
+    app.config["PASSWORD_HASH_METHOD"] = method
+    users = []
+    for index in range(logins):
+        user = User(username=f"{method}-{index}")
+        user.set_password(PASSWORD)
+        users.append(user)
+    db.session.add_all(users)
+    db.session.commit()
+    names = [user.username for user in users]
+
+    started = time.perf_counter()
+    for name in names:
+        # A fresh context per login keeps Flask-Login's ``g`` cache out of the way.
+        with app.app_context():
+            client = app.test_client()
+            response = client.post("/login", data={"username": name, "password": PASSWORD})
+            assert response.status_code == 302, response.status_code
+    return logins / (time.perf_counter() - started)
+
+
+def loader_overhead(app, *, requests):
+    """Return mean ``load_user`` time in microseconds with the cache on and off."""
+    user_id = str(User.query.first().id)
+    results = {}
+    for label, ttl in (("uncached", 0), ("cached", 30)):
+        app.extensions["identity_cache"].ttl = ttl
+        app.extensions["identity_cache"].clear()
+        started = time.perf_counter()
+        for _ in range(requests):
+            load_user(user_id)
+            db.session.expunge_all()
+        results[label] = (time.perf_counter() - started) / requests * 1e6
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--methods', nargs='+', default=['pbkdf2:sha256', 'pbkdf2:sha256:260000', 'pbkdf2:sha256:1000'])
+    args = parser.parse_args(argv)
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        print(f"{'hash method':<24} {'logins/s':>10}")
+        for method in args.methods:
+            print(f"{method:<24} {logins_per_second(app, method, logins=args.logins):>10.1f}")
+
+        print()
+        print(f"{'load_user':<24} {'us/request':>10}")
+        for label, micros in loader_overhead(app, requests=args.requests).items():
+            print(f"{label:<24} {micros:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark free-room searches against a large booking table.
+
+Run from the project root::
+
+    python -m benchmarks.bench_availability
+    python -m benchmarks.bench_availability --rooms 500 --bookings 50000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.availability import find_available_rooms, recurring_windows
+from app.models import Room, Schedule, User
+from config import TestConfig
+
+HORIZON_START = datetime(2024, 1, 1)
+
+
+def seed(*, rooms, bookings, seed=0):
+    """Insert ``rooms`` rooms and ``bookings`` room bookings over one year."""
+    rng = random.Random(seed)
+    db.session.execute(User.__table__.insert(), [{"username": "bench", "password_hash": "x"}])
+    db.session.execute(
+        Room.__table__.insert(),
+        [{"name": f"Room {index:04d}", "capacity": rng.choice([2, 4, 6, 8, 12, 20]), "updated_at": HORIZON_START}
+         for index in range(rooms)],
+    )
+    rows = []
+    for index in range(bookings):
+        start = HORIZON_START + timedelta(days=rng.randrange(365), hours=rng.randrange(8, 18))
+        rows.append({
+            "title": f"Booking {index}",
+            "start_time": start,
+            "end_time": start + timedelta(minutes=rng.choice([30, 60, 90, 120])),
+            "created_at": HORIZON_START,
+            "updated_at": HORIZON_START,
+            "owner_id": 1,
+            "room_id": rng.randrange(1, rooms + 1),
+        })
+    db.session.execute(Schedule.__table__.insert(), rows)
+    db.session.commit()
+
+
+def timed(callable_, *, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = callable_()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, default=300)
+    parser.add_argument('--bookings', type=int, default=30000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seed(rooms=args.rooms, bookings=args.bookings)
+        window_start = HORIZON_START + timedelta(days=180, hours=10)
+        cases = [
+            ("single window", recurring_windows(window_start, window_start + timedelta(hours=1))),
+            ("weekly x 12", recurring_windows(window_start, window_start + timedelta(hours=1), every='weekly', count=12)),
+        ]
+        print(f"{args.rooms} rooms, {args.bookings} bookings")
+        print(f"{'query':<16} {'best ms':>10} {'free rooms':>11}")
+        for label, windows in cases:
+            best, rooms = timed(lambda: find_available_rooms(windows, min_capacity=6), repeat=args.repeat)
+            print(f"{label:<16} {best * 1000:>10.2f} {len(rooms):>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark for the schedule change feed's broker.
+
+Measures publishing one change while 5,000 idle planner pages (1,000 users,
+five open weeks each) are subscribed, and subscribing plus unsubscribing a
+page.  Publishing only touches the pages of the affected users, so its
+cost should not grow with the number of idle connections.
+
+Run from the project root::
+
+    python -m benchmarks.bench_change_feed
+"""
+import sys
+from datetime import timedelta
+from itertools import count
+
+from app.changes import ChangeBroker
+from benchmarks.data import WEEK_START
+from benchmarks.runner import case, main
+
+USERS = 1000
+WEEKS = 5
+
+
+def _broker(pages_per_user):
+    broker = ChangeBroker()
+    subscriptions = [
+        broker.subscribe(user_id, WEEK_START + timedelta(weeks=week), WEEK_START + timedelta(weeks=week + 1))
+        for user_id in range(1, USERS + 1)
+        for week in range(pages_per_user)
+    ]
+    return broker, subscriptions
+
+
+@case(params=[1, WEEKS])
+def publish(benchmark, pages_per_user):
+    broker, subscriptions = _broker(pages_per_user)
+    start = WEEK_START + timedelta(days=1, hours=9)
+    schedule_ids = count(1)
+
+    def publish_change():
+        schedule_id = next(schedule_ids)
+        user_ids = {schedule_id % USERS + offset for offset in range(1, 6)}
+        broker.publish('updated', schedule_id, user_ids, start, start + timedelta(hours=1))
+
+    benchmark(publish_change)
+    benchmark.extra_info['subscriptions'] = len(subscriptions)
+    for subscription in subscriptions:
+        subscription.drain()
+
+
+@case
+def subscribe_unsubscribe(benchmark):
+    broker, _ = _broker(WEEKS)
+
+    def connect():
+        broker.unsubscribe(broker.subscribe(1, WEEK_START, WEEK_START + timedelta(weeks=1)))
+
+    benchmark(connect)
+
+
+if __name__ == '__main__':
+    sys.exit(main(__doc__.splitlines()[0]))
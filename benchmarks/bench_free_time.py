@@ -0,0 +1,52 @@
+"""Benchmark for the common free-time finder (``/api/free-slots``).
+
+A team of 50 people with 250 meetings a week is searched over a four-week
+horizon for 5, 20 and all 50 people, with and without candidate rooms.
+
+Run from the project root::
+
+    python -m benchmarks.bench_free_time
+    python -m benchmarks.bench_free_time --output before.json
+"""
+import sys
+from datetime import timedelta
+from functools import lru_cache
+
+from app import create_app, db
+from app.freetime import find_free_slots
+from benchmarks.data import seed_team
+from benchmarks.runner import case, main
+from config import TestConfig
+
+TEAM_SIZE = 50
+WEEKS = 4
+
+
+@lru_cache(maxsize=None)
+def seeded_app():
+    """Return an app with an in-memory team database and the seeded week start."""
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        week_start = seed_team(users=TEAM_SIZE, rooms=10, weeks=WEEKS, events_per_week=250)
+    return app, week_start
+
+
+@case(params=['5-users', '20-users', '50-users', '20-users-rooms', '50-users-rooms'])
+def find_slots(benchmark, param):
+    people, _, rooms = param.partition('-users')
+    app, week_start = seeded_app()
+    room_ids = range(1, 11) if rooms else ()
+    with app.app_context():
+        def search():
+            db.session.expunge_all()
+            return find_free_slots(
+                range(1, int(people) + 1), room_ids, start=week_start, end=week_start + timedelta(weeks=WEEKS),
+                duration=timedelta(hours=1), day_start_hour=6, day_end_hour=22, limit=5,
+            )
+
+        benchmark(search)
+
+
+if __name__ == '__main__':
+    sys.exit(main(__doc__.splitlines()[0]))
@@ -0,0 +1,158 @@
+"""Benchmark suite for the planner's hot paths.
+
+Covers ``_build_planner``, ``_assign_event_columns``, the week query,
+rendering the planner grid and full ``/calendar`` requests for each of the
+week profiles in :mod:`benchmarks.data`, plus the grid's render time and
+HTML size at 60, 30 and 15-minute slots and the time to the first chunk of
+a streamed ``/calendar``.
+
+Run from the project root::
+
+    python -m benchmarks.bench_hot_paths
+    python -m benchmarks.bench_hot_paths -k 'build_planner*' --rounds 50
+    python -m benchmarks.bench_hot_paths --output before.json
+    python -m benchmarks.bench_hot_paths --compare before.json
+"""
+import sys
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from flask import current_app
+
+from app import create_app, db
+from app.models import User, week_start_of
+from app.routes import _assign_event_columns, _build_planner, _load_planner_schedules, _planner_version
+from benchmarks.data import PROFILES, seed_database
+from benchmarks.runner import case, main
+from config import TestConfig
+
+
+@lru_cache(maxsize=None)
+def seeded_app(profile):
+    """Return an app with its own in-memory database seeded with ``profile``."""
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seed_database(PROFILES[profile])
+    return app
+
+
+def _week():
+    week_start = week_start_of(datetime.utcnow())
+    return week_start, week_start + timedelta(days=7)
+
+
+def _load(viewer):
+    week_start, week_end = _week()
+    return _load_planner_schedules(viewer, week_start=week_start, week_end=week_end)
+
+
+@case(params=sorted(PROFILES))
+def calendar_query(benchmark, profile):
+    with seeded_app(profile).app_context():
+        viewer = db.session.get(User, 1)
+
+        def load_fresh():
+            db.session.expunge_all()
+            return _load(viewer)
+
+        benchmark(load_fresh)
+
+
+@case(params=sorted(PROFILES))
+def planner_version(benchmark, profile):
+    week_start, week_end = _week()
+    with seeded_app(profile).app_context():
+        benchmark(_planner_version, db.session.get(User, 1), week_start=week_start, week_end=week_end)
+
+
+@case(params=sorted(PROFILES))
+def build_planner(benchmark, profile):
+    with seeded_app(profile).app_context():
+        viewer = db.session.get(User, 1)
+        schedules = _load(viewer)
+        benchmark(_build_planner, schedules, week_start=_week()[0], viewer=viewer)
+
+
+@case(params=['dense'])
+def assign_event_columns(benchmark, profile):
+    with seeded_app(profile).app_context():
+        viewer = db.session.get(User, 1)
+        planner = _build_planner(_load(viewer), week_start=_week()[0], viewer=viewer)
+        events = max((day["events"] for day in planner["days"]), key=len)
+        benchmark(lambda: _assign_event_columns(list(events)))
+
+
+@case(params=sorted(PROFILES))
+def render_grid(benchmark, profile):
+    with seeded_app(profile).test_request_context('/calendar'):
+        viewer = db.session.get(User, 1)
+        planner = _build_planner(_load(viewer), week_start=_week()[0], viewer=viewer)
+        template = current_app.jinja_env.get_template('partials/planner_grid.html')
+        benchmark(template.render, planner=planner)
+
+
+@case(params=[60, 30, 15])
+def render_grid_interval(benchmark, minutes):
+    """Grid of the sparse week with ``PLANNER_INTERVAL_MINUTES`` slots; records the HTML size."""
+    app = seeded_app('sparse')
+    with app.test_request_context('/calendar'):
+        previous = app.config['PLANNER_INTERVAL_MINUTES']
+        app.config['PLANNER_INTERVAL_MINUTES'] = minutes
+        try:
+            viewer = db.session.get(User, 1)
+            planner = _build_planner(_load(viewer), week_start=_week()[0], viewer=viewer)
+            template = current_app.jinja_env.get_template('partials/planner_grid.html')
+            html = benchmark(template.render, planner=planner)
+        finally:
+            app.config['PLANNER_INTERVAL_MINUTES'] = previous
+        benchmark.extra_info['html_bytes'] = len(html.encode())
+        benchmark.extra_info['cells'] = html.count('planner-grid__cell"')
+
+
+@case(params=['sparse-cold', 'dense-cold', 'dense-warm', 'shared-cold'])
+def calendar_request(benchmark, param):
+    """Full ``GET /calendar``; ``cold`` empties the planner cache before each call."""
+    profile, mode = param.split('-')
+    app = seeded_app(profile)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = '1'
+        session['_fresh'] = True
+    cache = app.extensions['planner_cache']
+
+    def request_calendar():
+        if mode == 'cold':
+            cache.clear()
+        response = client.get('/calendar')
+        assert response.status_code == 200, response.status_code
+        return response
+
+    benchmark(request_calendar)
+
+
+@case(params=['dense'])
+def calendar_first_chunk(benchmark, profile):
+    """Time to the first chunk of a streamed ``GET /calendar``, closed right after."""
+    app = seeded_app(profile)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = '1'
+        session['_fresh'] = True
+
+    def first_chunk():
+        response = client.get('/calendar')
+        try:
+            return next(iter(response.response))
+        finally:
+            response.close()
+
+    app.config['STREAM_TEMPLATES'] = True
+    try:
+        benchmark(first_chunk)
+    finally:
+        app.config['STREAM_TEMPLATES'] = False
+
+
+if __name__ == '__main__':
+    sys.exit(main(__doc__.splitlines()[0]))
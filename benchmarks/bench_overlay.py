@@ -0,0 +1,66 @@
+"""Benchmark for overlaying many calendars (``/calendar/team``, ``/api/overlay``).
+
+A team of 120 people with 600 meetings a week is overlaid 10, 50 and 100
+calendars at a time; the budget for 100 calendars is 200 ms.
+
+Run from the project root::
+
+    python -m benchmarks.bench_overlay
+    python -m benchmarks.bench_overlay --output before.json
+"""
+import sys
+from functools import lru_cache
+
+from app import create_app, db
+from app.overlay import build_overlay
+from benchmarks.data import seed_team
+from benchmarks.runner import case, main
+from config import TestConfig
+
+TEAM_SIZE = 120
+
+
+@lru_cache(maxsize=None)
+def seeded_app():
+    """Return an app with an in-memory team database and the seeded week start."""
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        week_start = seed_team(users=TEAM_SIZE, rooms=10, events_per_week=600)
+    return app, week_start
+
+
+@case(params=[10, 50, 100])
+def build_overlay_calendars(benchmark, calendars):
+    app, week_start = seeded_app()
+    with app.app_context():
+        def overlay():
+            db.session.expunge_all()
+            return build_overlay(
+                range(1, calendars + 1), (), viewer_id=1, start=week_start, days=7,
+                slot_minutes=30, day_start_hour=6, day_end_hour=22,
+            )
+
+        benchmark(overlay)
+
+
+@case(params=[100])
+def overlay_api(benchmark, calendars):
+    app, _ = seeded_app()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = '1'
+        session['_fresh'] = True
+    url = '/api/overlay?users=' + ','.join(str(user_id) for user_id in range(1, calendars - 9))
+    url += '&rooms=' + ','.join(str(room_id) for room_id in range(1, 11))
+
+    def request_overlay():
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+        return response
+
+    benchmark(request_overlay)
+
+
+if __name__ == '__main__':
+    sys.exit(main(__doc__.splitlines()[0]))
@@ -0,0 +1,44 @@
+"""Microbenchmark for ``_build_planner`` over synthetic weeks.
+
+Run from the project root::
+
+    python -m benchmarks.bench_planner
+    python -m benchmarks.bench_planner --sizes 100 1000 10000 --repeat 5
+"""
+import argparse
+import time
+
+from app import create_app
+from app.routes import _build_planner
+from benchmarks.data import WEEK_START, synthetic_week
+from config import TestConfig
+
+
+def run(sizes, *, repeat):
+    app = create_app(TestConfig)
+    results = []
+    with app.app_context():
+        for size in sizes:
+            schedules, viewer = synthetic_week(size)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                _build_planner(schedules, week_start=WEEK_START, viewer=viewer)
+                timings.append(time.perf_counter() - started)
+            results.append((size, min(timings)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'events':>8} {'best ms':>10} {'us/event':>10}")
+    for size, best in run(args.sizes, repeat=args.repeat):
+        print(f"{size:>8} {best * 1000:>10.2f} {best * 1e6 / size:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
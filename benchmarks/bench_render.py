@@ -0,0 +1,64 @@
+"""Benchmark for rendering the planner grid with fragment caching.
+
+Renders ``partials/planner_grid.html`` for synthetic weeks of 10, 100 and
+1000 events in three modes:
+
+``cold``
+    the fragment cache is emptied before every render, i.e. every cell and
+    event block is rendered, as before fragment caching;
+``warm``
+    every fragment is cached, as when another viewer or a re-render after
+    an unrelated change needs the same week;
+``edited``
+    one event changes before every render, so only its block is rendered.
+
+Run from the project root::
+
+    python -m benchmarks.bench_render
+    python -m benchmarks.bench_render -k '*1000*' --rounds 50
+"""
+import sys
+from functools import lru_cache
+from itertools import count
+
+from flask import current_app
+
+from app import create_app
+from app.routes import _build_planner
+from benchmarks.data import WEEK_START, synthetic_week
+from benchmarks.runner import case, main
+from config import TestConfig
+
+
+@lru_cache(maxsize=None)
+def _app():
+    return create_app(TestConfig)
+
+
+@case(params=[f'{events}-{mode}' for events in (10, 100, 1000) for mode in ('cold', 'warm', 'edited')])
+def render_grid(benchmark, param):
+    events, mode = param.split('-')
+    app = _app()
+    with app.test_request_context('/calendar'):
+        schedules, viewer = synthetic_week(int(events), durations=(15, 30, 60, 90, 120))
+        planner = _build_planner(schedules, week_start=WEEK_START, viewer=viewer)
+        template = current_app.jinja_env.get_template('partials/planner_grid.html')
+        cache = current_app.extensions['fragment_cache']
+        cache.clear()
+        edited = next(day["events"][0] for day in planner["days"] if day["events"])
+        edits = count()
+
+        def render():
+            if mode == 'cold':
+                cache.clear()
+            elif mode == 'edited':
+                edited["title"] = f"Edited {next(edits)}"
+            return template.render(planner=planner)
+
+        html = benchmark(render)
+        benchmark.extra_info['html_bytes'] = len(html.encode())
+        benchmark.extra_info['fragments'] = cache.stats()['size']
+
+
+if __name__ == '__main__':
+    sys.exit(main(__doc__.splitlines()[0]))
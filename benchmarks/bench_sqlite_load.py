@@ -0,0 +1,137 @@
+"""Load-test parallel SQLite writers and readers with and without tuning.
+
+Each configuration gets a fresh database file.  Writer threads insert and
+commit schedules one at a time while reader threads run planner-style week
+queries; the script reports commits/s, queries/s and "database is locked"
+errors for the default engine setup and for ``Config.SQLITE_PRAGMAS``.
+
+Run from the project root::
+
+    python -m benchmarks.bench_sqlite_load
+    python -m benchmarks.bench_sqlite_load --writers 8 --readers 8 --seconds 10
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.models import Schedule, User
+from config import Config, TestConfig
+
+HORIZON_START = datetime(2024, 1, 1)
+
+
+def make_config(path, *, tuned):
+    class LoadConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLITE_PRAGMAS = Config.SQLITE_PRAGMAS if tuned else {}
+
+    return LoadConfig
+
+
+def seed(*, users, bookings):
+    db.session.execute(
+        User.__table__.insert(),
+        [{"username": f"load-{index}", "password_hash": "x"} for index in range(users)],
+    )
+    rng = random.Random(0)
+    rows = []
+    for index in range(bookings):
+        start = HORIZON_START + timedelta(days=rng.randrange(365), hours=rng.randrange(8, 18))
+        rows.append({
+            "title": f"Seed {index}",
+            "start_time": start,
+            "end_time": start + timedelta(hours=1),
+            "series_end": start + timedelta(hours=1),
+            "created_at": HORIZON_START,
+            "updated_at": HORIZON_START,
+            "owner_id": rng.randrange(1, users + 1),
+        })
+    db.session.execute(Schedule.__table__.insert(), rows)
+    db.session.commit()
+
+
+def run(app, *, writers, readers, seconds, users):
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def writer(seed_value):
+        rng = random.Random(seed_value)
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                start = HORIZON_START + timedelta(days=rng.randrange(365), hours=rng.randrange(8, 18))
+                db.session.add(Schedule(
+                    title="Load", start_time=start, end_time=start + timedelta(hours=1),
+                    owner_id=rng.randrange(1, users + 1),
+                ))
+                try:
+                    db.session.commit()
+                    bump("writes")
+                except OperationalError:
+                    db.session.rollback()
+                    bump("locked")
+
+    def reader(seed_value):
+        rng = random.Random(seed_value)
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                week_start = HORIZON_START + timedelta(weeks=rng.randrange(52))
+                try:
+                    Schedule.query.filter(
+                        Schedule.owner_id == rng.randrange(1, users + 1),
+                        Schedule.start_time < week_start + timedelta(days=7),
+                        Schedule.series_end > week_start,
+                    ).all()
+                    bump("reads")
+                except OperationalError:
+                    bump("locked")
+                finally:
+                    db.session.rollback()
+
+    threads = [threading.Thread(target=writer, args=(index,)) for index in range(writers)]
+    threads += [threading.Thread(target=reader, args=(1000 + index,)) for index in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--bookings', type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s each")
+    print(f"{'engine':<10} {'commits/s':>10} {'queries/s':>10} {'locked':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, tuned in (("default", False), ("tuned", True)):
+            app = create_app(make_config(Path(directory) / f"{label}.db", tuned=tuned))
+            with app.app_context():
+                db.create_all()
+                seed(users=args.users, bookings=args.bookings)
+                counts = run(app, writers=args.writers, readers=args.readers, seconds=args.seconds, users=args.users)
+                db.engine.dispose()
+            print(
+                f"{label:<10} {counts['writes'] / args.seconds:>10.0f} "
+                f"{counts['reads'] / args.seconds:>10.0f} {counts['locked']:>8}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""Deterministic data for the benchmarks.
+
+Every generator takes a ``seed`` so two runs (or two commits) measure the
+same rows.  :data:`PROFILES` describes the week shapes the hot-path suite
+uses:
+
+``sparse``
+    a handful of meetings per person spread over working hours;
+``dense``
+    hundreds of short, heavily overlapping events in the viewer's week;
+``shared``
+    fewer events, each with a large participant list that includes the
+    viewer, which stresses participant loading and rendering.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from app import db
+from app.models import Room, Schedule, User, schedule_participants, week_start_of
+
+WEEK_START = datetime(2024, 1, 1)
+
+
+class Profile(NamedTuple):
+    users: int
+    rooms: int
+    events: int  # events in the viewer's week
+    participants: int  # participants per event
+    durations: tuple  # minutes
+
+
+PROFILES = {
+    'sparse': Profile(users=50, rooms=10, events=20, participants=2, durations=(30, 60)),
+    'dense': Profile(users=50, rooms=20, events=400, participants=3, durations=(15, 30, 60, 90, 120)),
+    'shared': Profile(users=200, rooms=20, events=80, participants=60, durations=(30, 60, 120)),
+}
+
+
+def _event_start(rng, week_start):
+    """Return a start on a 15-minute boundary between 07:00 and 19:00 in the week."""
+    return week_start + timedelta(days=rng.randrange(7), minutes=7 * 60 + 15 * rng.randrange(48))
+
+
+def synthetic_week(count, *, seed=0, durations=(15, 30, 60, 90, 120, 24 * 60), participants=3):
+    """Build ``count`` transient schedules spread over one week, sorted by start.
+
+    Returns ``(schedules, viewer)``; nothing touches the database, so this is
+    the input for benchmarking ``_build_planner`` on its own.
+    """
+    rng = random.Random(seed)
+    users = [User(id=index, username=f"user-{index}") for index in range(max(50, participants + 1))]
+    rooms = [Room(id=index, name=f"Room {index}", capacity=8) for index in range(20)]
+    schedules = []
+    for index in range(count):
+        start = WEEK_START + timedelta(minutes=15 * rng.randrange(7 * 24 * 4))
+        duration = timedelta(minutes=rng.choice(durations))
+        owner = rng.choice(users)
+        schedule = Schedule(
+            id=index,
+            title=f"Event {index}",
+            start_time=start,
+            end_time=start + duration,
+            location=rng.choice([None, "HQ"]),
+            owner=owner,
+            owner_id=owner.id,
+            room=rng.choice([None, *rooms]),
+        )
+        schedule.participants = rng.sample(users, participants)
+        schedules.append(schedule)
+    schedules.sort(key=lambda item: item.start_time)
+    return schedules, users[0]
+
+
+def seed_database(profile, *, week_start=None, seed=0):
+    """Insert ``profile``'s users, rooms and week with core inserts; return the viewer's id.
+
+    The week defaults to the current one so ``/calendar`` shows it.  User 1
+    is the viewer: it owns half of the events and attends the rest.
+    """
+    rng = random.Random(seed)
+    week_start = week_start or week_start_of(datetime.utcnow())
+    db.session.execute(
+        User.__table__.insert(),
+        [{"username": f"bench-{index}", "password_hash": "x"} for index in range(profile.users)],
+    )
+    db.session.execute(
+        Room.__table__.insert(),
+        [{"name": f"Room {index:03d}", "capacity": rng.choice([4, 8, 12]), "updated_at": week_start}
+         for index in range(profile.rooms)],
+    )
+    user_ids = list(range(1, profile.users + 1))
+    rows, attendees = [], []
+    for index in range(profile.events):
+        start = _event_start(rng, week_start)
+        end = start + timedelta(minutes=rng.choice(profile.durations))
+        owner_id = 1 if index % 2 == 0 else rng.choice(user_ids[1:])
+        rows.append({
+            "title": f"Event {index}",
+            "start_time": start,
+            "end_time": end,
+            "series_end": end,
+            "location": rng.choice([None, "HQ"]),
+            "created_at": week_start,
+            "updated_at": week_start,
+            "owner_id": owner_id,
+            "room_id": rng.choice([None, rng.randrange(1, profile.rooms + 1)]),
+        })
+        others = [user_id for user_id in user_ids if user_id != owner_id]
+        chosen = set(rng.sample(others, profile.participants))
+        if owner_id != 1:
+            chosen.add(1)
+        attendees.append(chosen)
+    schedule_ids = db.session.execute(
+        Schedule.__table__.insert().returning(Schedule.__table__.c.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    db.session.execute(
+        schedule_participants.insert(),
+        [{"schedule_id": schedule_id, "user_id": user_id}
+         for schedule_id, users in zip(schedule_ids, attendees) for user_id in users],
+    )
+    db.session.commit()
+    return 1
+
+
+def seed_team(*, users, rooms=10, weeks=1, events_per_week=400, participants=4, week_start=None, seed=0):
+    """Insert a team's calendars: ``events_per_week`` meetings a week among ``users`` people.
+
+    Unlike :func:`seed_database` nobody attends everything, so this is the
+    input for overlaying many people's calendars.  Returns the week start.
+    """
+    rng = random.Random(seed)
+    week_start = week_start or week_start_of(datetime.utcnow())
+    db.session.execute(
+        User.__table__.insert(),
+        [{"username": f"team-{index:03d}", "password_hash": "x"} for index in range(users)],
+    )
+    db.session.execute(
+        Room.__table__.insert(),
+        [{"name": f"Team Room {index:02d}", "capacity": 8, "updated_at": week_start} for index in range(rooms)],
+    )
+    user_ids = list(range(1, users + 1))
+    rows, attendees = [], []
+    for week in range(weeks):
+        for index in range(events_per_week):
+            start = _event_start(rng, week_start + timedelta(weeks=week))
+            end = start + timedelta(minutes=rng.choice((30, 60, 90)))
+            owner_id = rng.choice(user_ids)
+            rows.append({
+                "title": f"Meeting {week}-{index}",
+                "start_time": start,
+                "end_time": end,
+                "series_end": end,
+                "created_at": week_start,
+                "updated_at": week_start,
+                "owner_id": owner_id,
+                "room_id": rng.choice([None, rng.randrange(1, rooms + 1)]),
+            })
+            attendees.append(rng.sample([user_id for user_id in user_ids if user_id != owner_id], participants))
+    schedule_ids = db.session.execute(
+        Schedule.__table__.insert().returning(Schedule.__table__.c.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    db.session.execute(
+        schedule_participants.insert(),
+        [{"schedule_id": schedule_id, "user_id": user_id}
+         for schedule_id, users in zip(schedule_ids, attendees) for user_id in users],
+    )
+    db.session.commit()
+    return week_start
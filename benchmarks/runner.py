@@ -0,0 +1,151 @@
+"""A small pytest-benchmark style runner with comparable JSON results.
+
+Cases are plain functions registered with :func:`case` that receive a
+``benchmark`` callable as their first argument, exactly like the
+``benchmark`` fixture of pytest-benchmark: setup happens before the call
+and only ``benchmark(function, *args, **kwargs)`` is timed.  ``params``
+turns one function into a case per value, named ``name[value]``.  Values a
+case stores in ``benchmark.extra_info`` (payload sizes, row counts) are
+saved with its timings.
+
+:func:`main` runs the registered cases and can write the results as JSON
+(``--output``) and compare them against an earlier file (``--compare``),
+so two commits can be measured on the same machine and diffed.
+"""
+import argparse
+import fnmatch
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+RESULTS_VERSION = 1
+CASES = []
+
+
+def case(function=None, *, params=(None,)):
+    """Register ``function`` as a benchmark case, once per entry of ``params``."""
+    def register(function):
+        for param in params:
+            name = function.__name__ if param is None else f"{function.__name__}[{param}]"
+            CASES.append((name, function, param))
+        return function
+
+    return register(function) if function is not None else register
+
+
+class Benchmark:
+    """Times a callable: a few warm-up calls, then ``rounds`` timed calls."""
+
+    def __init__(self, *, rounds, warmup=1):
+        self.rounds = rounds
+        self.warmup = warmup
+        self.timings = []
+        self.extra_info = {}
+
+    def __call__(self, function, *args, **kwargs):
+        for _ in range(self.warmup):
+            function(*args, **kwargs)
+        result = None
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            result = function(*args, **kwargs)
+            self.timings.append(time.perf_counter() - started)
+        return result
+
+    def stats(self):
+        timings = self.timings
+        return {
+            "rounds": len(timings),
+            "min": min(timings),
+            "max": max(timings),
+            "mean": statistics.fmean(timings),
+            "median": statistics.median(timings),
+            "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_cases(*, patterns=("*",), rounds=20):
+    """Run the registered cases whose name matches any of ``patterns``."""
+    results = {}
+    for name, function, param in CASES:
+        if not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+            continue
+        benchmark = Benchmark(rounds=rounds)
+        if param is None:
+            function(benchmark)
+        else:
+            function(benchmark, param)
+        if not benchmark.timings:
+            raise RuntimeError(f"benchmark case {name} never called benchmark()")
+        results[name] = benchmark.stats()
+        if benchmark.extra_info:
+            results[name]["extra_info"] = dict(benchmark.extra_info)
+        print(f"{name:<40} {results[name]['median'] * 1000:>10.3f} ms", file=sys.stderr)
+    return {
+        "version": RESULTS_VERSION,
+        "commit": _commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(baseline, current, *, threshold=0.10):
+    """Return report lines comparing medians; slower than ``threshold`` is flagged."""
+    lines = [f"{'case':<40} {'before ms':>10} {'after ms':>10} {'change':>8}"]
+    regressions = 0
+    for name, stats in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            lines.append(f"{name:<40} {'-':>10} {stats['median'] * 1000:>10.3f} {'new':>8}")
+            continue
+        change = stats["median"] / before["median"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  slower"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  faster"
+        lines.append(
+            f"{name:<40} {before['median'] * 1000:>10.3f} {stats['median'] * 1000:>10.3f} {change:>+8.1%}{flag}"
+        )
+    return lines, regressions
+
+
+def main(description, argv=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-k', dest='patterns', nargs='+', default=['*'], help='Glob patterns of cases to run.')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--compare', help='Compare against results written by an earlier --output.')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown reported as a regression.')
+    args = parser.parse_args(argv)
+
+    results = run_cases(patterns=args.patterns, rounds=args.rounds)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            json.dump(results, stream, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as stream:
+            baseline = json.load(stream)
+        lines, regressions = compare(baseline, results, threshold=args.threshold)
+        print('\n'.join(lines))
+        return 1 if regressions else 0
+    print(f"{'case':<40} {'median ms':>10} {'min ms':>10} {'stddev':>10}")
+    for name, stats in results["results"].items():
+        print(f"{name:<40} {stats['median'] * 1000:>10.3f} {stats['min'] * 1000:>10.3f} {stats['stddev'] * 1000:>10.3f}")
+    return 0
@@ -6,13 +6,56 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connections per process (see app/database.py); match the worker's threads.
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE') or 5)
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW') or 10)
+    DATABASE_POOL_TIMEOUT = 30
+    # Applied to every SQLite connection; an empty dict disables tuning.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # safe with WAL, fsyncs at checkpoints only
+        'busy_timeout': 5000,  # ms a writer waits for the lock
+        'cache_size': -20000,  # KiB, i.e. about 20 MB of page cache
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    }
+    # Server-Timing headers and Prometheus histograms at /metrics.
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', '').lower() in ('1', 'true', 'yes')
     PLANNER_START_HOUR = 6
     PLANNER_END_HOUR = 22
     PLANNER_INTERVAL_MINUTES = 60
+    PLANNER_CACHE_SIZE = 512
+    # Send planner pages as they are rendered instead of buffering them.
+    STREAM_TEMPLATES = True
+    # Seconds between keep-alive comments on idle change feeds, and how many
+    # recent changes a reconnecting page can catch up on.
+    CHANGE_FEED_HEARTBEAT = 15
+    CHANGE_FEED_HISTORY = 256
+    # Rendered grid skeletons and event blocks kept for reuse across planners.
+    FRAGMENT_CACHE_SIZE = 8192
+    # ASGI mode (asgi.py): threads running the views that stay synchronous,
+    # async views running at once, and the asyncio database URL when it is
+    # not SQLALCHEMY_DATABASE_URI's file with the aiosqlite driver.
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS') or 10)
+    ASGI_CONCURRENCY = int(os.environ.get('ASGI_CONCURRENCY') or 32)
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL')
+    # Slot length of the team overlay's busy counts.
+    OVERLAY_SLOT_MINUTES = 30
+    ROOM_PAGE_SIZE = 50
+    # Larger room/user directories are searched instead of listed in forms.
+    FORM_CHOICES_INLINE_LIMIT = 200
+    # Seconds a logged-in user is served from memory instead of the database.
+    LOGIN_CACHE_TTL = 30
+    # Werkzeug hash method for new passwords, e.g. ``pbkdf2:sha256:600000`` or
+    # ``scrypt``.  Stored hashes made with another method are upgraded on login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256'
 
 class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False # Disable CSRF for tests
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    # Unread test-client responses would keep a streamed page's request context pushed.
+    STREAM_TEMPLATES = False
 
 
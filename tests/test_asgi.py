@@ -0,0 +1,178 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import inspect
+
+from app import db
+from app.asgi import create_asgi_app
+from app.async_views import load_user as async_load_user
+from app.models import Room, Schedule, User, load_user, week_start_of
+from config import TestConfig
+
+from tests.test_calendar import counted_statements, login
+
+
+@pytest.fixture()
+def asgi_app(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'asgi.db'}"
+
+    asgi_app = create_asgi_app(FileConfig)
+    with asgi_app.app.app_context():
+        db.create_all()
+        for username in ("owner", "guest"):
+            user = User(username=username)
+            user.set_password("Password123")
+            db.session.add(user)
+        db.session.add(Room(name="Oak", capacity=6))
+        db.session.commit()
+        yield asgi_app
+        db.session.remove()
+
+
+def run(asgi_app, scenario):
+    """Run ``scenario(client)`` against the ASGI app and dispose its async engine."""
+    async def main():
+        transport = httpx.ASGITransport(app=asgi_app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+                return await scenario(client)
+        finally:
+            await asgi_app.app.extensions["async_engine"].dispose()
+
+    return asyncio.run(main())
+
+
+async def asgi_login(client, username):
+    response = await client.post("/login", data={"username": username, "password": "Password123", "submit": "Log In"})
+    assert response.status_code == 302
+
+
+def test_forms_run_in_threads_and_reads_on_the_async_engine(asgi_app):
+    week_start = week_start_of(datetime.utcnow())
+    start = week_start + timedelta(days=1, hours=10)
+
+    async def scenario(client):
+        assert (await client.get("/calendar")).headers["location"].startswith("/login")
+        await asgi_login(client, "owner")
+        created = await client.post("/schedules/new", data={
+            "title": "Async standup",
+            "start_time": start.strftime("%Y-%m-%dT%H:%M"),
+            "end_time": (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M"),
+            "submit": "Save",
+        })
+        assert created.status_code == 302
+        with counted_statements(db.engine) as statements:
+            page = await client.get("/calendar")
+            repeat = await client.get("/calendar", headers={"If-None-Match": page.headers["ETag"]})
+            rooms = await client.get("/rooms")
+        return page, repeat, rooms, statements
+
+    page, repeat, rooms, statements = run(asgi_app, scenario)
+
+    assert page.status_code == 200
+    assert "Async standup" in page.text
+    assert repeat.status_code == 304
+    assert rooms.status_code == 200 and "Oak" in rooms.text
+    assert statements == []
+    assert Schedule.query.one().title == "Async standup"
+
+
+def test_async_apis_match_the_wsgi_responses(asgi_app):
+    week_start = week_start_of(datetime.utcnow())
+    owner = User.query.filter_by(username="owner").one()
+    db.session.add(Schedule(
+        title="Review", start_time=week_start + timedelta(days=2, hours=9),
+        end_time=week_start + timedelta(days=2, hours=10), owner=owner,
+    ))
+    db.session.commit()
+    available = (
+        f"/api/rooms/available?start={week_start:%Y-%m-%d}T09:00&end={week_start:%Y-%m-%d}T10:00"
+        "&every=daily&count=3"
+    )
+    paths = ["/api/planner?weeks=2", "/api/planner?month=2024-02", available, "/api/rooms/available?start=x"]
+
+    async def scenario(client):
+        await asgi_login(client, "owner")
+        return [await client.get(path) for path in paths]
+
+    asgi_responses = run(asgi_app, scenario)
+    client = asgi_app.app.test_client()
+    login(client, "owner", "Password123")
+
+    for path, asgi_response in zip(paths, asgi_responses):
+        wsgi_response = client.get(path)
+        assert asgi_response.status_code == wsgi_response.status_code, path
+        if wsgi_response.status_code == 200:
+            assert asgi_response.json() == wsgi_response.get_json(), path
+    assert asgi_responses[0].json()["days"][2]["events"][0]["title"] == "Review"
+
+
+def test_change_feed_streams_on_the_event_loop(asgi_app):
+    week_start = week_start_of(datetime.utcnow())
+    broker = asgi_app.app.extensions["change_broker"]
+    guest = User.query.filter_by(username="guest").one()
+
+    async def scenario(client):
+        await asgi_login(client, "guest")
+        cookie = "; ".join(f"{name}={value}" for name, value in client.cookies.items())
+        sent, disconnect = [], asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if b"event: schedule" in message.get("body", b""):
+                disconnect.set()
+
+        scope = {
+            "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": "/calendar/changes", "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode())],
+            "server": ("localhost", 80), "client": ("127.0.0.1", 5000),
+        }
+        stream = asyncio.ensure_future(asgi_app(scope, receive, send))
+        while broker.subscriber_count() == 0:
+            await asyncio.sleep(0.01)
+        await asyncio.to_thread(
+            broker.publish, "created", 7, {guest.id},
+            week_start + timedelta(hours=9), week_start + timedelta(hours=10),
+        )
+        await asyncio.wait_for(stream, 5)
+        return sent
+
+    sent = run(asgi_app, scenario)
+
+    assert sent[0]["status"] == 200
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in sent[0]["headers"]
+    body = b"".join(message.get("body", b"") for message in sent[1:]).decode()
+    data = body.split("event: schedule\ndata: ")[1].split("\n")[0]
+    assert json.loads(data)["schedule_id"] == 7
+    assert broker.subscriber_count() == 0
+
+
+def test_async_and_sync_loaders_cache_the_same_snapshot(asgi_app):
+    cache = asgi_app.app.extensions["identity_cache"]
+    owner, guest = (User.query.filter_by(username=name).one() for name in ("owner", "guest"))
+
+    async def scenario(client):
+        with asgi_app.app.test_request_context():
+            return await async_load_user(owner.id)
+
+    loaded = run(asgi_app, scenario)
+    with asgi_app.app.test_request_context():
+        load_user(guest.id)
+        db.session.remove()
+
+    async_cached, sync_cached = cache.get(owner.id), cache.get(guest.id)
+    assert async_cached is not loaded
+    assert type(async_cached) is type(sync_cached) is User
+    for cached, user in ((async_cached, owner), (sync_cached, guest)):
+        assert inspect(cached).detached
+        assert inspect(cached).unloaded == inspect(sync_cached).unloaded
+        assert (cached.id, cached.username, cached.password_hash) == (user.id, user.username, user.password_hash)
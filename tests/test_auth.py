@@ -1,4 +1,7 @@
-from app.models import User
+from app import db
+from app.models import User, load_user
+
+from tests.test_calendar import counted_statements
 
 
 def test_registration_creates_user_and_redirects_to_login(client):
@@ -87,3 +90,40 @@ def test_logout_clears_session(client, user_factory):
 
     assert response.status_code == 200
     assert b"You have been logged out." in response.data
+
+
+def test_login_rehashes_password_made_with_an_old_policy(app, client, user_factory):
+    user = user_factory(username="validuser", password="Password123")
+    old_hash = user.password_hash
+    app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:2000"
+
+    client.post("/login", data={"username": "validuser", "password": "Password123", "submit": "Log In"})
+
+    user = User.query.filter_by(username="validuser").one()
+    assert user.password_hash != old_hash
+    assert user.password_hash.startswith("pbkdf2:sha256:2000$")
+    assert not user.password_needs_rehash()
+    assert user.check_password("Password123")
+
+
+def test_user_loader_serves_cached_users_until_they_change(user_factory):
+    user_id = str(user_factory(username="validuser", password="Password123").id)
+    db.session.expunge_all()
+    assert load_user(user_id).username == "validuser"
+
+    with counted_statements(db.engine) as statements:
+        cached = load_user(user_id)
+    assert cached.username == "validuser"
+    assert not statements
+
+    cached.set_password("Changed123")
+    db.session.commit()
+    db.session.expunge_all()
+    with counted_statements(db.engine) as statements:
+        reloaded = load_user(user_id)
+    assert statements
+    assert reloaded.check_password("Changed123")
+
+    db.session.delete(reloaded)
+    db.session.commit()
+    assert load_user(user_id) is None
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.availability import find_available_rooms, recurring_windows
+from app.models import Room, Schedule
+
+from tests.test_calendar import login
+
+
+def book(room, owner, start, hours=1):
+    db.session.add(Schedule(title="Booked", start_time=start, end_time=start + timedelta(hours=hours), owner=owner, room=room))
+
+
+def test_available_rooms_excludes_overlapping_bookings_and_small_rooms(app, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    small = Room(name="Huddle", capacity=2)
+    booked = Room(name="Boardroom", capacity=12)
+    adjacent = Room(name="Atrium", capacity=10)
+    free = Room(name="Library", capacity=8)
+    db.session.add_all([small, booked, adjacent, free])
+    start = datetime(2024, 5, 6, 10, 0)
+    book(booked, owner, start + timedelta(minutes=30))
+    book(adjacent, owner, start - timedelta(hours=1))  # ends exactly when the window starts
+    db.session.commit()
+
+    rooms = find_available_rooms([(start, start + timedelta(hours=1))], min_capacity=4)
+
+    assert [room.name for room in rooms] == ["Library", "Atrium"]
+
+
+def test_available_rooms_must_be_free_for_every_recurring_window(app, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    weekly_clash = Room(name="Cedar", capacity=6)
+    free = Room(name="Maple", capacity=6)
+    db.session.add_all([weekly_clash, free])
+    start = datetime(2024, 5, 6, 9, 0)
+    book(weekly_clash, owner, start + timedelta(weeks=2))
+    db.session.commit()
+
+    windows = recurring_windows(start, start + timedelta(minutes=30), every="weekly", count=4)
+
+    assert len(windows) == 4
+    assert [room.name for room in find_available_rooms(windows)] == ["Maple"]
+
+
+def test_available_rooms_api(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    room = Room(name="Orchid", capacity=4)
+    db.session.add(room)
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    response = client.get("/api/rooms/available?start=2024-05-06T09:00&end=2024-05-06T10:00&capacity=4")
+    assert response.status_code == 200
+    assert response.get_json()["rooms"] == [{"id": room.id, "name": "Orchid", "capacity": 4}]
+
+    invalid = client.get("/api/rooms/available?start=2024-05-06T10:00&end=2024-05-06T09:00")
+    assert invalid.status_code == 400
@@ -0,0 +1,24 @@
+import json
+
+from benchmarks import bench_hot_paths  # noqa: F401 - registers the cases
+from benchmarks.runner import compare, run_cases
+
+
+def test_hot_path_cases_run_and_produce_comparable_results():
+    results = run_cases(patterns=["*[sparse*"], rounds=1)
+
+    assert set(results["results"]) == {
+        "calendar_query[sparse]",
+        "planner_version[sparse]",
+        "build_planner[sparse]",
+        "render_grid[sparse]",
+        "calendar_request[sparse-cold]",
+    }
+    assert json.loads(json.dumps(results)) == results
+
+    slower = json.loads(json.dumps(results))
+    for stats in slower["results"].values():
+        stats["median"] *= 2
+    lines, regressions = compare(results, slower)
+    assert regressions == len(results["results"])
+    assert all(line.endswith("slower") for line in lines[1:])
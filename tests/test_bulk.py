@@ -0,0 +1,215 @@
+import json
+from datetime import date, datetime, timedelta
+
+from app import db
+from app.models import RecurrenceExclusion, Room, Schedule, User, week_start_of
+
+from tests.test_calendar import login
+
+
+def _seed(user_factory):
+    alice = user_factory(username="alice")
+    bob = user_factory(username="bob")
+    room = Room(name="Orion", capacity=6)
+    db.session.add(room)
+    db.session.flush()
+    standup = Schedule(
+        title="Standup",
+        start_time=datetime(2024, 4, 1, 9, 0),
+        end_time=datetime(2024, 4, 1, 9, 15),
+        location="Orion",
+        owner=alice,
+        room=room,
+        recurrence="weekly",
+        recurrence_count=10,
+    )
+    standup.participants.append(bob)
+    db.session.add(standup)
+    db.session.add(
+        Schedule(
+            title="Review",
+            start_time=datetime(2024, 4, 2, 13, 0),
+            end_time=datetime(2024, 4, 2, 14, 0),
+            owner=bob,
+        )
+    )
+    db.session.commit()
+    db.session.add(RecurrenceExclusion(schedule_id=standup.id, occurrence_date=date(2024, 4, 8)))
+    db.session.commit()
+
+
+def _export(runner, kind, path):
+    result = runner.invoke(args=["export-data", kind, str(path)])
+    assert result.exit_code == 0, result.output
+    return path.read_text(encoding="utf-8")
+
+
+def _wipe():
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
+
+
+def _snapshot():
+    return [
+        (
+            schedule.title,
+            schedule.start_time,
+            schedule.end_time,
+            schedule.location,
+            schedule.owner.username,
+            schedule.room.name if schedule.room else None,
+            sorted(user.username for user in schedule.participants),
+            schedule.recurrence,
+            schedule.recurrence_count,
+            schedule.series_end,
+            sorted(exclusion.occurrence_date for exclusion in schedule.exclusions),
+        )
+        for schedule in Schedule.query.order_by(Schedule.start_time)
+    ]
+
+
+def test_export_then_import_round_trips_every_kind(app, user_factory, tmp_path):
+    runner = app.test_cli_runner()
+    _seed(user_factory)
+    before = _snapshot()
+
+    for extension in ("csv", "jsonl"):
+        paths = {kind: tmp_path / f"{kind}.{extension}" for kind in ("users", "rooms", "schedules")}
+        for kind, path in paths.items():
+            _export(runner, kind, path)
+        _wipe()
+
+        for kind in ("users", "rooms", "schedules"):
+            result = runner.invoke(args=["import-data", kind, str(paths[kind]), "--batch-size", "1"])
+            assert result.exit_code == 0, result.output
+        db.session.expire_all()
+
+        assert _snapshot() == before
+        assert User.query.filter_by(username="alice").one().check_password("Password123")
+
+
+def test_import_skips_existing_users_and_rooms(app, user_factory, tmp_path):
+    user_factory(username="alice")
+    source = tmp_path / "users.jsonl"
+    source.write_text('{"username":"alice","password":"x"}\n{"username":"carol","password":"Secret123"}\n')
+
+    result = app.test_cli_runner().invoke(args=["import-data", "users", str(source)])
+
+    assert result.exit_code == 0, result.output
+    assert "Imported 1 users (1 skipped)" in result.output
+    assert User.query.filter_by(username="carol").one().check_password("Secret123")
+
+
+def test_import_reports_the_offending_row(app, user_factory, tmp_path):
+    user_factory(username="alice")
+    source = tmp_path / "schedules.csv"
+    source.write_text(
+        "title,start_time,end_time,owner\n"
+        "Ok,2024-04-01T09:00,2024-04-01T10:00,alice\n"
+        "Broken,2024-04-01T09:00,2024-04-01T10:00,mallory\n"
+    )
+
+    result = app.test_cli_runner().invoke(args=["import-data", "schedules", str(source), "--batch-size", "1"])
+
+    assert result.exit_code != 0
+    assert "row 2: unknown owner 'mallory'" in result.output
+    assert [schedule.title for schedule in Schedule.query] == ["Ok"]
+
+
+def test_import_reports_malformed_json_lines(app, tmp_path):
+    source = tmp_path / "users.jsonl"
+    runner = app.test_cli_runner()
+
+    for broken, message in (('{"username": "bob"', "row 2: invalid JSON"), ('["bob"]', "row 2: expected a JSON object")):
+        source.write_text(f'{{"username": "alice", "password": "Secret123"}}\n\n{broken}\n')
+        result = runner.invoke(args=["import-data", "users", str(source), "--batch-size", "1"])
+
+        assert result.exit_code != 0
+        assert message in result.output
+        assert "earlier batches were committed" in result.output
+        assert "Traceback" not in result.output
+    assert [user.username for user in User.query] == ["alice"]
+
+
+def test_import_rejects_recurrence_counts_the_form_would(app, user_factory, tmp_path):
+    user_factory(username="alice")
+    runner = app.test_cli_runner()
+
+    for count in ("0", "1001", "1000000000"):
+        source = tmp_path / "schedules.csv"
+        source.write_text(
+            "title,start_time,end_time,owner,recurrence,recurrence_count\n"
+            "Ok,2024-04-01T09:00,2024-04-01T10:00,alice,weekly,1000\n"
+            f"Broken,2024-04-01T09:00,2024-04-01T10:00,alice,daily,{count}\n"
+        )
+        result = runner.invoke(args=["import-data", "schedules", str(source), "--batch-size", "1"])
+
+        assert result.exit_code != 0
+        assert "row 2: recurrence_count must be between 1 and 1000" in result.output, count
+    assert [schedule.recurrence_count for schedule in Schedule.query] == [1000]
+
+
+def test_import_applies_the_form_recurrence_rules(app, user_factory, tmp_path):
+    user_factory(username="alice")
+    runner = app.test_cli_runner()
+    source = tmp_path / "schedules.csv"
+
+    for recurrence, message in (
+        ("weekly,2024-03-01,", "row 1: Repeat until must be on or after the start date."),
+        ("weekly,2024-05-01,3", "row 1: Set either an end date or a number of occurrences, not both."),
+        ("daily,9999-12-31,", "row 1: The series must end before the year 10000."),
+    ):
+        source.write_text(
+            "title,start_time,end_time,owner,recurrence,recurrence_until,recurrence_count\n"
+            f"Planning,2024-04-01T09:00,2024-04-01T10:00,alice,{recurrence}\n"
+        )
+        result = runner.invoke(args=["import-data", "schedules", str(source)])
+
+        assert result.exit_code != 0
+        assert message in result.output
+    assert Schedule.query.count() == 0
+
+
+def test_import_skips_schedules_already_there(app, user_factory, tmp_path):
+    alice = user_factory(username="alice")
+    db.session.add(Schedule(
+        title="Review", start_time=datetime(2024, 4, 1, 9), end_time=datetime(2024, 4, 1, 10), owner=alice,
+    ))
+    db.session.commit()
+    source = tmp_path / "schedules.csv"
+    source.write_text(
+        "title,start_time,end_time,owner\n"
+        "Review,2024-04-01T09:00,2024-04-01T10:00,alice\n"
+        "Review,2024-04-01T11:00,2024-04-01T12:00,alice\n"
+        "Standup,2024-04-01T09:00,2024-04-01T09:15,alice\n"
+        "Standup,2024-04-01T09:00,2024-04-01T09:15,alice\n"
+    )
+    runner = app.test_cli_runner()
+
+    first = runner.invoke(args=["import-data", "schedules", str(source), "--batch-size", "2"])
+    again = runner.invoke(args=["import-data", "schedules", str(source)])
+
+    assert "Imported 2 schedules (2 skipped)" in first.output
+    assert "Imported 0 schedules (4 skipped)" in again.output
+    assert sorted((schedule.title, schedule.start_time.hour) for schedule in Schedule.query) == [
+        ("Review", 9), ("Review", 11), ("Standup", 9),
+    ]
+
+
+def test_imported_schedules_show_up_in_a_cached_planner(app, client, user_factory, tmp_path):
+    user_factory(username="alice", password="Password123")
+    login(client, "alice", "Password123")
+    assert b"Imported sync" not in client.get("/calendar").data
+
+    start = week_start_of(datetime.utcnow()) + timedelta(days=2, hours=10)
+    source = tmp_path / "schedules.jsonl"
+    source.write_text(json.dumps({
+        "title": "Imported sync",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "owner": "alice",
+    }))
+    assert app.test_cli_runner().invoke(args=["import-data", "schedules", str(source)]).exit_code == 0
+
+    assert b"Imported sync" in client.get("/calendar").data
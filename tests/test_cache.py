@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.cache import FragmentCache, IdentityCache, PlannerCache
+from app.models import Room, Schedule, week_start_of
+
+from tests.test_calendar import counted_statements, login
+
+
+def test_planner_cache_evicts_least_recently_used_entries():
+    cache = PlannerCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+        "invalidations": 0,
+    }
+
+
+def test_repeated_calendar_requests_are_served_from_cache(client, user_factory):
+    user_factory(username="owner", password="Password123")
+    login(client, "owner", "Password123")
+
+    with counted_statements(db.engine) as statements:
+        response = client.get("/calendar")
+
+    assert response.status_code == 200
+    assert not [statement for statement in statements if "schedule.title" in statement]
+    stats = client.get("/planner-cache/stats").get_json()
+    assert stats["hits"] >= 1
+    assert stats["size"] == 1
+
+
+def test_schedule_edit_invalidates_participant_planner(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    participant = user_factory(username="participant", password="Password123")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=1, hours=10)
+    schedule = Schedule(title="Kickoff", start_time=start, end_time=start + timedelta(hours=1), owner=owner)
+    schedule.participants.append(participant)
+    db.session.add(schedule)
+    db.session.commit()
+
+    login(client, "participant", "Password123")
+    assert b"Kickoff" in client.get("/calendar").data
+    client.get("/logout")
+
+    login(client, "owner", "Password123")
+    client.post(
+        f"/schedules/{schedule.id}/edit",
+        data={
+            "title": "Kickoff (moved)",
+            "start_time": start.strftime("%Y-%m-%dT%H:%M"),
+            "end_time": (start + timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M"),
+            "location": "",
+            "room": "0",
+            "participants": [str(participant.id)],
+            "submit": "Save",
+        },
+    )
+    client.get("/logout")
+
+    login(client, "participant", "Password123")
+    assert b"Kickoff (moved)" in client.get("/calendar").data
+
+
+def test_room_rename_invalidates_booked_planners(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    room = Room(name="Aurora", capacity=6)
+    start = week_start_of(datetime.utcnow()) + timedelta(days=2, hours=9)
+    db.session.add(Schedule(title="Review", start_time=start, end_time=start + timedelta(hours=1), owner=owner, room=room))
+    db.session.commit()
+
+    login(client, "owner", "Password123")
+    assert b"Room: Aurora" in client.get("/calendar").data
+
+    client.post(f"/rooms/{room.id}/edit", data={"name": "Borealis", "capacity": "6", "submit": "Save"})
+
+    html = client.get("/calendar").data
+    assert b"Room: Borealis" in html
+    assert b"Room: Aurora" not in html
+
+
+def test_identity_cache_entries_expire_after_ttl():
+    now = [0.0]
+    cache = IdentityCache(ttl=5, clock=lambda: now[0])
+    cache.set(1, "alice")
+    now[0] = 4.9
+    assert cache.get(1) == "alice"
+    now[0] = 5.0
+    assert cache.get(1) is None
+
+    cache.set(1, "alice")
+    cache.invalidate([1])
+    assert cache.get(1) is None
+
+
+def test_fragment_cache_evicts_least_recently_used_entries():
+    cache = FragmentCache(maxsize=1)
+    cache.set("a", "<p>a</p>")
+    cache.set("b", "<p>b</p>")
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "<p>b</p>"
+    assert cache.stats() == {"size": 1, "maxsize": 1, "hits": 1, "misses": 1}
+
+
+def test_calendar_only_renders_changed_fragments(app, client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=1, hours=10)
+    first = Schedule(title="Kickoff", start_time=start, end_time=start + timedelta(hours=1), owner=owner)
+    second = Schedule(title="Review", start_time=start + timedelta(days=1), end_time=start + timedelta(days=1, hours=1), owner=owner)
+    db.session.add_all([first, second])
+    db.session.commit()
+    login(client, "owner", "Password123")
+    fragments = app.extensions["fragment_cache"]
+    client.get("/calendar")
+    # The time column, seven day columns and two events.
+    assert fragments.stats()["size"] == 10
+
+    first.title = "Kickoff (moved)"
+    db.session.commit()
+    misses = fragments.stats()["misses"]
+    html = client.get("/calendar").get_data(as_text=True)
+
+    assert "Kickoff (moved)" in html and "Review" in html
+    assert fragments.stats()["misses"] == misses + 1
@@ -3,8 +3,11 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from app import db
-from app.models import Room, Schedule
+from app.layout import cached_columns
+from app.models import Room, Schedule, week_start_of
+from app.routes import _build_planner, _build_planner_hours, _planner_schedule_query
 from flask import template_rendered
+from sqlalchemy import event, text
 
 
 @contextmanager
@@ -21,6 +24,20 @@ def captured_templates(app):
         template_rendered.disconnect(record, app)
 
 
+@contextmanager
+def counted_statements(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):  # pragma: no cover - event hook
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
 def login(client, username, password):
     return client.post(
         "/login",
@@ -80,7 +97,8 @@ def test_calendar_view_provides_weekly_planner_context(app, client, user_factory
     template, context = templates[0]
     assert template.name == "calendar.html"
 
-    planner = context.get("planner")
+    # The grid builds the planner while the page is rendered.
+    planner = context["planner_grid"].planner
     assert planner is not None, "Planner context should be provided"
 
     assert planner["week_start"].date() == week_start.date()
@@ -98,6 +116,82 @@ def test_calendar_view_provides_weekly_planner_context(app, client, user_factory
     assert event["column_span"] >= 1
 
 
+def test_calendar_statement_count_is_constant_for_busy_weeks(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    teammates = [user_factory(username=f"teammate-{index}") for index in range(3)]
+    room = Room(name="Focus Room", capacity=4)
+    db.session.add(room)
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    now = datetime.utcnow()
+    week_start = (now - timedelta(days=now.weekday())).replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def add_schedules(count):
+        for index in range(count):
+            start = week_start + timedelta(days=index % 7, minutes=15 * index)
+            schedule = Schedule(
+                title=f"Busy {index}",
+                start_time=start,
+                end_time=start + timedelta(hours=1),
+                owner=owner,
+                room=room,
+            )
+            schedule.participants.extend(teammates)
+            db.session.add(schedule)
+        db.session.commit()
+
+    def calendar_statements():
+        db.session.expire_all()
+        with counted_statements(db.engine) as statements:
+            response = client.get("/calendar")
+        assert response.status_code == 200
+        return len(statements)
+
+    add_schedules(2)
+    sparse = calendar_statements()
+    add_schedules(20)
+    busy = calendar_statements()
+
+    assert busy == sparse
+
+
+def test_planner_splits_multi_day_schedule_across_each_day(app, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    week_start = datetime(2024, 1, 1)
+    schedule = Schedule(
+        title="Offsite",
+        start_time=week_start + timedelta(days=1, hours=20),
+        end_time=week_start + timedelta(days=3, hours=8),
+        owner=owner,
+    )
+    db.session.add(schedule)
+    db.session.commit()
+
+    planner = _build_planner([schedule], week_start=week_start, viewer=owner)
+
+    spans = [
+        (event["start_minutes"], event["end_minutes"])
+        for day in planner["days"]
+        for event in day["events"]
+    ]
+    assert [len(day["events"]) for day in planner["days"]] == [0, 1, 1, 1, 0, 0, 0]
+    assert spans == [(14 * 60, 16 * 60), (0, 16 * 60), (0, 2 * 60)]
+
+
+def test_planner_visibility_query_avoids_full_table_scans(app, user_factory):
+    viewer = user_factory(username="viewer", password="Password123")
+    week_start = datetime(2024, 1, 1)
+    query = _planner_schedule_query(viewer, week_start=week_start, week_end=week_start + timedelta(days=7))
+    sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+
+    plan = [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    assert not [step for step in plan if step.startswith("SCAN")], plan
+    assert any("ix_schedule_owner_id_start_time" in step for step in plan)
+    assert any("ix_schedule_participants_user_id_schedule_id" in step for step in plan)
+
+
 def test_calendar_template_renders_grid_structure(client, user_factory):
     owner = user_factory(username="owner", password="Password123")
     login(client, "owner", "Password123")
@@ -308,3 +402,135 @@ def test_non_owner_cannot_delete_schedule(client, user_factory):
 
     assert response.status_code == 403
     assert db.session.get(Schedule, schedule.id) is not None
+
+
+def test_month_view_loads_the_range_in_constant_statements_and_reuses_day_layouts(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    login(client, "owner", "Password123")
+    month_start = datetime(2024, 2, 1)
+    for index in range(40):
+        start = month_start + timedelta(days=index % 29, hours=8 + index % 5)
+        db.session.add(Schedule(title=f"Event {index}", start_time=start, end_time=start + timedelta(hours=2), owner=owner))
+    db.session.add(Schedule(title="Outside", start_time=datetime(2024, 1, 30, 9), end_time=datetime(2024, 1, 30, 10), owner=owner))
+    db.session.commit()
+    db.session.expire_all()
+
+    with counted_statements(db.engine) as statements:
+        response = client.get("/calendar/month?month=2024-02")
+    page = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert len(statements) <= 6
+    assert "February 2024" in page and "Event 39" in page
+    assert page.count("planner-overview__day--outside") == 6  # Jan 29-31, Mar 1-3
+    assert "Outside" in page
+
+    misses = cached_columns.cache_info().misses
+    assert client.get("/calendar/weeks/4?week=2024-W05").status_code == 200
+    assert cached_columns.cache_info().misses == misses
+
+
+def test_multi_week_views_only_allow_two_or_four_weeks(client, user_factory):
+    user_factory(username="owner", password="Password123")
+    login(client, "owner", "Password123")
+
+    assert b"2-Week Planner" in client.get("/calendar/weeks/2").data
+    assert client.get("/calendar/weeks/3").status_code == 404
+    assert client.get("/calendar/weeks/2?week=bogus").status_code == 400
+
+
+def test_planner_supports_quarter_hour_slots(app, client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    week_start = week_start_of(datetime.utcnow())
+    start = week_start + timedelta(hours=9, minutes=15)
+    db.session.add(Schedule(title="Sync", start_time=start, end_time=start + timedelta(minutes=45), owner=owner))
+    db.session.commit()
+    app.config["PLANNER_INTERVAL_MINUTES"] = 15
+    login(client, "owner", "Password123")
+
+    hours = _build_planner_hours(start_hour=6, end_hour=22, interval_minutes=15)
+    assert [hour["label"] for hour in hours[:3]] == ["06:00", "06:15", "06:30"]
+    assert len(hours) == 16 * 4 + 1
+    assert _build_planner_hours(start_hour=6, end_hour=22, interval_minutes=15) is hours
+
+    response = client.get("/calendar")
+
+    html = response.get_data(as_text=True)
+    assert "planner-grid--subhour" in html
+    assert "--planner-slot-minutes: 15;" in html
+    assert html.count('class="planner-grid__cell"') == 7 * len(hours)
+    assert f'aria-label="{week_start.strftime("%A %d %B %Y")} at 09:15"' in html
+    assert "--event-start:195; --event-duration:45;" in html
+
+
+def test_calendar_streams_the_page_before_building_the_planner(app, client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=2, hours=9)
+    db.session.add(Schedule(title="Streamed", start_time=start, end_time=start + timedelta(hours=1), owner=owner))
+    db.session.commit()
+    login(client, "owner", "Password123")
+    app.config["STREAM_TEMPLATES"] = True
+    cache = app.extensions["planner_cache"]
+    cache.clear()
+
+    response = client.get("/calendar")
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers["ETag"]
+    chunks = iter(response.response)
+    head = ""
+    while "Weekly Planner" not in head:
+        head += next(chunks).decode()
+    assert "planner-grid" not in head
+    assert cache.stats()["size"] == 0
+
+    body = head + b"".join(chunks).decode()
+    response.close()
+    assert "Streamed" in body
+    assert body.rstrip().endswith("</html>")
+    assert cache.stats()["size"] == 1
+
+
+def test_streamed_pages_show_flashed_messages_once(app, client, user_factory):
+    user_factory(username="owner", password="Password123")
+    app.config["STREAM_TEMPLATES"] = True
+
+    for path in ("/calendar", "/calendar/month?month=2024-02"):
+        client.post("/login", data={"username": "owner", "password": "Password123", "submit": "Log In"})
+        pages = []
+        for _ in range(2):
+            response = client.get(path)
+            assert response.is_streamed
+            pages.append(response.get_data(as_text=True))
+        assert "Welcome back!" in pages[0], path
+        assert "Welcome back!" not in pages[1], path
+        client.get("/logout")
+
+
+def test_range_views_stream_the_page_before_building_the_planner(app, client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    db.session.add(Schedule(
+        title="Month review", start_time=datetime(2024, 2, 14, 9), end_time=datetime(2024, 2, 14, 10), owner=owner,
+    ))
+    db.session.commit()
+    login(client, "owner", "Password123")
+    app.config["STREAM_TEMPLATES"] = True
+    cache = app.extensions["planner_cache"]
+
+    for path, heading in (("/calendar/month?month=2024-02", "Monthly Planner"),
+                          ("/calendar/weeks/4?week=2024-W06", "4-Week Planner")):
+        cache.clear()
+        response = client.get(path)
+        assert response.is_streamed
+        chunks = iter(response.response)
+        head = ""
+        while heading not in head:
+            head += next(chunks).decode()
+        assert "planner-overview" not in head
+        assert cache.stats()["size"] == 0
+
+        body = head + b"".join(chunks).decode()
+        response.close()
+        assert "Month review" in body
+        assert "No schedules in this period." not in body
+        assert cache.stats()["size"] == 1
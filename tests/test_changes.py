@@ -0,0 +1,125 @@
+import json
+from datetime import datetime, timedelta
+
+from app import db
+from app.changes import ChangeBroker, event_stream
+from app.models import Schedule, week_start_of
+
+from tests.test_calendar import login
+
+MONDAY = datetime(2024, 3, 4)
+
+
+def test_broker_only_notifies_affected_viewers_of_the_week():
+    broker = ChangeBroker()
+    this_week = broker.subscribe(1, MONDAY, MONDAY + timedelta(days=7))
+    next_week = broker.subscribe(1, MONDAY + timedelta(days=7), MONDAY + timedelta(days=14))
+    other_user = broker.subscribe(2, MONDAY, MONDAY + timedelta(days=7))
+
+    change = broker.publish("updated", 10, {1, 3}, MONDAY + timedelta(days=1, hours=9), MONDAY + timedelta(days=1, hours=10))
+
+    assert this_week.wait(0) == [change]
+    assert next_week.wait(0) == []
+    assert other_user.wait(0) == []
+    assert json.loads(change.to_json()) == {
+        "action": "updated", "schedule_id": 10, "week": "2024-W10",
+        "start": "2024-03-05T09:00", "end": "2024-03-05T10:00",
+    }
+
+
+def test_broker_replays_missed_changes_and_forgets_closed_streams():
+    broker = ChangeBroker(history=2)
+    start, end = MONDAY + timedelta(hours=9), MONDAY + timedelta(hours=10)
+    first = broker.publish("created", 1, {1}, start, end)
+    second = broker.publish("created", 2, {1}, start, end)
+    third = broker.publish("deleted", 1, {1}, start, end)
+
+    subscription = broker.subscribe(1, MONDAY, MONDAY + timedelta(days=7), last_id=first.id)
+    assert subscription.wait(0) == [second, third]
+
+    stream = event_stream(broker, subscription, heartbeat=0)
+    assert next(stream) == "retry: 5000\n\n"
+    assert next(stream) == ": keepalive\n\n"
+    broker.publish("updated", 2, {1}, start, end)
+    assert next(stream).startswith("id: 4\nevent: schedule\ndata: ")
+    assert broker.subscriber_count() == 1
+    stream.close()
+    assert broker.subscriber_count() == 0
+
+
+def test_schedule_views_publish_changes_for_old_and_new_attendees(app, client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    dropped = user_factory(username="dropped")
+    added = user_factory(username="added")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=1, hours=10)
+    schedule = Schedule(title="Kickoff", start_time=start, end_time=start + timedelta(hours=1), owner=owner)
+    schedule.participants.append(dropped)
+    db.session.add(schedule)
+    db.session.commit()
+    schedule_id, owner_id, dropped_id, added_id = schedule.id, owner.id, dropped.id, added.id
+    broker = app.extensions["change_broker"]
+    dropped_page = broker.subscribe(dropped_id, start - timedelta(days=1), start + timedelta(days=1))
+    added_page = broker.subscribe(added_id, start - timedelta(days=1), start + timedelta(days=1))
+    login(client, "owner", "Password123")
+
+    client.post(
+        f"/schedules/{schedule_id}/edit",
+        data={
+            "title": "Kickoff",
+            "start_time": start.strftime("%Y-%m-%dT%H:%M"),
+            "end_time": (start + timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M"),
+            "location": "",
+            "room": "0",
+            "participants": [str(added_id)],
+            "submit": "Save",
+        },
+    )
+    client.post(f"/schedules/{schedule_id}/delete")
+
+    [updated] = dropped_page.wait(0)
+    assert (updated.action, updated.schedule_id) == ("updated", schedule_id)
+    assert updated.user_ids == {owner_id, dropped_id, added_id}
+    assert (updated.start, updated.end) == (start, start + timedelta(hours=2))
+    assert added_page.wait(0)[1][1:4] == ("deleted", schedule_id, {owner_id, added_id})
+
+
+def test_change_feed_streams_events_for_the_viewers_week(app, client, user_factory):
+    app.config["CHANGE_FEED_HEARTBEAT"] = 0.01
+    viewer = user_factory(username="viewer", password="Password123")
+    viewer_id = viewer.id
+    login(client, "viewer", "Password123")
+    broker = app.extensions["change_broker"]
+
+    response = client.get("/calendar/changes?week=2024-W10")
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    chunks = iter(response.response)
+    assert next(chunks) == b"retry: 5000\n\n"
+    broker.publish("created", 7, {viewer_id}, MONDAY + timedelta(hours=9), MONDAY + timedelta(hours=10))
+    broker.publish("created", 8, {viewer_id}, MONDAY - timedelta(days=3), MONDAY - timedelta(days=2))
+
+    events = []
+    while len(events) < 2:
+        events.append(next(chunks).decode())
+    response.close()
+
+    assert "keepalive" not in events[0]
+    assert '"schedule_id": 7' in events[0]
+    assert all('"schedule_id": 8' not in event for event in events)
+    assert broker.subscriber_count() == 0
+    assert client.get("/calendar/changes?weeks=7").status_code == 400
+
+
+def test_calendar_grid_returns_the_grid_fragment(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=1, hours=10)
+    db.session.add(Schedule(title="Kickoff", start_time=start, end_time=start + timedelta(hours=1), owner=owner))
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    response = client.get("/calendar/grid")
+
+    html = response.get_data(as_text=True)
+    assert html.startswith('<div class="planner-grid')
+    assert "Kickoff" in html and "<html" not in html
+    assert client.get("/calendar/grid", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
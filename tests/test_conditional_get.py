@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Room, Schedule, week_start_of
+
+from tests.test_calendar import counted_statements, login
+
+
+def test_calendar_answers_not_modified_without_building_planner(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=1, hours=9)
+    db.session.add(Schedule(title="Standup", start_time=start, end_time=start + timedelta(minutes=30), owner=owner))
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    first = client.get("/calendar")
+    assert first.status_code == 200
+    assert first.headers["ETag"]
+    assert first.last_modified is not None
+
+    with counted_statements(db.engine) as statements:
+        second = client.get("/calendar", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 304
+    assert second.data == b""
+    assert not [statement for statement in statements if "schedule.title" in statement]
+
+
+def test_calendar_etag_changes_when_participants_change(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    participant = user_factory(username="participant", password="Password123")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=2, hours=14)
+    schedule = Schedule(title="Pairing", start_time=start, end_time=start + timedelta(hours=1), owner=owner)
+    schedule.participants.append(participant)
+    db.session.add(schedule)
+    db.session.commit()
+    login(client, "owner", "Password123")
+    etag = client.get("/calendar").headers["ETag"]
+
+    schedule.participants = []
+    db.session.commit()
+
+    response = client.get("/calendar", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_calendar_ignores_if_modified_since_after_a_deletion(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=1, hours=9)
+    older = Schedule(title="Older", start_time=start, end_time=start + timedelta(hours=1), owner=owner)
+    db.session.add(older)
+    db.session.commit()
+    db.session.add(Schedule(
+        title="Newer", start_time=start + timedelta(hours=2), end_time=start + timedelta(hours=3), owner=owner,
+    ))
+    db.session.commit()
+    login(client, "owner", "Password123")
+    last_modified = client.get("/calendar").headers["Last-Modified"]
+
+    db.session.delete(older)
+    db.session.commit()
+
+    response = client.get("/calendar", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 200
+    assert b"Older" not in response.data
+
+
+def test_room_list_revalidates_after_room_edit(client, user_factory):
+    user_factory(username="admin", password="Password123")
+    room = Room(name="Conference A", capacity=4)
+    db.session.add(room)
+    db.session.commit()
+    login(client, "admin", "Password123")
+
+    etag = client.get("/rooms").headers["ETag"]
+    assert client.get("/rooms", headers={"If-None-Match": etag}).status_code == 304
+
+    room.capacity = 12
+    db.session.commit()
+
+    response = client.get("/rooms", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert b"12" in response.data
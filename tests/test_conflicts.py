@@ -0,0 +1,121 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.conflicts import find_conflicts
+from app.models import Room, Schedule, User
+from config import TestConfig
+
+from tests.test_calendar import login
+
+START = datetime(2030, 6, 3, 10, 0)
+
+
+def schedule_form(title, start, *, hours=1, room=None, participants=()):
+    return {
+        "title": title,
+        "start_time": start.strftime("%Y-%m-%dT%H:%M"),
+        "end_time": (start + timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M"),
+        "location": "",
+        "room": str(room.id) if room else "0",
+        "participants": [str(user.id) for user in participants],
+        "submit": "Save",
+    }
+
+
+def test_room_double_booking_is_rejected(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    other = user_factory(username="other", password="Password123")
+    room = Room(name="Summit", capacity=10)
+    db.session.add(room)
+    db.session.add(Schedule(title="Board Meeting", start_time=START, end_time=START + timedelta(hours=2), owner=other, room=room))
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    response = client.post("/schedules/new", data=schedule_form("Retro", START + timedelta(hours=1), room=room))
+
+    assert response.status_code == 200
+    assert b"This room is already booked for &#39;Board Meeting&#39;" in response.data
+    assert Schedule.query.count() == 1
+
+
+def test_participant_double_booking_is_rejected_but_adjacent_slots_are_not(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    teammate = user_factory(username="teammate", password="Password123")
+    other = user_factory(username="other", password="Password123")
+    busy = Schedule(title="Customer Call", start_time=START, end_time=START + timedelta(hours=1), owner=other)
+    busy.participants.append(teammate)
+    db.session.add(busy)
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    clash = client.post("/schedules/new", data=schedule_form("1:1", START + timedelta(minutes=30), participants=[teammate]))
+    assert b"teammate already attending &#39;Customer Call&#39;" in clash.data
+
+    adjacent = client.post("/schedules/new", data=schedule_form("1:1", START + timedelta(hours=1), participants=[teammate]))
+    assert adjacent.status_code == 302
+    assert Schedule.query.count() == 2
+
+
+def test_find_conflicts_ignores_the_schedule_being_edited(app, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    schedule = Schedule(title="Focus", start_time=START, end_time=START + timedelta(hours=1), owner=owner)
+    db.session.add(schedule)
+    db.session.commit()
+
+    assert find_conflicts(START, START + timedelta(hours=2), user_ids={owner.id}) == [schedule]
+    assert find_conflicts(START, START + timedelta(hours=2), user_ids={owner.id}, exclude_id=schedule.id) == []
+
+
+@pytest.fixture()
+def file_app(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'concurrency.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+def test_concurrent_submissions_cannot_double_book_a_room(file_app):
+    room = Room(name="Contested", capacity=4)
+    db.session.add(room)
+    owners = []
+    for index in range(6):
+        owner = User(username=f"racer-{index}")
+        owner.set_password("Password123")
+        owners.append(owner)
+    db.session.add_all(owners)
+    db.session.commit()
+    room_id = room.id
+
+    clients = []
+    for owner in owners:
+        client = file_app.test_client()
+        with file_app.app_context():  # fresh ``g`` so each login is a real one
+            login(client, owner.username, "Password123")
+        clients.append(client)
+
+    barrier = threading.Barrier(len(clients))
+    statuses = []
+
+    def submit(client):
+        barrier.wait()
+        response = client.post("/schedules/new", data=schedule_form("Race", START, room=room))
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=submit, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [200] * 5 + [302]
+    db.session.expire_all()
+    assert Schedule.query.filter_by(room_id=room_id).count() == 1
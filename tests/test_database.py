@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app import create_app, db
+from app.database import async_database_uri, create_async_engine
+from config import TestConfig
+
+
+def _pragma(name):
+    return db.session.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_file_database_uses_wal_and_tuned_pragmas(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'tuned.db'}"
+        DATABASE_POOL_SIZE = 3
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        assert isinstance(db.engine.pool, QueuePool)
+        assert db.engine.pool.size() == 3
+        assert _pragma("journal_mode") == "wal"
+        assert _pragma("synchronous") == 1
+        assert _pragma("busy_timeout") == 5000
+        assert _pragma("cache_size") == -20000
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_explicit_engine_options_and_empty_pragmas_are_respected(tmp_path):
+    class PlainConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'plain.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": 1}
+        SQLITE_PRAGMAS = {}
+
+    app = create_app(PlainConfig)
+    with app.app_context():
+        assert db.engine.pool.size() == 1
+        assert _pragma("journal_mode") == "delete"
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_in_memory_database_keeps_a_single_shared_connection(app):
+    assert isinstance(db.engine.pool, StaticPool)
+    assert _pragma("journal_mode") == "memory"
+    assert _pragma("busy_timeout") == 5000
+
+
+def test_async_engine_uses_aiosqlite_with_the_same_pragmas(tmp_path):
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'async.db'}",
+        "SQLITE_PRAGMAS": TestConfig.SQLITE_PRAGMAS,
+    }
+    assert async_database_uri(config).drivername == "sqlite+aiosqlite"
+    with pytest.raises(ValueError):
+        async_database_uri({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    with pytest.raises(ValueError):
+        async_database_uri({"SQLALCHEMY_DATABASE_URI": "postgresql://localhost/scheduler"})
+    assert async_database_uri({**config, "ASYNC_DATABASE_URI": "sqlite+aiosqlite:///other.db"}) == (
+        "sqlite+aiosqlite:///other.db"
+    )
+
+    async def pragmas():
+        engine = create_async_engine(config)
+        try:
+            async with engine.connect() as connection:
+                return [
+                    (await connection.execute(text(f"PRAGMA {name}"))).scalar()
+                    for name in ("journal_mode", "busy_timeout")
+                ]
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(pragmas()) == ["wal", 5000]
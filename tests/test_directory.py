@@ -0,0 +1,145 @@
+from sqlalchemy import select, text
+
+from app import db
+from app.cache import ChoiceCache, DirectoryChoices
+from app.directory import _prefix_filter
+from app.models import Room, Schedule, User
+
+from tests.test_calendar import counted_statements, login
+from tests.test_conflicts import START, schedule_form
+
+
+def test_room_list_pages_by_name(app, client, user_factory):
+    app.config["ROOM_PAGE_SIZE"] = 2
+    user_factory(username="owner", password="Password123")
+    db.session.add_all(Room(name=name, capacity=4) for name in ["Delta", "Alpha", "Echo", "Charlie", "Bravo"])
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    first = client.get("/rooms").get_data(as_text=True)
+    assert "Alpha" in first and "Bravo" in first and "Charlie" not in first
+    assert 'href="/rooms?after=Bravo"' in first
+
+    second = client.get("/rooms?after=Bravo").get_data(as_text=True)
+    assert "Charlie" in second and "Delta" in second and "Bravo" not in second
+    last = client.get("/rooms?after=Delta").get_data(as_text=True)
+    assert "Echo" in last and "?after=" not in last
+
+
+def test_search_api_matches_prefixes(client, user_factory):
+    for name in ["alice", "alan", "bob"]:
+        user_factory(username=name, password="Password123")
+    db.session.add_all([Room(name="Aurora", capacity=4), Room(name="Atlas", capacity=6), Room(name="Zen", capacity=2)])
+    db.session.commit()
+    login(client, "alice", "Password123")
+
+    users = client.get("/api/search?kind=users&q=al").get_json()["results"]
+    rooms = client.get("/api/search?kind=rooms&q=A&limit=1").get_json()["results"]
+
+    assert [user["name"] for user in users] == ["alan"]
+    assert [room["name"] for room in rooms] == ["Atlas"]
+    assert client.get("/api/search?kind=schedules&q=a").status_code == 400
+
+
+def test_search_api_handles_prefixes_without_a_successor(client, user_factory):
+    user_factory(username="alice", password="Password123")
+    db.session.add_all([
+        Room(name="Oak\U0010ffff", capacity=4), Room(name="Oal", capacity=4),
+        Room(name="\ud7ff1", capacity=4), Room(name="\ue000", capacity=4),
+    ])
+    db.session.commit()
+    login(client, "alice", "Password123")
+
+    def names(q):
+        response = client.get("/api/search", query_string={"kind": "rooms", "q": q})
+        assert response.status_code == 200, ascii(q)
+        return [room["name"] for room in response.get_json()["results"]]
+
+    assert names("Oak\U0010ffff") == ["Oak\U0010ffff"]
+    assert names("\U0010ffff") == []
+    assert names("\ud7ff") == ["\ud7ff1"]
+
+
+def test_prefix_search_uses_the_unique_index(app):
+    sql = str(
+        select(User.id, User.username).where(*_prefix_filter(User.username, "al"))
+        .compile(db.engine, compile_kwargs={"literal_binds": True})
+    )
+    plan = [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    assert any(step.startswith("SEARCH") and "username" in step for step in plan), plan
+
+
+def test_large_directories_render_only_selected_choices(app, client, user_factory):
+    app.config["FORM_CHOICES_INLINE_LIMIT"] = 1
+    user_factory(username="owner", password="Password123")
+    others = [user_factory(username=f"teammate-{index}", password="Password123") for index in range(3)]
+    rooms = [Room(name=f"Room {index}", capacity=4) for index in range(3)]
+    db.session.add_all(rooms)
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    form = client.get("/schedules/new").get_data(as_text=True)
+    assert 'data-search-url="/api/search?kind=users"' in form
+    assert "teammate-0" not in form and "Room 0" not in form
+    assert "js/typeahead.js" in form
+
+    response = client.post("/schedules/new", data=schedule_form("Sync", START, room=rooms[2], participants=[others[1]]))
+    assert response.status_code == 302
+    schedule = Schedule.query.one()
+    assert schedule.room == rooms[2] and schedule.participants == [others[1]]
+
+    edit = client.get(f"/schedules/{schedule.id}/edit").get_data(as_text=True)
+    assert "teammate-1" in edit and "Room 2" in edit
+    assert "teammate-0" not in edit
+
+
+def test_form_choices_are_cached_until_a_directory_changes(app, client, user_factory):
+    user_factory(username="owner", password="Password123")
+    user_factory(username="teammate", password="Password123")
+    db.session.add(Room(name="Atlas", capacity=4))
+    db.session.commit()
+    login(client, "owner", "Password123")
+    cache = app.extensions["choice_cache"]
+
+    client.get("/schedules/new")
+    with counted_statements(db.engine) as statements:
+        form = client.get("/schedules/new").get_data(as_text=True)
+    assert "teammate" in form and "Atlas" in form
+    assert not [statement for statement in statements if "ORDER BY" in statement]
+    assert cache.hits >= 2
+
+    client.post("/rooms/new", data={"name": "Zenith", "capacity": 6, "submit": "Save"})
+    room = Room.query.filter_by(name="Atlas").one()
+    client.post(f"/rooms/{room.id}/edit", data={"name": "Atlas North", "capacity": 4, "submit": "Save"})
+    form = client.get("/schedules/new").get_data(as_text=True)
+    assert "Zenith" in form and "Atlas North" in form
+
+    with app.app_context():
+        app.test_client().post(
+            "/register", data={"username": "newcomer", "password": "Password123", "password2": "Password123"}
+        )
+    assert "newcomer" in client.get("/schedules/new").get_data(as_text=True)
+
+
+def test_submitted_ids_outside_the_directories_are_rejected(client, user_factory):
+    user_factory(username="owner", password="Password123")
+    login(client, "owner", "Password123")
+    data = schedule_form("Sync", START)
+    data.update(room="999", participants=["998"])
+
+    response = client.post("/schedules/new", data=data)
+
+    assert response.status_code == 200
+    assert b"Not a valid choice." in response.data
+    assert b"&#39;998&#39; is not a valid choice for this field." in response.data
+    assert Schedule.query.count() == 0
+
+
+def test_choice_cache_ignores_lists_built_before_an_invalidation():
+    cache = ChoiceCache()
+    version = cache.version("rooms")
+    cache.invalidate(["rooms"])
+    cache.set("rooms", version, (1, None), DirectoryChoices(items=(), labels={}))
+
+    assert cache.get("rooms", (1, None)) is None
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.freetime import find_free_slots, free_gaps, merge_intervals
+from app.models import Room, Schedule
+
+from tests.test_calendar import login
+
+MONDAY = datetime(2024, 3, 4)
+
+
+def _at(hours, days=0):
+    return MONDAY + timedelta(days=days, hours=hours)
+
+
+def _find(user_ids, room_ids=(), **kwargs):
+    options = dict(
+        start=MONDAY, end=MONDAY + timedelta(days=7), duration=timedelta(hours=1),
+        day_start_hour=9, day_end_hour=17,
+    )
+    options.update(kwargs)
+    return find_free_slots(user_ids, room_ids, **options)
+
+
+def test_merge_intervals_and_free_gaps():
+    busy = merge_intervals([(_at(11), _at(12)), (_at(9), _at(10)), (_at(9.5), _at(10.5)), (_at(12), _at(13))])
+    assert busy == [(_at(9), _at(10.5)), (_at(11), _at(13))]
+    windows = [(_at(9), _at(17)), (_at(9, 1), _at(17, 1))]
+    assert list(free_gaps(windows, busy)) == [
+        (_at(10.5), _at(11)), (_at(13), _at(17)), (_at(9, 1), _at(17, 1))
+    ]
+
+
+def test_free_slots_avoid_every_attendee_and_respect_working_hours(app, user_factory):
+    alice = user_factory(username="alice")
+    bob = user_factory(username="bob")
+    outsider = user_factory(username="outsider")
+    db.session.add_all([
+        Schedule(title="Alice busy", start_time=_at(9), end_time=_at(10), owner=alice),
+        Schedule(title="Outsider busy", start_time=_at(10), end_time=_at(12), owner=outsider),
+    ])
+    invited = Schedule(title="Bob attends", start_time=_at(10, 0) + timedelta(minutes=30), end_time=_at(11.5), owner=outsider)
+    invited.participants.append(bob)
+    db.session.add(invited)
+    db.session.commit()
+
+    slots = _find([alice.id, bob.id], limit=3)
+
+    assert [(slot.start, slot.end) for slot in slots] == [
+        (_at(11.5), _at(12.5)), (_at(12), _at(13)), (_at(12.5), _at(13.5))
+    ]
+    late = _find([alice.id], start=_at(16.5), limit=2)
+    assert [slot.start for slot in late] == [_at(9, 1), _at(9.5, 1)]
+
+
+def test_free_slots_skip_weekends_and_expand_recurrences(app, user_factory):
+    alice = user_factory(username="alice")
+    daily = Schedule(
+        title="Daily", start_time=_at(9), end_time=_at(16.5), owner=alice, recurrence="daily", recurrence_count=5
+    )
+    daily.series_end = daily.compute_series_end()
+    db.session.add(daily)
+    db.session.commit()
+
+    assert _find([alice.id], duration=timedelta(minutes=30), limit=6)[0].start == _at(16.5)
+    assert _find([alice.id], end=_at(0, 14), limit=1)[0].start == _at(9, 7)
+    assert _find([alice.id], limit=1, weekends=True)[0].start == _at(9, 5)
+
+
+def test_free_slots_need_one_free_candidate_room(app, user_factory):
+    alice = user_factory(username="alice")
+    other = user_factory(username="other")
+    orion, vega = Room(name="Orion", capacity=4), Room(name="Vega", capacity=4)
+    db.session.add_all([
+        orion, vega,
+        Schedule(title="Orion", start_time=_at(9), end_time=_at(11), owner=other, room=orion),
+        Schedule(title="Vega", start_time=_at(9), end_time=_at(10), owner=other, room=vega),
+    ])
+    db.session.commit()
+
+    slots = _find([alice.id], [orion.id, vega.id], limit=3)
+
+    assert [(slot.start, slot.room_ids) for slot in slots] == [
+        (_at(10), (vega.id,)), (_at(10.5), (vega.id,)), (_at(11), (orion.id, vega.id))
+    ]
+
+
+def test_free_slots_api(client, user_factory):
+    alice = user_factory(username="alice", password="Password123")
+    bob = user_factory(username="bob", password="Password123")
+    room = Room(name="Orion", capacity=4)
+    db.session.add_all([room, Schedule(title="Busy", start_time=_at(6), end_time=_at(9), owner=bob)])
+    db.session.commit()
+    login(client, "alice", "Password123")
+
+    response = client.get(
+        f"/api/free-slots?users={alice.id},{bob.id}&rooms={room.id}&start=2024-03-04&duration=30&limit=2"
+    )
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "duration": 30,
+        "users": [{"id": alice.id, "name": "alice"}, {"id": bob.id, "name": "bob"}],
+        "slots": [
+            {"start": "2024-03-04T09:00", "end": "2024-03-04T09:30", "rooms": [{"id": room.id, "name": "Orion"}]},
+            {"start": "2024-03-04T09:30", "end": "2024-03-04T10:00", "rooms": [{"id": room.id, "name": "Orion"}]},
+        ],
+    }
+    assert client.get("/api/free-slots?duration=0").status_code == 400
+    assert client.get("/api/free-slots?days=29").status_code == 400
+    assert client.get("/api/free-slots?start=tomorrow").status_code == 400
+    assert client.get("/api/free-slots?start=9999-12-30&days=14").status_code == 400
+    assert client.get("/api/free-slots?start=9999-10-01&days=28").status_code == 200
@@ -0,0 +1,94 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.models import Schedule, week_start_of
+from config import TestConfig
+
+from tests.test_calendar import login
+
+
+@pytest.fixture()
+def instrumented_app():
+    class InstrumentedConfig(TestConfig):
+        INSTRUMENTATION_ENABLED = True
+
+    app = create_app(InstrumentedConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _server_timing(response):
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"(\w+);dur=([\d.]+)", response.headers["Server-Timing"])
+    }
+
+
+def test_calendar_reports_server_timing_and_metrics(instrumented_app, user_factory):
+    client = instrumented_app.test_client()
+    owner = user_factory(username="owner", password="Password123")
+    start = week_start_of(datetime.utcnow()) + timedelta(days=1, hours=10)
+    db.session.add(Schedule(title="Review", start_time=start, end_time=start + timedelta(hours=1), owner=owner))
+    db.session.commit()
+    login(client, "owner", "Password123")
+    instrumented_app.extensions["planner_cache"].clear()
+
+    response = client.get("/calendar")
+
+    timings = _server_timing(response)
+    assert set(timings) == {"total", "sql", "template", "planner"}
+    assert timings["total"] >= timings["sql"] > 0
+    assert timings["template"] > 0 and timings["planner"] > 0
+    assert re.search(r'sql;dur=[\d.]+;desc="SQL \([1-9]\d* statements\)"', response.headers["Server-Timing"])
+
+    metrics = client.get("/metrics")
+    assert metrics.mimetype == "text/plain"
+    body = metrics.get_data(as_text=True)
+    assert "# TYPE scheduler_request_duration_seconds histogram" in body
+    assert re.search(r'scheduler_request_duration_seconds_count\{endpoint="main.calendar"\} [1-9]', body)
+    assert re.search(r'scheduler_sql_statements_bucket\{endpoint="main.calendar",le="\+Inf"\} [1-9]', body)
+    assert 'scheduler_request_duration_seconds_count{endpoint="main.login"} 1' in body
+
+
+def test_instrumentation_is_off_by_default(client):
+    response = client.get("/")
+
+    assert "Server-Timing" not in response.headers
+    assert client.get("/metrics").status_code == 404
+
+
+def test_streamed_calendar_times_each_phase_once(user_factory):
+    class StreamingInstrumentedConfig(TestConfig):
+        INSTRUMENTATION_ENABLED = True
+        STREAM_TEMPLATES = True
+
+    app = create_app(StreamingInstrumentedConfig)
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        owner = user_factory(username="owner", password="Password123")
+        start = week_start_of(datetime.utcnow()) + timedelta(hours=9)
+        db.session.add_all([
+            Schedule(title=f"Slot {index}", start_time=start + timedelta(days=index % 5, hours=index % 8),
+                     end_time=start + timedelta(days=index % 5, hours=index % 8 + 1), owner=owner)
+            for index in range(40)
+        ])
+        db.session.commit()
+        login(client, "owner", "Password123")
+        app.extensions["planner_cache"].clear()
+
+        response = client.get("/calendar")
+        timings = _server_timing(response)
+        db.session.remove()
+        db.drop_all()
+
+    assert "Slot 39" in response.get_data(as_text=True)
+    assert timings["template"] <= timings["total"]
+    assert timings["sql"] + timings["template"] + timings["planner"] <= timings["total"]
+    assert timings["planner"] > 0
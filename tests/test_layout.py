@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from app.layout import ColumnLayout, assign_columns
+from app.routes import _assign_event_columns
+
+
+def reference_assign_event_columns(events):
+    """The original quadratic implementation, kept as the behavioural oracle."""
+    events.sort(key=lambda item: (item["start_minutes"], item["end_minutes"]))
+    active = []
+    clusters = []
+
+    for event in events:
+        active = [e for e in active if e["end_minutes"] > event["start_minutes"]]
+        if active:
+            cluster = active[0]["cluster"]
+        else:
+            cluster = {"events": []}
+            clusters.append(cluster)
+        used_columns = {e["column"] for e in active}
+        column = 0
+        while column in used_columns:
+            column += 1
+        event["column"] = column
+        event["cluster"] = cluster
+        cluster["events"].append(event)
+        active.append(event)
+
+    for cluster in clusters:
+        columns = {event["column"] for event in cluster["events"]}
+        width = max(columns) + 1 if columns else 1
+        for event in cluster["events"]:
+            event["column_span"] = width
+            event["column_offset"] = event["column"]
+
+
+def random_events(rng, count):
+    events = []
+    for index in range(count):
+        start = rng.randrange(0, 16 * 60, rng.choice([1, 15, 60]))
+        end = start + rng.choice([1, 15, 30, 60, 90, 240, rng.randint(1, 600)])
+        events.append({"id": index, "start_minutes": start, "end_minutes": end})
+    return events
+
+
+def layout_of(events):
+    return [(e["id"], e["column"], e["column_span"], e["column_offset"]) for e in events]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_layout_engine_matches_reference_implementation(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        events = random_events(rng, rng.randint(0, 60))
+        expected = [dict(event) for event in events]
+        reference_assign_event_columns(expected)
+
+        _assign_event_columns(events)
+
+        assert layout_of(events) == layout_of(expected)
+        assert all("cluster" not in event for event in events)
+
+
+def test_layout_engine_reuses_released_columns():
+    layouts = assign_columns([(0, 30), (0, 60), (30, 90), (100, 120)])
+
+    assert layouts == [
+        ColumnLayout(column=0, column_span=2),
+        ColumnLayout(column=1, column_span=2),
+        ColumnLayout(column=0, column_span=2),
+        ColumnLayout(column=0, column_span=1),
+    ]
+
+
+def test_layout_engine_handles_hundreds_of_overlaps():
+    layouts = assign_columns([(0, 600)] * 500)
+
+    assert [layout.column for layout in layouts] == list(range(500))
+    assert {layout.column_span for layout in layouts} == {500}
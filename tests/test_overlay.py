@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Room, Schedule
+from app.overlay import build_overlay
+
+from tests.test_calendar import counted_statements, login
+
+WEEK_START = datetime(2024, 3, 4)  # ISO week 2024-W10
+
+
+def _overlay(user_ids, room_ids=(), *, viewer_id):
+    return build_overlay(
+        user_ids, room_ids, viewer_id=viewer_id, start=WEEK_START, days=7,
+        slot_minutes=30, day_start_hour=9, day_end_hour=17,
+    )
+
+
+def _busy_at(overlay, moment):
+    return overlay.busy[overlay.slot_starts.index(moment)]
+
+
+def test_overlay_counts_each_busy_calendar_once_per_slot(app, user_factory):
+    alice = user_factory(username="alice")
+    bob = user_factory(username="bob")
+    carol = user_factory(username="carol")
+    room = Room(name="Orion", capacity=6)
+    monday = WEEK_START + timedelta(hours=9)
+    shared = Schedule(title="Standup", start_time=monday, end_time=monday + timedelta(minutes=30), owner=alice, room=room)
+    shared.participants.extend([bob, carol])
+    # Alice is double-booked from 09:00 to 09:30.
+    overlapping = Schedule(title="1:1", start_time=monday, end_time=monday + timedelta(hours=1), owner=alice)
+    # Booked across the end of the working day: only 16:00-17:00 counts.
+    late = Schedule(title="Late", start_time=monday + timedelta(hours=7), end_time=monday + timedelta(hours=10), owner=bob)
+    db.session.add_all([room, shared, overlapping, late])
+    db.session.commit()
+    user_ids, room_id = [alice.id, bob.id, carol.id], room.id
+
+    with counted_statements(db.engine) as statements:
+        overlay = _overlay(user_ids, [room_id], viewer_id=user_ids[0])
+
+    # The union of schedules, their exclusions and the selected attendees.
+    assert len(statements) == 3
+    assert len(overlay.slot_starts) == 7 * 16
+    assert _busy_at(overlay, monday) == 4
+    assert _busy_at(overlay, monday + timedelta(minutes=30)) == 1
+    assert _busy_at(overlay, monday + timedelta(hours=1)) == 0
+    assert _busy_at(overlay, monday + timedelta(hours=7)) == 1
+    assert _busy_at(overlay, monday + timedelta(days=1)) == 0
+    titles = [event.schedule.title for event in overlay.events]
+    assert titles.count("Standup") == 1
+    standup = overlay.events[titles.index("Standup")]
+    assert standup.calendars == (("user", alice.id), ("user", bob.id), ("user", carol.id), ("room", room.id))
+
+
+def test_overlay_hides_details_the_viewer_cannot_see(app, user_factory):
+    viewer = user_factory(username="viewer")
+    teammate = user_factory(username="teammate")
+    private = Schedule(
+        title="Private", start_time=WEEK_START + timedelta(hours=10),
+        end_time=WEEK_START + timedelta(hours=11), owner=teammate,
+    )
+    invited = Schedule(
+        title="Invited", start_time=WEEK_START + timedelta(hours=12),
+        end_time=WEEK_START + timedelta(hours=13), owner=teammate,
+    )
+    invited.participants.append(viewer)
+    db.session.add_all([private, invited])
+    db.session.commit()
+
+    overlay = _overlay([teammate.id], viewer_id=viewer.id)
+
+    assert [(event.schedule.title, event.visible) for event in overlay.events] == [
+        ("Private", False), ("Invited", True)
+    ]
+    assert [event.calendars for event in overlay.events] == [(("user", teammate.id),)] * 2
+
+
+def test_overlay_api_returns_slots_and_masked_events(client, user_factory):
+    viewer = user_factory(username="viewer", password="Password123")
+    teammate = user_factory(username="teammate", password="Password123")
+    db.session.add(Schedule(
+        title="Secret", start_time=WEEK_START + timedelta(hours=9),
+        end_time=WEEK_START + timedelta(hours=10), owner=teammate,
+    ))
+    db.session.commit()
+    login(client, "viewer", "Password123")
+
+    response = client.get(f"/api/overlay?week=2024-W10&users={viewer.id},{teammate.id}")
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["slot_minutes"] == 30
+    assert [calendar["name"] for calendar in payload["calendars"]] == ["viewer", "teammate"]
+    assert payload["events"] == [{
+        "id": None, "title": None, "start": "2024-03-04T09:00", "end": "2024-03-04T10:00",
+        "calendars": [f"user:{teammate.id}"],
+    }]
+    busy = {slot["start"]: slot["busy"] for slot in payload["slots"]}
+    assert busy["2024-03-04T09:00"] == busy["2024-03-04T09:30"] == 1
+    assert busy["2024-03-04T10:00"] == 0
+
+
+def test_overlay_api_validates_the_selection(client, user_factory):
+    user_factory(username="viewer", password="Password123")
+    login(client, "viewer", "Password123")
+
+    assert client.get("/api/overlay?users=abc").status_code == 400
+    assert client.get("/api/overlay?users=999").status_code == 400
+    assert client.get("/api/overlay?users=" + ",".join(map(str, range(1, 102)))).status_code == 400
+    assert client.get("/api/overlay?week=2024-99").status_code == 400
+
+
+def test_team_calendar_renders_heatmap(client, user_factory):
+    viewer = user_factory(username="viewer", password="Password123")
+    teammate = user_factory(username="teammate", password="Password123")
+    db.session.add(Schedule(
+        title="Secret", start_time=WEEK_START + timedelta(hours=9),
+        end_time=WEEK_START + timedelta(hours=10), owner=teammate,
+    ))
+    db.session.commit()
+    login(client, "viewer", "Password123")
+
+    response = client.get(f"/calendar/team?week=2024-W10&users={viewer.id}&users={teammate.id}")
+
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert "overlay-heatmap" in html
+    assert 'title="1 of 2 busy"' in html
+    assert "Secret" not in html
+    assert "Busy" in html
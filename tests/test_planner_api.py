@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Schedule
+
+from tests.test_calendar import login
+
+
+def test_planner_api_returns_requested_week_as_json(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    teammate = user_factory(username="teammate", password="Password123")
+    week_start = datetime(2024, 3, 4)  # ISO week 2024-W10
+    first = Schedule(
+        title="Design Review",
+        start_time=week_start + timedelta(days=1, hours=9),
+        end_time=week_start + timedelta(days=1, hours=11),
+        owner=owner,
+        location="Studio",
+    )
+    second = Schedule(
+        title="Overlap",
+        start_time=week_start + timedelta(days=1, hours=10),
+        end_time=week_start + timedelta(days=1, hours=12),
+        owner=teammate,
+    )
+    second.participants.append(owner)
+    db.session.add_all([first, second])
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    response = client.get("/api/planner?week=2024-W10")
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["week"] == "2024-W10"
+    assert payload["week_start"] == "2024-03-04"
+    assert payload["previous_week"] == "2024-W09"
+    assert payload["next_week"] == "2024-W11"
+    assert payload["hours"][0] == "06:00"
+    assert [len(day["events"]) for day in payload["days"]] == [0, 2, 0, 0, 0, 0, 0]
+    review, overlap = payload["days"][1]["events"]
+    assert review["title"] == "Design Review"
+    assert review["start"] == "2024-03-05T09:00"
+    assert review["start_minutes"] == 180
+    assert review["is_owner"] is True
+    assert (review["column"], review["column_span"]) == (0, 2)
+    assert overlap["owner"] == "teammate"
+    assert overlap["is_owner"] is False
+    assert (overlap["column"], overlap["column_span"]) == (1, 2)
+
+
+def test_planner_api_rejects_malformed_week(client, user_factory):
+    user_factory(username="owner", password="Password123")
+    login(client, "owner", "Password123")
+
+    assert client.get("/api/planner?week=2024-13").status_code == 400
+    assert client.get("/api/planner?week=9999-W52").status_code == 400
+    assert client.get("/api/planner?week=0001-W01").status_code == 400
+    assert client.get("/api/planner?week=9999-W40&weeks=6").status_code == 200
+
+
+def test_planner_api_requires_login(client):
+    response = client.get("/api/planner")
+
+    assert response.status_code == 302
+    assert "/login" in response.headers["Location"]
+
+
+def test_planner_api_serves_multiple_weeks_and_months(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    db.session.add_all([
+        Schedule(title="Kickoff", start_time=datetime(2024, 2, 1, 9), end_time=datetime(2024, 2, 1, 10), owner=owner),
+        Schedule(title="Retro", start_time=datetime(2024, 2, 29, 15), end_time=datetime(2024, 2, 29, 16), owner=owner),
+    ])
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    four_weeks = client.get("/api/planner?week=2024-W05&weeks=4").get_json()
+    month = client.get("/api/planner?month=2024-02").get_json()
+
+    assert four_weeks["day_count"] == 28
+    assert four_weeks["previous_week"] == "2024-W01" and four_weeks["next_week"] == "2024-W09"
+    assert [day["date"] for day in four_weeks["days"] if day["events"]] == ["2024-02-01"]
+    assert month["week_start"] == "2024-01-29" and month["day_count"] == 35
+    assert month["previous_month"] == "2024-01" and month["next_month"] == "2024-03"
+    assert [day["date"] for day in month["days"] if day["events"]] == ["2024-02-01", "2024-02-29"]
+    assert client.get("/api/planner?weeks=7").status_code == 400
+    assert client.get("/api/planner?month=2024-13").status_code == 400
+    for month in ("9999-12", "0001-01", "0001-02"):
+        assert client.get(f"/api/planner?month={month}").status_code == 400
+        assert client.get(f"/calendar/month?month={month}").status_code == 400
+    assert client.get("/api/planner?month=9999-11").get_json()["next_month"] == "9999-12"
+    assert client.get("/api/planner?month=0001-03").get_json()["previous_month"] == "0001-02"
@@ -0,0 +1,172 @@
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+from app import db
+from app.availability import find_available_rooms
+from app.models import RecurrenceExclusion, Room, Schedule
+from app.recurrence import UNBOUNDED, RecurrenceRule
+
+from tests.test_calendar import login
+
+START = datetime(2024, 1, 31, 9, 0)
+END = START + timedelta(hours=1)
+
+
+def starts(pairs):
+    return [start for start, _ in pairs]
+
+
+def test_weekly_rule_honours_count_and_exclusions():
+    rule = RecurrenceRule('weekly', count=4, excluded=frozenset({date(2024, 2, 14)}))
+
+    assert starts(rule.occurrences(START, END)) == [
+        datetime(2024, 1, 31, 9, 0),
+        datetime(2024, 2, 7, 9, 0),
+        datetime(2024, 2, 21, 9, 0),
+    ]
+    assert rule.series_end(START, END) == datetime(2024, 2, 21, 10, 0)
+
+
+def test_monthly_rule_clamps_to_month_end_and_stops_at_until():
+    rule = RecurrenceRule('monthly', until=date(2024, 5, 1))
+
+    assert starts(rule.occurrences(START, END)) == [
+        datetime(2024, 1, 31, 9, 0),
+        datetime(2024, 2, 29, 9, 0),
+        datetime(2024, 3, 31, 9, 0),
+        datetime(2024, 4, 30, 9, 0),
+    ]
+
+
+def test_unbounded_series_is_expanded_only_inside_the_window():
+    rule = RecurrenceRule('daily')
+    window_start = datetime(2034, 6, 1)
+
+    assert rule.series_end(START, END) == UNBOUNDED
+    assert starts(rule.occurrences(START, END, window_start, window_start + timedelta(days=3))) == [
+        datetime(2034, 6, 1, 9, 0),
+        datetime(2034, 6, 2, 9, 0),
+        datetime(2034, 6, 3, 9, 0),
+    ]
+    assert starts(islice(rule.occurrences(START, END), 2)) == [START, START + timedelta(days=1)]
+
+
+def test_recurring_schedule_appears_in_later_weeks_except_skipped_dates(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    standup = Schedule(
+        title="Standup",
+        start_time=datetime(2024, 1, 1, 9, 30),
+        end_time=datetime(2024, 1, 1, 9, 45),
+        owner=owner,
+        recurrence="daily",
+    )
+    standup.exclusions.append(RecurrenceExclusion(occurrence_date=date(2024, 3, 6)))
+    db.session.add(standup)
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    payload = client.get("/api/planner?week=2024-W10").get_json()
+
+    assert [len(day["events"]) for day in payload["days"]] == [1, 1, 0, 1, 1, 1, 1]
+    assert payload["days"][0]["events"][0]["start"] == "2024-03-04T09:30"
+    assert payload["days"][0]["events"][0]["recurrence"] == "daily"
+
+
+def test_recurring_booking_conflicts_with_a_later_occurrence(client, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    room = Room(name="Loft", capacity=6)
+    db.session.add(room)
+    db.session.add(Schedule(
+        title="Offsite Prep",
+        start_time=datetime(2030, 1, 21, 10, 30),
+        end_time=datetime(2030, 1, 21, 11, 30),
+        owner=owner,
+        room=room,
+    ))
+    db.session.commit()
+    login(client, "owner", "Password123")
+
+    response = client.post(
+        "/schedules/new",
+        data={
+            "title": "Weekly Planning",
+            "start_time": "2030-01-07T10:00",
+            "end_time": "2030-01-07T11:00",
+            "location": "",
+            "room": str(room.id),
+            "recurrence": "weekly",
+            "recurrence_count": "4",
+            "submit": "Save",
+        },
+    )
+
+    assert response.status_code == 200
+    assert b"This room is already booked for &#39;Offsite Prep&#39;" in response.data
+
+    skipped = client.post(
+        "/schedules/new",
+        data={
+            "title": "Weekly Planning",
+            "start_time": "2030-01-07T10:00",
+            "end_time": "2030-01-07T11:00",
+            "location": "",
+            "room": str(room.id),
+            "recurrence": "weekly",
+            "recurrence_count": "4",
+            "recurrence_exclusions": "2030-01-21",
+            "submit": "Save",
+        },
+    )
+    assert skipped.status_code == 302
+    schedule = Schedule.query.filter_by(title="Weekly Planning").one()
+    assert schedule.series_end == datetime(2030, 1, 28, 11, 0)
+    assert [exclusion.occurrence_date for exclusion in schedule.exclusions] == [date(2030, 1, 21)]
+
+
+def test_series_ending_after_year_9999_is_a_form_error(client, user_factory):
+    user_factory(username="owner", password="Password123")
+    login(client, "owner", "Password123")
+    cases = [
+        ("2024-01-01T09:00", "daily", {"recurrence_until": "9999-12-31"}),
+        ("9990-01-01T09:00", "monthly", {"recurrence_count": "1000"}),
+    ]
+
+    for start, frequency, end_field in cases:
+        response = client.post("/schedules/new", data={
+            "title": "Forever",
+            "start_time": start,
+            "end_time": start.replace("09:00", "10:00"),
+            "recurrence": frequency,
+            "submit": "Save",
+            **end_field,
+        })
+
+        assert response.status_code == 200, frequency
+        assert b"The series must end before the year 10000." in response.data
+    assert Schedule.query.count() == 0
+
+    one_off = client.post("/schedules/new", data={
+        "title": "Last day", "start_time": "9999-12-31T09:00", "end_time": "9999-12-31T10:00", "submit": "Save",
+    })
+    assert one_off.status_code == 302
+
+
+def test_available_rooms_expands_recurring_bookings(app, user_factory):
+    owner = user_factory(username="owner", password="Password123")
+    weekly = Room(name="Quiet Room", capacity=4)
+    db.session.add(weekly)
+    db.session.add(Schedule(
+        title="Book Club",
+        start_time=datetime(2024, 1, 3, 12, 0),
+        end_time=datetime(2024, 1, 3, 13, 0),
+        owner=owner,
+        room=weekly,
+        recurrence="weekly",
+    ))
+    db.session.commit()
+
+    wednesday = datetime(2026, 7, 1, 12, 30)
+    thursday = wednesday + timedelta(days=1)
+
+    assert find_available_rooms([(wednesday, wednesday + timedelta(hours=1))]) == []
+    assert find_available_rooms([(thursday, thursday + timedelta(hours=1))]) == [weekly]